@@ -0,0 +1,189 @@
+"""Benchmark the KR ETA polling pipeline against a local fake upstream.
+
+Geocodes the addresses of N routes through GeoCoder, then drives the
+routes through the shared coordinator and KrEtaSensor for a number of
+refresh cycles, and reports throughput, per-route update latency,
+upstream calls per refresh and memory.
+
+    python -m benchmarks.bench_polling --routes 200 --cycles 5 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.kr_eta.coordinator import KrEtaCoordinator
+from custom_components.kr_eta.etacache import EtaCache
+from custom_components.kr_eta.geocache import GeoCache
+from custom_components.kr_eta.kakaomobility import Navi
+from custom_components.kr_eta.ratelimit import RateLimiterRegistry
+from custom_components.kr_eta.resilience import Resilience
+from custom_components.kr_eta.schedule import RouteSchedule
+from custom_components.kr_eta.sensor import KrEtaSensor
+from custom_components.kr_eta.vworld import GeoCoder, Location
+
+from .fake_upstream import FakeUpstream
+
+
+class BenchSensor(KrEtaSensor):
+    """KrEtaSensor writing straight to the state machine, without a platform."""
+
+    def async_write_ha_state(self):
+        self.hass.states.async_set(self.entity_id, self.native_value, self.extra_state_attributes)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+class TimedNavi(Navi):
+    """Navi that records when each async_get_eta call starts and ends."""
+
+    timings: list
+
+    async def async_get_eta(self):
+        start = time.perf_counter()
+        try:
+            return await super().async_get_eta()
+        finally:
+            self.timings.append((start, time.perf_counter()))
+
+
+async def run(args) -> dict:
+    upstream = FakeUpstream(args.latency, args.jitter, args.error_rate)
+    await upstream.start()
+
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            async with aiohttp.ClientSession() as session:
+                result = await _run(hass, session, upstream, args)
+        finally:
+            await hass.async_stop(force=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await upstream.stop()
+    result["memory_peak_kib"] = round(peak / 1024)
+    return result
+
+
+async def _run(hass, session, upstream, args) -> dict:
+    limiters = RateLimiterRegistry()
+    resilience = Resilience()
+
+    # Geocode every route point; duplicate routes share addresses.
+    unique_routes = max(1, round(args.routes * (1 - args.duplicate_ratio)))
+    addresses = [f"서울특별시 중구 세종대로 {i}" for i in range(unique_routes + 1)]
+    gc = GeoCoder("bench", session, GeoCache(), limiters.get("vworld", "bench"), resilience)
+    gc.apiurl = f"{upstream.base_url}/req/address?"
+    gc.limiter.bucket.rate = gc.limiter.bucket.capacity = args.rate
+    gc.limiter.daily_quota = 10 ** 9
+
+    start = time.perf_counter()
+    points = await asyncio.gather(*(gc.getcoord(addr) for addr in addresses))
+    geocode_seconds = time.perf_counter() - start
+
+    coordinator = KrEtaCoordinator(hass)
+    if not args.cache:
+        # Measure upstream work, not cache hits between back-to-back cycles.
+        coordinator.eta_cache = EtaCache(ttl=0, stale_ttl=0)
+    coordinator._semaphore = asyncio.Semaphore(args.concurrency)
+
+    kakao_limiter = limiters.get("kakao", "bench")
+    kakao_limiter.bucket.rate = kakao_limiter.bucket.capacity = args.rate
+    kakao_limiter.daily_quota = 10 ** 9
+
+    timings = []
+    sensors = []
+    unsubs = []
+    for i in range(args.routes):
+        n = i % unique_routes
+        start_point = Location("Home", *points[0])
+        end_point = Location(f"Dest {n}", *points[n + 1])
+
+        navi = TimedNavi("bench", session, coordinator.flight, coordinator.eta_cache, kakao_limiter, resilience)
+        navi.timings = timings
+        navi.apiurl = f"{upstream.base_url}/v1/directions"
+        navi.set_startpoint(start_point)
+        navi.set_endpoint(end_point)
+
+        entry_id = f"route_{i}"
+        coordinator.add_route(entry_id, navi, RouteSchedule.from_options({}))
+        sensor = BenchSensor(coordinator, start_point, end_point, [], entry_id)
+        sensor.hass = hass
+        sensor.entity_id = f"sensor.kr_eta_bench_{i}"
+        unsubs.append(coordinator.async_add_listener(sensor._handle_coordinator_update))
+        sensors.append(sensor)
+
+    upstream_before = upstream.total_calls
+    cycle_seconds = []
+    # Fetch latency covers the upstream call; update latency also covers
+    # waiting for a concurrency slot, measured from the start of the cycle.
+    fetch_latencies = []
+    update_latencies = []
+    for _ in range(args.cycles):
+        for schedule in coordinator.schedules.values():
+            schedule.request_refresh()
+        timings.clear()
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        cycle_seconds.append(time.perf_counter() - start)
+        fetch_latencies += [end - begin for begin, end in timings]
+        update_latencies += [end - start for _, end in timings]
+
+    for unsub in unsubs:
+        unsub()
+
+    total = sum(cycle_seconds)
+    updated = sum(1 for s in sensors if s.native_value is not None)
+    return {
+        "routes": args.routes,
+        "cycles": args.cycles,
+        "geocode_seconds": round(geocode_seconds, 4),
+        "geocode_upstream_calls": upstream.calls["geocode"],
+        "throughput_routes_per_second": round(args.routes * args.cycles / total, 1),
+        "cycle_seconds_mean": round(total / args.cycles, 4),
+        "fetch_latency_p50_ms": round(percentile(fetch_latencies, 50) * 1000, 2),
+        "fetch_latency_p99_ms": round(percentile(fetch_latencies, 99) * 1000, 2),
+        "update_latency_p50_ms": round(percentile(update_latencies, 50) * 1000, 2),
+        "update_latency_p99_ms": round(percentile(update_latencies, 99) * 1000, 2),
+        "upstream_calls_per_refresh": round((upstream.total_calls - upstream_before) / args.cycles, 1),
+        "coalesced_requests": coordinator.flight.saved,
+        "retries": resilience.retries,
+        "sensors_with_state": updated,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=100)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="upstream latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail with 503")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="fraction of routes that duplicate another route")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent route fetches per refresh")
+    parser.add_argument("--rate", type=float, default=1000, help="client-side calls per second")
+    parser.add_argument("--cache", action="store_true", help="keep the ETA response cache enabled")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    print(json.dumps(asyncio.run(run(parse_args(argv))), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Local stand-in for the Kakao Mobility and VWorld APIs.
+
+Serves the endpoints Navi and GeoCoder call, with configurable latency and
+error injection, and counts the requests it receives.
+"""
+import asyncio
+import random
+import zlib
+
+from aiohttp import web
+
+
+class FakeUpstream:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = {"directions": 0, "destinations": 0, "geocode": 0}
+        self.random = random.Random(seed)
+        self.app = web.Application()
+        self.app.router.add_get("/v1/directions", self._directions)
+        self.app.router.add_post("/v1/destinations/directions", self._destinations)
+        self.app.router.add_get("/req/address", self._geocode)
+        self._runner = None
+        self.base_url = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    async def _delay(self):
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def _fail(self) -> bool:
+        return self.random.random() < self.error_rate
+
+    def _duration(self, *coords: str) -> int:
+        # Deterministic per route, so repeated polls return the same ETA.
+        return 600 + zlib.crc32(",".join(coords).encode()) % 1800
+
+    async def _directions(self, request: web.Request):
+        self.calls["directions"] += 1
+        await self._delay()
+        if self._fail():
+            return web.json_response({"msg": "injected error"}, status=503)
+
+        duration = self._duration(request.query["origin"], request.query["destination"])
+        return web.json_response({
+            "trans_id": "fake",
+            "routes": [{
+                "result_code": 0,
+                "result_msg": "길찾기 성공",
+                "summary": {
+                    "distance": duration * 12,
+                    "duration": duration,
+                    "fare": {"taxi": 12000, "toll": 0},
+                },
+            }],
+        })
+
+    async def _destinations(self, request: web.Request):
+        self.calls["destinations"] += 1
+        await self._delay()
+        if self._fail():
+            return web.json_response({"msg": "injected error"}, status=503)
+
+        body = await request.json()
+        origin = f"{body['origin']['x']},{body['origin']['y']}"
+        routes = []
+        for dest in body["destinations"]:
+            duration = self._duration(origin, f"{dest['x']},{dest['y']}")
+            routes.append({
+                "result_code": 0,
+                "key": dest["key"],
+                "summary": {"distance": duration * 12, "duration": duration},
+            })
+        return web.json_response({"trans_id": "fake", "routes": routes})
+
+    async def _geocode(self, request: web.Request):
+        self.calls["geocode"] += 1
+        await self._delay()
+        if self._fail():
+            return web.json_response({"msg": "injected error"}, status=503)
+
+        h = zlib.crc32(request.query["address"].encode())
+        return web.json_response({
+            "response": {
+                "status": "OK",
+                "result": {
+                    "crs": request.query["crs"].upper(),
+                    "point": {
+                        "x": f"{126.8 + (h % 1000) / 2000:.6f}",
+                        "y": f"{37.4 + (h // 1000 % 1000) / 4000:.6f}",
+                    },
+                },
+            }
+        })
@@ -5,7 +5,11 @@ import logging
 from homeassistant import config_entries, core
 from homeassistant.const import Platform
 
-from .const import DOMAIN
+from .const import DATA_COORDINATOR, DOMAIN
+from .coordinator import KrEtaCoordinator
+from .history import async_get_history
+from .sensor import async_update_route
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +21,11 @@ async def async_setup_entry(
 ) -> bool:
     """Set up platform from a ConfigEntry."""
     hass.data.setdefault(DOMAIN, {})
+    # All routes share one coordinator so they are polled in a single cycle.
+    history = async_get_history(hass)
+    if DATA_COORDINATOR not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_COORDINATOR] = KrEtaCoordinator(hass, history)
+    await history.async_load_route(entry.entry_id)
     hass_data = dict(entry.data)
     # Registers update listener to update config entry when options are updated.
     unsub_options_update_listener = entry.add_update_listener(options_update_listener)
@@ -32,8 +41,13 @@ async def async_setup_entry(
 async def options_update_listener(
     hass: core.HomeAssistant, config_entry: config_entries.ConfigEntry
 ):
-    """Handle options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Handle options update.
+
+    The running route takes the new options in place; the entry is only
+    reloaded when that is not possible.
+    """
+    if not await async_update_route(hass, config_entry):
+        await hass.config_entries.async_reload(config_entry.entry_id)
 
 
 async def async_unload_entry(
@@ -45,12 +59,26 @@ async def async_unload_entry(
         entry_data = hass.data[DOMAIN].pop(entry.entry_id)
         # Remove options_update_listener.
         entry_data["unsub_options_update_listener"]()
+        # Drop the route from the shared coordinator.
+        coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+        coordinator.remove_route(entry.entry_id)
+        if not coordinator.routes:
+            hass.data[DOMAIN].pop(DATA_COORDINATOR)
+        await async_get_history(hass).async_unload_route(entry.entry_id)
 
     return unload_ok
 
 
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Delete the ETA history of a removed entry."""
+    await async_get_history(hass).async_remove_route(entry.entry_id)
+
+
 async def async_setup(hass: core.HomeAssistant, config: dict) -> bool:
     """Set up the GitHub Custom component from yaml configuration."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
@@ -11,10 +11,22 @@ from homeassistant.helpers.entity_registry import (
     async_entries_for_config_entry,
     async_get,
 )
+from homeassistant.helpers.selector import (
+    EntitySelector,
+    EntitySelectorConfig,
+    TextSelector,
+    TextSelectorConfig,
+)
 import voluptuous as vol
 
 from .const import *
-from .vworld import GeoCoder
+from .geocache import async_get_geocache
+from .kakaomobility import MAX_DESTINATION_RADIUS, MAX_DESTINATIONS, MAX_WAYPOINTS
+from .ratelimit import async_get_limiters
+from .resilience import async_get_resilience
+from .schedule import parse_windows
+from .spatial import distance
+from .vworld import AddressNotFound, GeoCoder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +38,7 @@ AUTH_SCHEMA = vol.Schema({
 STARTPOINT_SCHEMA = vol.Schema({
     vol.Required(CONF_LOCATION_NAME): cv.string,
     vol.Required(CONF_LOCATION_ADDRESS): cv.string,
+    vol.Optional(CONF_ROUTE_TYPE, default=ROUTE_TYPE_SINGLE): vol.In([ROUTE_TYPE_SINGLE, ROUTE_TYPE_MATRIX]),
 })
 
 ENDPOINT_SCHEMA = vol.Schema({
@@ -34,38 +47,125 @@ ENDPOINT_SCHEMA = vol.Schema({
     vol.Optional(CONF_ADD_WAYPOINT, default=False): cv.boolean,
 })
 
+DESTINATION_SCHEMA = vol.Schema({
+    vol.Required(CONF_LOCATION_NAME): cv.string,
+    vol.Required(CONF_LOCATION_ADDRESS): cv.string,
+    vol.Optional(CONF_ADD_DESTINATION, default=False): cv.boolean,
+})
+
 WAYPOINT_SCHEMA = vol.Schema({
 
     vol.Required(CONF_LOCATION_ADDRESS): cv.string,
     vol.Optional(CONF_ADD_WAYPOINT, default=False): cv.boolean,
 })
 
+# All stops of a route at once; waypoints are one address per line.
+ROUTE_SCHEMA = vol.Schema({
+    vol.Required(CONF_START_NAME): cv.string,
+    vol.Required(CONF_START_ADDRESS): cv.string,
+    vol.Required(CONF_END_NAME): cv.string,
+    vol.Required(CONF_END_ADDRESS): cv.string,
+    vol.Optional(CONF_WAYPOINTS, default=""): TextSelector(TextSelectorConfig(multiline=True)),
+})
+
+
+def route_points(route: Dict[str, Any]) -> list[Dict[str, Any]]:
+    """Return every location config of a route."""
+    points = [route[CONF_STARTPOINT]]
+    if CONF_ENDPOINT in route:
+        points.append(route[CONF_ENDPOINT])
+    return points + route.get(CONF_WAYPOINTS, []) + route.get(CONF_DESTINATIONS, [])
+
+
+async def async_geocode_route(gc: GeoCoder, route: Dict[str, Any]) -> Dict[str, Exception]:
+    """Geocode every point of a route without coordinates concurrently, in
+    place.
+
+    Returns the errors keyed by address.
+    """
+    points = [
+        p for p in route_points(route)
+        if CONF_LOCATION_X not in p or CONF_LOCATION_Y not in p
+    ]
+    if not points:
+        return {}
+    coords, errors = await gc.getcoords([unquote_plus(p[CONF_LOCATION_ADDRESS]) for p in points])
+    for point in points:
+        address = unquote_plus(point[CONF_LOCATION_ADDRESS])
+        if address in coords:
+            point[CONF_LOCATION_X], point[CONF_LOCATION_Y] = coords[address]
+
+    return errors
+
+
+def within_radius(start: Dict[str, Any], dest: Dict[str, Any]) -> bool:
+    """Whether a matrix destination is in reach of multi-destination
+    directions from the start point."""
+    return distance(
+        float(start[CONF_LOCATION_X]), float(start[CONF_LOCATION_Y]),
+        float(dest[CONF_LOCATION_X]), float(dest[CONF_LOCATION_Y]),
+    ) <= MAX_DESTINATION_RADIUS
+
+
+def route_unique_id(data: Dict[str, Any]) -> str:
+    """Identify a route by the addresses of its start and end, or
+    destinations."""
+    ends = [data[CONF_ENDPOINT]] if CONF_ENDPOINT in data else data.get(CONF_DESTINATIONS, [])
+    addresses = [
+        " ".join(unquote_plus(point[CONF_LOCATION_ADDRESS]).split()).lower()
+        for point in [data[CONF_STARTPOINT], *ends]
+    ]
+    return f"{data.get(CONF_ROUTE_TYPE, ROUTE_TYPE_SINGLE)}|{'|'.join(addresses)}"
+
+
+def entry_title(data: Dict[str, Any]) -> str:
+    start_name = data[CONF_STARTPOINT].get(CONF_LOCATION_NAME)
+    if data.get(CONF_ROUTE_TYPE) == ROUTE_TYPE_MATRIX:
+        return f"ETA {start_name} ➡ {len(data[CONF_DESTINATIONS])} destinations"
+
+    end_name = data[CONF_ENDPOINT].get(CONF_LOCATION_NAME)
+    if data.get(CONF_WAYPOINTS):
+        return f"ETA {start_name} ➡ {end_name} ({len(data[CONF_WAYPOINTS])} waypoints)"
+    return f"ETA {start_name} ➡ {end_name}"
+
+
 class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Github Custom config flow."""
 
     data: Optional[Dict[str, Any]]
     gc: GeoCoder
 
-    async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None):
-        """Invoked when a user initiates a flow via the user interface."""
-        errors: Dict[str, str] = {}
-        
-        # Check if there are existing entries to reuse API keys from
-        existing_entries = self.hass.config_entries.async_entries(DOMAIN)
-        if existing_entries:
-            # Reuse keys from the first entry found
-            first_entry = existing_entries[0]
-            vworld_key = first_entry.data.get(CONF_VWORLD_API_KEY)
-            kakao_key = first_entry.data.get(CONF_KAKAODEVELOPERS_API_KEY)
-            
+    async def _async_geocoder(self, vworld_key: str) -> GeoCoder:
+        return GeoCoder(
+            vworld_key,
+            async_get_clientsession(self.hass),
+            await async_get_geocache(self.hass),
+            (await async_get_limiters(self.hass)).get(SERVICE_VWORLD, vworld_key),
+            async_get_resilience(self.hass),
+        )
+
+    def _existing_api_keys(self) -> Optional[Dict[str, str]]:
+        """Return the API keys of the first existing entry, if any."""
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            vworld_key = entry.data.get(CONF_VWORLD_API_KEY)
+            kakao_key = entry.data.get(CONF_KAKAODEVELOPERS_API_KEY)
             if vworld_key and kakao_key:
-                self.data = {
+                return {
                     CONF_VWORLD_API_KEY: vworld_key,
                     CONF_KAKAODEVELOPERS_API_KEY: kakao_key,
-                    CONF_WAYPOINTS: []
                 }
-                self.gc = GeoCoder(vworld_key, async_get_clientsession(self.hass))
-                return await self.async_step_start_location()
+        return None
+
+    async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None):
+        """Invoked when a user initiates a flow via the user interface."""
+        errors: Dict[str, str] = {}
+        
+        # Reuse API keys from an existing entry
+        api_keys = self._existing_api_keys()
+        if api_keys is not None:
+            self.data = {**api_keys, CONF_WAYPOINTS: []}
+            self.gc = await self._async_geocoder(api_keys[CONF_VWORLD_API_KEY])
+            return await self.async_step_setup()
 
         if user_input is not None:
             if not user_input.get(CONF_VWORLD_API_KEY) or not user_input.get(CONF_KAKAODEVELOPERS_API_KEY):
@@ -73,11 +173,15 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if not errors:
                 self.data = user_input
                 self.data[CONF_WAYPOINTS] = []
-                self.gc = GeoCoder(user_input.get(CONF_VWORLD_API_KEY), async_get_clientsession(self.hass))
-                return await self.async_step_start_location()
+                self.gc = await self._async_geocoder(user_input.get(CONF_VWORLD_API_KEY))
+                return await self.async_step_setup()
 
         return self.async_show_form(step_id="user", data_schema=AUTH_SCHEMA, errors=errors)
 
+    async def async_step_setup(self, user_input: Optional[Dict[str, Any]] = None):
+        """Choose how to enter the route."""
+        return self.async_show_menu(step_id="setup", menu_options=["start_location", "route"])
+
     async def async_step_start_location(self, user_input: Optional[Dict[str, Any]] = None):
         """Second step: Select start location."""
         errors: Dict[str, str] = {}
@@ -87,14 +191,22 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 try:
                     x, y = await self.gc.getcoord(unquote_plus(user_input.get(CONF_LOCATION_ADDRESS)))
-                except Exception as e:
-                    _LOGGER.exception("Failed to get start location coordinates")
+                except AddressNotFound:
                     errors["base"] = "address_not_found"
+                except Exception:
+                    _LOGGER.exception("Failed to get start location coordinates")
+                    errors["base"] = "cannot_connect"
 
             if not errors:
+                route_type = user_input.pop(CONF_ROUTE_TYPE, ROUTE_TYPE_SINGLE)
                 self.data[CONF_STARTPOINT] = user_input
                 self.data[CONF_STARTPOINT][CONF_LOCATION_X] = x
                 self.data[CONF_STARTPOINT][CONF_LOCATION_Y] = y
+
+                if route_type == ROUTE_TYPE_MATRIX:
+                    self.data[CONF_ROUTE_TYPE] = ROUTE_TYPE_MATRIX
+                    self.data[CONF_DESTINATIONS] = []
+                    return await self.async_step_destination_location()
                 return await self.async_step_endpoint_location()
 
         return self.async_show_form(step_id="start_location", data_schema=STARTPOINT_SCHEMA, errors=errors)
@@ -108,9 +220,11 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 try:
                     x, y = await self.gc.getcoord(unquote_plus(user_input.get(CONF_LOCATION_ADDRESS)))
-                except Exception as e:
-                    _LOGGER.exception("Failed to get endpoint location coordinates")
+                except AddressNotFound:
                     errors["base"] = "address_not_found"
+                except Exception:
+                    _LOGGER.exception("Failed to get endpoint location coordinates")
+                    errors["base"] = "cannot_connect"
 
             if not errors:
                 self.data[CONF_ENDPOINT] = user_input
@@ -120,9 +234,7 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if user_input.get(CONF_ADD_WAYPOINT, False):
                     return await self.async_step_waypoint_location()
                 
-                start_name = self.data[CONF_STARTPOINT].get(CONF_LOCATION_NAME)
-                end_name = self.data[CONF_ENDPOINT].get(CONF_LOCATION_NAME)
-                return self.async_create_entry(title=f"ETA {start_name} ➡ {end_name}", data=self.data)
+                return self.async_create_entry(title=entry_title(self.data), data=self.data)
 
         return self.async_show_form(step_id="endpoint_location", data_schema=ENDPOINT_SCHEMA, errors=errors)
 
@@ -130,16 +242,18 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Fourth step: Select waypoint location."""
         errors: Dict[str, str] = {}
         if user_input is not None:
-            if len(self.data[CONF_WAYPOINTS]) >= 5:
+            if len(self.data[CONF_WAYPOINTS]) >= MAX_WAYPOINTS:
                 errors["base"] = "max_waypoints"
             elif not user_input.get(CONF_LOCATION_ADDRESS):
                 errors["base"] = "need_address"
             else:
                 try:
                     x, y = await self.gc.getcoord(unquote_plus(user_input.get(CONF_LOCATION_ADDRESS)))
-                except Exception as e:
-                    _LOGGER.exception("Failed to get waypoint location coordinates")
+                except AddressNotFound:
                     errors["base"] = "address_not_found"
+                except Exception:
+                    _LOGGER.exception("Failed to get waypoint location coordinates")
+                    errors["base"] = "cannot_connect"
 
             if not errors:
                 self.data[CONF_WAYPOINTS].append(user_input)
@@ -149,13 +263,133 @@ class GithubCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if user_input.get(CONF_ADD_WAYPOINT, False):
                     return await self.async_step_waypoint_location()
                 
-                start_name = self.data[CONF_STARTPOINT].get(CONF_LOCATION_NAME)
-                end_name = self.data[CONF_ENDPOINT].get(CONF_LOCATION_NAME)
-                n_waypoints = len(self.data[CONF_WAYPOINTS])
-                return self.async_create_entry(title=f"ETA {start_name} ➡ {end_name} ({n_waypoints} waypoints)", data=self.data)
+                return self.async_create_entry(title=entry_title(self.data), data=self.data)
 
         return self.async_show_form(step_id="waypoint_location", data_schema=WAYPOINT_SCHEMA, errors=errors)
 
+    async def async_step_destination_location(self, user_input: Optional[Dict[str, Any]] = None):
+        """Third step of a matrix route: Add destination locations."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            if len(self.data[CONF_DESTINATIONS]) >= MAX_DESTINATIONS:
+                errors["base"] = "max_destinations"
+            elif not user_input.get(CONF_LOCATION_ADDRESS):
+                errors["base"] = "need_address"
+            else:
+                try:
+                    x, y = await self.gc.getcoord(unquote_plus(user_input.get(CONF_LOCATION_ADDRESS)))
+                except AddressNotFound:
+                    errors["base"] = "address_not_found"
+                except Exception:
+                    _LOGGER.exception("Failed to get destination location coordinates")
+                    errors["base"] = "cannot_connect"
+                else:
+                    dest = {CONF_LOCATION_X: x, CONF_LOCATION_Y: y}
+                    if not within_radius(self.data[CONF_STARTPOINT], dest):
+                        errors["base"] = "destination_too_far"
+
+            if not errors:
+                self.data[CONF_DESTINATIONS].append(user_input)
+                self.data[CONF_DESTINATIONS][-1][CONF_LOCATION_X] = x
+                self.data[CONF_DESTINATIONS][-1][CONF_LOCATION_Y] = y
+
+                if user_input.get(CONF_ADD_DESTINATION, False):
+                    return await self.async_step_destination_location()
+
+                return self.async_create_entry(title=entry_title(self.data), data=self.data)
+
+        return self.async_show_form(step_id="destination_location", data_schema=DESTINATION_SCHEMA, errors=errors)
+
+    async def async_step_route(self, user_input: Optional[Dict[str, Any]] = None):
+        """Enter every stop of a route at once and geocode them together."""
+        errors: Dict[str, str] = {}
+        placeholders = {"addresses": ""}
+        if user_input is not None:
+            waypoints = [
+                {CONF_LOCATION_ADDRESS: line.strip()}
+                for line in user_input.get(CONF_WAYPOINTS, "").splitlines()
+                if line.strip()
+            ]
+            route = {
+                CONF_STARTPOINT: {
+                    CONF_LOCATION_NAME: user_input[CONF_START_NAME],
+                    CONF_LOCATION_ADDRESS: user_input[CONF_START_ADDRESS],
+                },
+                CONF_ENDPOINT: {
+                    CONF_LOCATION_NAME: user_input[CONF_END_NAME],
+                    CONF_LOCATION_ADDRESS: user_input[CONF_END_ADDRESS],
+                },
+                CONF_WAYPOINTS: waypoints,
+            }
+
+            if len(waypoints) > MAX_WAYPOINTS:
+                errors[CONF_WAYPOINTS] = "max_waypoints"
+            else:
+                failed = await async_geocode_route(self.gc, route)
+                for address, err in failed.items():
+                    _LOGGER.warning("Failed to get coordinates of %s: %s", address, err)
+                if not all(isinstance(err, AddressNotFound) for err in failed.values()):
+                    errors["base"] = "cannot_connect"
+                elif failed:
+                    errors["base"] = "addresses_not_found"
+                    placeholders["addresses"] = ", ".join(failed)
+
+            if not errors:
+                self.data.update(route)
+                return self.async_create_entry(title=entry_title(self.data), data=self.data)
+
+        return self.async_show_form(
+            step_id="route",
+            data_schema=self.add_suggested_values_to_schema(ROUTE_SCHEMA, user_input),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_import(self, import_data: Dict[str, Any]):
+        """Create an entry from a route given programmatically.
+
+        import_data has the shape of entry data; points without coordinates
+        are geocoded. The API keys default to those of an existing entry.
+        Routes already imported are aborted as already_configured.
+        """
+        data = deepcopy(import_data)
+        await self.async_set_unique_id(route_unique_id(data))
+        self._abort_if_unique_id_configured()
+
+        api_keys = self._existing_api_keys() or {}
+        for key in (CONF_VWORLD_API_KEY, CONF_KAKAODEVELOPERS_API_KEY):
+            data.setdefault(key, api_keys.get(key))
+            if not data[key]:
+                return self.async_abort(reason="need_api_keys")
+        data.setdefault(CONF_WAYPOINTS, [])
+
+        if len(data[CONF_WAYPOINTS]) > MAX_WAYPOINTS:
+            return self.async_abort(reason="max_waypoints")
+        if len(data.get(CONF_DESTINATIONS, [])) > MAX_DESTINATIONS:
+            return self.async_abort(reason="max_destinations")
+
+        gc = await self._async_geocoder(data[CONF_VWORLD_API_KEY])
+        failed = await async_geocode_route(gc, data)
+        if not all(isinstance(err, AddressNotFound) for err in failed.values()):
+            return self.async_abort(reason="cannot_connect")
+        if failed:
+            return self.async_abort(
+                reason="addresses_not_found",
+                description_placeholders={"addresses": ", ".join(failed)},
+            )
+
+        too_far = [
+            dest[CONF_LOCATION_ADDRESS] for dest in data.get(CONF_DESTINATIONS, [])
+            if not within_radius(data[CONF_STARTPOINT], dest)
+        ]
+        if too_far:
+            return self.async_abort(
+                reason="destinations_too_far",
+                description_placeholders={"addresses": ", ".join(too_far)},
+            )
+
+        return self.async_create_entry(title=entry_title(data), data=data)
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -175,6 +409,18 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         current_waypoints = self.config_entry.data.get(CONF_WAYPOINTS, [])
         
         if user_input is not None:
+            try:
+                parse_windows(user_input.get(CONF_COMMUTE_WINDOWS, ""))
+            except ValueError:
+                errors[CONF_COMMUTE_WINDOWS] = "invalid_commute_windows"
+            # Compared priorities come without the route detail that a live
+            # origin estimates from, and sections are made of.
+            if user_input.get(CONF_ORIGIN_TRACKER) and user_input.get(CONF_COMPARE_PRIORITIES):
+                errors[CONF_ORIGIN_TRACKER] = "origin_tracker_compare_priorities"
+            if user_input.get(CONF_DETAILED) and user_input.get(CONF_COMPARE_PRIORITIES):
+                errors[CONF_DETAILED] = "detailed_compare_priorities"
+
+        if user_input is not None and not errors:
             # Filter out the waypoints selected for removal
             remove_indices = user_input.get("remove_waypoints", [])
             new_waypoints = [
@@ -187,18 +433,108 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             new_data[CONF_WAYPOINTS] = new_waypoints
             self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
             
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(title="", data={
+                CONF_COMMUTE_WINDOWS: user_input[CONF_COMMUTE_WINDOWS],
+                CONF_PEAK_INTERVAL: user_input[CONF_PEAK_INTERVAL],
+                CONF_OFFPEAK_INTERVAL: user_input[CONF_OFFPEAK_INTERVAL],
+                CONF_DETAILED: user_input[CONF_DETAILED],
+                CONF_COMPARE_PRIORITIES: user_input[CONF_COMPARE_PRIORITIES],
+                CONF_ERROR_BUDGET: user_input[CONF_ERROR_BUDGET],
+                CONF_MIN_DURATION_DELTA: user_input[CONF_MIN_DURATION_DELTA],
+                CONF_MIN_DISTANCE_DELTA: user_input[CONF_MIN_DISTANCE_DELTA],
+                CONF_TRIGGER_ENTITIES: user_input.get(CONF_TRIGGER_ENTITIES, []),
+                CONF_TRIGGER_ZONE: user_input.get(CONF_TRIGGER_ZONE, DEFAULT_TRIGGER_ZONE),
+                CONF_TRIGGER_CALENDAR: user_input.get(CONF_TRIGGER_CALENDAR),
+                CONF_TRIGGER_LEAD: user_input[CONF_TRIGGER_LEAD],
+                CONF_ACTIVE_DURATION: user_input[CONF_ACTIVE_DURATION],
+                CONF_DORMANT_INTERVAL: user_input[CONF_DORMANT_INTERVAL],
+                CONF_ORIGIN_TRACKER: user_input.get(CONF_ORIGIN_TRACKER),
+                CONF_ORIGIN_MIN_DISTANCE: user_input[CONF_ORIGIN_MIN_DISTANCE],
+                CONF_ORIGIN_MAX_AGE: user_input[CONF_ORIGIN_MAX_AGE],
+            })
 
         # Generate options for the multi-select
         options = {
             str(i): f"{wp.get(CONF_LOCATION_ADDRESS)}"
             for i, wp in enumerate(current_waypoints)
         }
+        current_options = self.config_entry.options
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
-                vol.Optional("remove_waypoints", default=[]): vol.MultiSelect(options)
+                vol.Optional("remove_waypoints", default=[]): cv.multi_select(options),
+                vol.Optional(
+                    CONF_COMMUTE_WINDOWS,
+                    default=current_options.get(CONF_COMMUTE_WINDOWS, DEFAULT_COMMUTE_WINDOWS),
+                ): cv.string,
+                vol.Optional(
+                    CONF_PEAK_INTERVAL,
+                    default=current_options.get(CONF_PEAK_INTERVAL, DEFAULT_PEAK_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_OFFPEAK_INTERVAL,
+                    default=current_options.get(CONF_OFFPEAK_INTERVAL, DEFAULT_OFFPEAK_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_DETAILED,
+                    default=current_options.get(CONF_DETAILED, False),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_COMPARE_PRIORITIES,
+                    default=current_options.get(CONF_COMPARE_PRIORITIES, False),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_ERROR_BUDGET,
+                    default=current_options.get(CONF_ERROR_BUDGET, DEFAULT_ERROR_BUDGET),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
+                vol.Optional(
+                    CONF_MIN_DURATION_DELTA,
+                    default=current_options.get(CONF_MIN_DURATION_DELTA, DEFAULT_MIN_DURATION_DELTA),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_MIN_DISTANCE_DELTA,
+                    default=current_options.get(CONF_MIN_DISTANCE_DELTA, DEFAULT_MIN_DISTANCE_DELTA),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                # With trigger entities or a calendar, the route stays
+                # dormant until a trigger activates it.
+                vol.Optional(
+                    CONF_TRIGGER_ENTITIES,
+                    default=current_options.get(CONF_TRIGGER_ENTITIES, []),
+                ): EntitySelector(EntitySelectorConfig(domain=["person", "device_tracker"], multiple=True)),
+                vol.Optional(
+                    CONF_TRIGGER_ZONE,
+                    default=current_options.get(CONF_TRIGGER_ZONE, DEFAULT_TRIGGER_ZONE),
+                ): EntitySelector(EntitySelectorConfig(domain="zone")),
+                vol.Optional(
+                    CONF_TRIGGER_CALENDAR,
+                    description={"suggested_value": current_options.get(CONF_TRIGGER_CALENDAR)},
+                ): EntitySelector(EntitySelectorConfig(domain="calendar")),
+                vol.Optional(
+                    CONF_TRIGGER_LEAD,
+                    default=current_options.get(CONF_TRIGGER_LEAD, DEFAULT_TRIGGER_LEAD),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_ACTIVE_DURATION,
+                    default=current_options.get(CONF_ACTIVE_DURATION, DEFAULT_ACTIVE_DURATION),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_DORMANT_INTERVAL,
+                    default=current_options.get(CONF_DORMANT_INTERVAL, DEFAULT_DORMANT_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                # Single routes only: the origin follows the tracker.
+                vol.Optional(
+                    CONF_ORIGIN_TRACKER,
+                    description={"suggested_value": current_options.get(CONF_ORIGIN_TRACKER)},
+                ): EntitySelector(EntitySelectorConfig(domain=["person", "device_tracker"])),
+                vol.Optional(
+                    CONF_ORIGIN_MIN_DISTANCE,
+                    default=current_options.get(CONF_ORIGIN_MIN_DISTANCE, DEFAULT_ORIGIN_MIN_DISTANCE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=50)),
+                vol.Optional(
+                    CONF_ORIGIN_MAX_AGE,
+                    default=current_options.get(CONF_ORIGIN_MAX_AGE, DEFAULT_ORIGIN_MAX_AGE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }),
             errors=errors
         )
\ No newline at end of file
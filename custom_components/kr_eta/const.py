@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 DOMAIN = "kr_eta"
 
 CONF_VWORLD_API_KEY = "vworld_api_key"
@@ -9,4 +11,154 @@ CONF_LOCATION_NAME = "name"
 CONF_LOCATION_ADDRESS = "address"
 CONF_LOCATION_X = "x"
 CONF_LOCATION_Y = "y"
-CONF_ADD_WAYPOINT = "add_waypoint"
\ No newline at end of file
+CONF_ADD_WAYPOINT = "add_waypoint"
+CONF_ROUTE_TYPE = "route_type"
+CONF_DESTINATIONS = "destinations"
+CONF_ADD_DESTINATION = "add_destination"
+CONF_START_NAME = "start_name"
+CONF_START_ADDRESS = "start_address"
+CONF_END_NAME = "end_name"
+CONF_END_ADDRESS = "end_address"
+CONF_COMMUTE_WINDOWS = "commute_windows"
+CONF_PEAK_INTERVAL = "peak_interval"
+CONF_OFFPEAK_INTERVAL = "offpeak_interval"
+CONF_DETAILED = "detailed"
+CONF_COMPARE_PRIORITIES = "compare_priorities"
+CONF_ERROR_BUDGET = "error_budget"
+CONF_MIN_DURATION_DELTA = "min_duration_delta"
+CONF_MIN_DISTANCE_DELTA = "min_distance_delta"
+CONF_TRIGGER_ENTITIES = "trigger_entities"
+CONF_TRIGGER_ZONE = "trigger_zone"
+CONF_TRIGGER_CALENDAR = "trigger_calendar"
+CONF_TRIGGER_LEAD = "trigger_lead"
+CONF_ACTIVE_DURATION = "active_duration"
+CONF_DORMANT_INTERVAL = "dormant_interval"
+CONF_ORIGIN_TRACKER = "origin_tracker"
+CONF_ORIGIN_MIN_DISTANCE = "origin_min_distance"
+CONF_ORIGIN_MAX_AGE = "origin_max_age"
+
+ROUTE_TYPE_SINGLE = "single"
+# One origin to many destinations, fetched with a single request.
+ROUTE_TYPE_MATRIX = "matrix"
+
+DATA_COORDINATOR = "coordinator"
+DATA_GEOCACHE = "geocache"
+DATA_LIMITERS = "limiters"
+DATA_RESILIENCE = "resilience"
+DATA_HISTORY = "history"
+DATA_SPATIAL = "spatial"
+DATA_SESSIONS = "sessions"
+
+STORAGE_VERSION = 1
+
+# The coordinator ticks often; each route decides if it is due.
+COORDINATOR_TICK = timedelta(minutes=1)
+MAX_CONCURRENT_REQUESTS = 4
+
+# Routes of a Kakao API key share a keep-alive connection pool. A route
+# comparing priorities makes three requests at once. Idle connections are
+# kept for SESSION_KEEPALIVE seconds, below the usual 60 of servers.
+SESSION_POOL_SIZE = MAX_CONCURRENT_REQUESTS * 3
+SESSION_KEEPALIVE = 55
+
+DEFAULT_COMMUTE_WINDOWS = "07:00-09:30, 17:30-19:30"
+DEFAULT_PEAK_INTERVAL = 5  # minutes
+DEFAULT_OFFPEAK_INTERVAL = 30  # minutes
+
+# Routes with triggers stay dormant, polling every DEFAULT_DORMANT_INTERVAL
+# minutes, until a person leaves the zone or a calendar event is
+# DEFAULT_TRIGGER_LEAD minutes away. They then poll at the peak interval
+# for DEFAULT_ACTIVE_DURATION minutes.
+DEFAULT_TRIGGER_ZONE = "zone.home"
+DEFAULT_TRIGGER_LEAD = 30
+DEFAULT_ACTIVE_DURATION = 60
+DEFAULT_DORMANT_INTERVAL = 180
+
+# A route whose origin follows a tracker is fetched again once the tracker
+# moves DEFAULT_ORIGIN_MIN_DISTANCE meters from the last fetched origin, or
+# leaves the route by as much, or after DEFAULT_ORIGIN_MAX_AGE minutes. In
+# between, its ETA is estimated from the geometry of the last route.
+DEFAULT_ORIGIN_MIN_DISTANCE = 500
+DEFAULT_ORIGIN_MAX_AGE = 10
+
+# Back off when the last BACKOFF_SAMPLES durations stay within
+# BACKOFF_THRESHOLD seconds, doubling the interval up to MAX_BACKOFF_FACTOR.
+BACKOFF_SAMPLES = 3
+BACKOFF_THRESHOLD = 60
+MAX_BACKOFF_FACTOR = 4
+
+
+GEOCACHE_MAX_SIZE = 512
+GEOCACHE_TTL = timedelta(days=30)
+GEOCACHE_NOT_FOUND_TTL = timedelta(hours=1)
+GEOCACHE_SAVE_DELAY = 10  # seconds
+
+# GPS positions are bucketed into cells of GRID_CELL_SIZE meters. A live
+# origin within SNAP_TOLERANCE meters of a recent one is moved onto it, so
+# both share directions; reverse geocodes are reused within
+# REVERSE_GEOCODE_TOLERANCE meters. Tolerances must not exceed the cell size.
+GRID_CELL_SIZE = 100
+GRID_MAX_SIZE = 1024
+SNAP_TOLERANCE = 50
+REVERSE_GEOCODE_TOLERANCE = 50
+
+# ETA responses are fresh for ETA_CACHE_TTL seconds and revalidated in the
+# background until ETA_CACHE_STALE_TTL, which stays below COORDINATOR_TICK so
+# scheduled polls always go upstream. On errors, responses up to
+# ETA_CACHE_ERROR_TTL seconds old are served.
+ETA_CACHE_TTL = 20
+ETA_CACHE_STALE_TTL = 45
+ETA_CACHE_ERROR_TTL = 15 * 60
+
+SERVICE_KAKAO = "kakao"
+SERVICE_VWORLD = "vworld"
+
+# (calls per second, burst, calls per day) for each API key.
+RATE_LIMITS = {
+    SERVICE_KAKAO: (5, 5, 10000),
+    SERVICE_VWORLD: (5, 5, 40000),
+}
+QUOTA_SAVE_DELAY = 30  # seconds
+
+# Stretch polling intervals as the daily quota is used up:
+# (fraction of quota used, interval factor).
+QUOTA_SLOWDOWN = [
+    (0.75, 2),
+    (0.9, 4),
+]
+
+# Retry 429/5xx responses up to RETRY_ATTEMPTS times with jittered
+# exponential backoff (seconds).
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+# Open a host's circuit after this many failures in a row, and probe it
+# again after BREAKER_RESET_TIMEOUT seconds.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60
+
+# ETA history: raw samples are kept long enough to replay them into the
+# rollups after a crash; 5-minute and hourly rollups are pruned by age.
+HISTORY_RAW_RETENTION = timedelta(days=2)
+HISTORY_5MIN_RETENTION = timedelta(days=7)
+HISTORY_HOURLY_RETENTION = timedelta(days=90)
+
+# Predictions: a slot needs this many weeks of history, and a live refresh
+# is forced after PREDICTOR_MAX_SKIPS predictions in a row. The error budget
+# is a percentage; 0 disables predictions.
+PREDICTOR_MIN_WEEKS = 3
+PREDICTOR_MAX_SKIPS = 3
+DEFAULT_ERROR_BUDGET = 0
+
+# Departure planning: search this far back from the arrival time, in steps
+# of PLANNER_STEP, with at most PLANNER_MAX_CALLS future directions calls,
+# PLANNER_CONCURRENCY at a time.
+PLANNER_HORIZON = timedelta(hours=3)
+PLANNER_STEP = timedelta(minutes=5)
+PLANNER_MAX_CALLS = 10
+PLANNER_CONCURRENCY = 3
+
+# Sensors only write their state when the ETA moves by at least this many
+# minutes or the distance by this many meters.
+DEFAULT_MIN_DURATION_DELTA = 1
+DEFAULT_MIN_DISTANCE_DELTA = 100
@@ -0,0 +1,219 @@
+"""Shared update coordinator for all KR ETA routes."""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import COORDINATOR_TICK, DOMAIN, MAX_CONCURRENT_REQUESTS
+from .etacache import EtaCache
+from .history import HistoryStore
+from .kakaomobility import Navi
+from .metrics import RouteMetrics, span
+from .predictor import EtaPredictor
+from .schedule import RouteSchedule
+from .singleflight import SingleFlight
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _total_duration(result):
+    """Return the duration of a route, summed over matrix destinations."""
+    if result is None:
+        return None
+    if isinstance(result, dict):
+        return result.get("duration")
+
+    durations = [s.get("duration") for s in result if s is not None]
+    return sum(durations) if durations else None
+
+
+def _is_stale(result) -> bool:
+    """Whether a result was served from the ETA cache past its freshness."""
+    if isinstance(result, dict):
+        return result.get("stale", False)
+    return any(s.get("stale", False) for s in result or () if s is not None)
+
+
+class KrEtaCoordinator(DataUpdateCoordinator):
+    """Poll every due route in one refresh cycle."""
+
+    def __init__(self, hass: HomeAssistant, history: Optional[HistoryStore] = None):
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=COORDINATOR_TICK,
+            # Most ticks fetch nothing; only notify sensors on new results.
+            always_update=False,
+        )
+        self.routes: dict[str, Navi] = {}
+        self.schedules: dict[str, RouteSchedule] = {}
+        self.predictors: dict[str, EtaPredictor] = {}
+        self.metrics: dict[str, RouteMetrics] = {}
+        # Routes whose origin moves, which have no history.
+        self.live_origins: set[str] = set()
+        self.flight = SingleFlight()
+        self.eta_cache = EtaCache()
+        self.history = history
+        # State writes sensors skipped because nothing changed enough.
+        self.skipped_writes = 0
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    def add_route(
+        self,
+        entry_id: str,
+        navi: Navi,
+        schedule: RouteSchedule,
+        error_budget: float = 0,
+        predict_from_history: bool = True,
+        live_origin: bool = False,
+    ):
+        """Register, or re-register, the route of a config entry.
+
+        With an error budget (a fraction), single routes with history may be
+        served predicted ETAs instead of live ones. predict_from_history is
+        False when the history was recorded for other route points. Routes
+        with a live origin are neither predicted nor recorded in the history.
+        """
+        self.routes[entry_id] = navi
+        self.schedules[entry_id] = schedule
+        navi.metrics = self.metrics.setdefault(entry_id, RouteMetrics())
+        self.predictors.pop(entry_id, None)
+        if live_origin:
+            self.live_origins.add(entry_id)
+        else:
+            self.live_origins.discard(entry_id)
+        history = None
+        if self.history is not None and predict_from_history and not live_origin:
+            history = self.history.routes.get(entry_id)
+        if error_budget > 0 and history is not None and not navi.destinations:
+            self.predictors[entry_id] = EtaPredictor(history, error_budget)
+
+    def remove_route(self, entry_id: str):
+        """Forget the route of a config entry."""
+        self.routes.pop(entry_id, None)
+        self.schedules.pop(entry_id, None)
+        self.predictors.pop(entry_id, None)
+        self.metrics.pop(entry_id, None)
+        self.live_origins.discard(entry_id)
+        if self.data is not None:
+            self.data.pop(entry_id, None)
+
+    async def async_refresh_route(self, entry_id: str):
+        """Refresh a route on the next cycle, regardless of its schedule."""
+        self.schedules[entry_id].request_refresh()
+        await self.async_request_refresh()
+
+    @callback
+    def async_set_route_data(self, entry_id: str, summary):
+        """Replace the result of a route without fetching it.
+
+        Unlike async_set_updated_data, this keeps the refresh timer running.
+        """
+        self.data = {**(self.data or {}), entry_id: summary}
+        self.async_update_listeners()
+
+    def _predict(self, entry_id: str, now):
+        """Return a predicted summary, based on the last live one."""
+        predictor = self.predictors.get(entry_id)
+        previous = (self.data or {}).get(entry_id)
+        if predictor is None or previous is None:
+            return None
+
+        duration = predictor.predict(int(now.timestamp()))
+        if duration is None:
+            return None
+
+        summary = {k: v for k, v in previous.items() if k not in ("detail", "options", "stale")}
+        summary["duration"] = duration
+        summary["predicted"] = True
+        return summary
+
+    async def _async_update_route(self, entry_id: str, navi: Navi):
+        metrics = self.metrics.get(entry_id)
+        start = time.perf_counter()
+        with span(metrics, "queue"):
+            await self._semaphore.acquire()
+        try:
+            with span(metrics, "total"):
+                if navi.destinations:
+                    result = await navi.async_get_etas()
+                else:
+                    result = await navi.async_get_eta()
+        except Exception as e:
+            _LOGGER.error(
+                "Error updating KR ETA route %s after %.0f ms: %s",
+                entry_id, (time.perf_counter() - start) * 1000, e,
+            )
+            if metrics is not None:
+                metrics.error(e)
+            return None
+        finally:
+            self._semaphore.release()
+
+        if metrics is not None:
+            metrics.success()
+        return result
+
+    async def _async_update_data(self):
+        """Fetch the ETA summary of every due route, a few at a time.
+
+        Routes whose ETA can be predicted within their error budget are not
+        fetched.
+        """
+        now = dt_util.now()
+        due = [
+            entry_id for entry_id, schedule in self.schedules.items()
+            if schedule.is_due(now)
+        ]
+        predicted = {}
+        for entry_id in due:
+            summary = self._predict(entry_id, now)
+            if summary is not None:
+                predicted[entry_id] = summary
+        live = [entry_id for entry_id in due if entry_id not in predicted]
+        results = await asyncio.gather(*(
+            self._async_update_route(entry_id, self.routes[entry_id])
+            for entry_id in live
+        ))
+
+        data = dict(self.data or {})
+        for entry_id, summary in predicted.items():
+            data[entry_id] = summary
+            self.schedules[entry_id].record(now, summary["duration"])
+
+        samples = {}
+        for entry_id, result in zip(live, results):
+            data[entry_id] = result
+            limiter = self.routes[entry_id].limiter
+            slowdown = limiter.slowdown if limiter is not None else 1
+            # Stale results are served, but are no samples of the traffic.
+            stale = _is_stale(result)
+            duration = None if stale else _total_duration(result)
+            self.schedules[entry_id].record(now, duration, slowdown)
+            if entry_id in self.predictors and not stale:
+                self.predictors[entry_id].record_live(int(now.timestamp()), duration)
+            # History is kept for single routes with fixed points only.
+            if (
+                not stale
+                and entry_id not in self.live_origins
+                and isinstance(result, dict)
+                and result.get("duration") is not None
+            ):
+                samples[entry_id] = (
+                    int(now.timestamp()), int(result["duration"]), int(result.get("distance") or 0)
+                )
+
+        if self.history is not None and samples:
+            await self.history.async_record(samples)
+
+        if due and data == self.data:
+            # Listeners are only notified of changed data, but the due
+            # routes were rescheduled.
+            self.async_update_listeners()
+        return data
@@ -0,0 +1,74 @@
+"""Diagnostics support for KR ETA."""
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_KAKAODEVELOPERS_API_KEY,
+    CONF_VWORLD_API_KEY,
+    DATA_COORDINATOR,
+    DATA_GEOCACHE,
+    DATA_HISTORY,
+    DATA_LIMITERS,
+    DATA_RESILIENCE,
+    DATA_SESSIONS,
+    DATA_SPATIAL,
+    DOMAIN,
+)
+
+TO_REDACT = {CONF_VWORLD_API_KEY, CONF_KAKAODEVELOPERS_API_KEY}
+
+
+def _scrub(data: Any, secrets: list[str]) -> Any:
+    """Replace secrets inside strings, e.g. API keys in error messages."""
+    if isinstance(data, str):
+        for secret in secrets:
+            data = data.replace(secret, REDACTED)
+        return data
+    if isinstance(data, dict):
+        return {key: _scrub(value, secrets) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_scrub(value, secrets) for value in data]
+    return data
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinator = domain_data.get(DATA_COORDINATOR)
+    geocache = domain_data.get(DATA_GEOCACHE)
+    limiters = domain_data.get(DATA_LIMITERS)
+    resilience = domain_data.get(DATA_RESILIENCE)
+    history = domain_data.get(DATA_HISTORY)
+    spatial = domain_data.get(DATA_SPATIAL)
+    sessions = domain_data.get(DATA_SESSIONS)
+    secrets = [entry.data[key] for key in TO_REDACT if entry.data.get(key)]
+
+    return _scrub({
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "routes": len(coordinator.routes),
+            "coalesced_requests": coordinator.flight.saved,
+            "eta_cache": coordinator.eta_cache.stats,
+            "skipped_writes": coordinator.skipped_writes,
+            "metrics": coordinator.metrics[entry.entry_id].stats
+            if entry.entry_id in coordinator.metrics else None,
+            # The sensor state is only written when the ETA changes, so the
+            # next refresh is reported here.
+            "schedule": coordinator.schedules[entry.entry_id].stats
+            if entry.entry_id in coordinator.schedules else None,
+            "predictor": coordinator.predictors[entry.entry_id].stats
+            if entry.entry_id in coordinator.predictors else None,
+        } if coordinator is not None else None,
+        "geocache": geocache.stats if geocache is not None else None,
+        "quota": limiters.stats if limiters is not None else None,
+        "resilience": resilience.stats if resilience is not None else None,
+        "spatial": spatial.stats if spatial is not None else None,
+        "sessions": sessions.stats if sessions is not None else None,
+        "history": history.routes[entry.entry_id].stats
+        if history is not None and entry.entry_id in history.routes else None,
+    }, secrets)
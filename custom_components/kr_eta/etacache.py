@@ -0,0 +1,94 @@
+"""Short-lived cache of ETA responses."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from .const import ETA_CACHE_ERROR_TTL, ETA_CACHE_STALE_TTL, ETA_CACHE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _mark_stale(value):
+    """Copy a cached value with its summaries tagged "stale"."""
+    if isinstance(value, dict):
+        return {**value, "stale": True}
+    if isinstance(value, list):
+        return [_mark_stale(v) for v in value]
+    return value
+
+
+class EtaCache:
+    """Cache ETA summaries with stale-while-revalidate semantics.
+
+    Up to ``ttl`` seconds old a cached summary is served as is. Up to
+    ``stale_ttl`` it is served while a refresh runs in the background. If
+    the upstream call fails, a summary up to ``error_ttl`` old is served
+    instead of the error. Summaries served past ``ttl`` are tagged "stale".
+    """
+
+    def __init__(
+        self,
+        ttl: float = ETA_CACHE_TTL,
+        stale_ttl: float = ETA_CACHE_STALE_TTL,
+        error_ttl: float = ETA_CACHE_ERROR_TTL,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.error_hits = 0
+        self.misses = 0
+
+    async def async_get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        entry = self._entries.get(key)
+        age = time.monotonic() - entry[0] if entry is not None else None
+
+        if age is not None and age < self.ttl:
+            self.hits += 1
+            return entry[1]
+
+        if age is not None and age < self.stale_ttl:
+            self.stale_hits += 1
+            task = asyncio.ensure_future(self._async_fetch(key, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._revalidated)
+            return _mark_stale(entry[1])
+
+        self.misses += 1
+        try:
+            return await self._async_fetch(key, fetch)
+        except Exception as e:
+            if age is None or age >= self.error_ttl:
+                raise
+            self.error_hits += 1
+            _LOGGER.warning("Serving %d seconds old ETA after error: %s", age, e)
+            return _mark_stale(entry[1])
+
+    async def _async_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        value = await fetch()
+        now = time.monotonic()
+        self._entries[key] = (now, value)
+        # Nothing older than error_ttl is ever served.
+        for k in [k for k, (t, _) in self._entries.items() if now - t >= self.error_ttl]:
+            del self._entries[k]
+
+        return value
+
+    def _revalidated(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.debug("Background ETA refresh failed: %s", task.exception())
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "error_hits": self.error_hits,
+            "misses": self.misses,
+        }
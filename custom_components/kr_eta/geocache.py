@@ -0,0 +1,125 @@
+"""Persistent cache of VWorld geocoding results."""
+from collections import OrderedDict
+import time
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_GEOCACHE,
+    DOMAIN,
+    GEOCACHE_MAX_SIZE,
+    GEOCACHE_NOT_FOUND_TTL,
+    GEOCACHE_SAVE_DELAY,
+    GEOCACHE_TTL,
+    STORAGE_VERSION,
+)
+
+STORAGE_KEY = f"{DOMAIN}.geocache"
+
+
+class GeoCache:
+    """LRU cache of address -> (x, y), with expiry.
+
+    A cached value of None means the address was NOT_FOUND.
+    """
+
+    def __init__(
+        self,
+        store: Optional[Store] = None,
+        max_size: int = GEOCACHE_MAX_SIZE,
+        ttl: float = GEOCACHE_TTL.total_seconds(),
+        not_found_ttl: float = GEOCACHE_NOT_FOUND_TTL.total_seconds(),
+    ):
+        self.store = store
+        self.max_size = max_size
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self._entries: OrderedDict[str, tuple[float, Optional[tuple]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(address: str, crs: str) -> str:
+        return f"{crs.lower()}|{' '.join(address.split()).lower()}"
+
+    def get(self, key: str) -> tuple[bool, Optional[tuple]]:
+        """Return (found, point) for a key."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: str, point: tuple):
+        self._set(key, tuple(point), self.ttl)
+
+    def set_not_found(self, key: str):
+        self._set(key, None, self.not_found_ttl)
+
+    def _set(self, key: str, point: Optional[tuple], ttl: float):
+        self._entries[key] = (time.time() + ttl, point)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        if self.store is not None:
+            self.store.async_delay_save(self._data_to_save, GEOCACHE_SAVE_DELAY)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def async_load(self):
+        if self.store is None:
+            return
+
+        data = await self.store.async_load()
+        if not data:
+            return
+
+        now = time.time()
+        # Loaded entries, in their saved order, are less recently used than
+        # those set since startup.
+        entries = OrderedDict(
+            (key, (expires, tuple(point) if point is not None else None))
+            for key, expires, point in data.get("entries", [])
+            if expires >= now and key not in self._entries
+        )
+        entries.update(self._entries)
+        self._entries = entries
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _data_to_save(self) -> dict:
+        return {
+            "entries": [
+                [key, expires, point]
+                for key, (expires, point) in self._entries.items()
+            ]
+        }
+
+
+async def async_get_geocache(hass: HomeAssistant) -> GeoCache:
+    """Return the geocode cache shared by all entries and config flows."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_GEOCACHE not in domain_data:
+        cache = GeoCache(Store(hass, STORAGE_VERSION, STORAGE_KEY))
+        domain_data[DATA_GEOCACHE] = cache
+        await cache.async_load()
+
+    return domain_data[DATA_GEOCACHE]
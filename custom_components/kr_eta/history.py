@@ -0,0 +1,280 @@
+"""Compact local history of route ETAs.
+
+Every route has two files under .storage/kr_eta_history:
+
+- <entry_id>.bin, append-only raw samples of (timestamp, duration, distance)
+  packed in 12 bytes each, kept for HISTORY_RAW_RETENTION.
+- <entry_id>.rollup, a snapshot of the 5-minute, hourly and hour-of-week
+  buckets, rewritten when an hour ends. Raw samples newer than the snapshot
+  are replayed into the buckets on load.
+
+This keeps history out of the recorder, which stores a full row with every
+attribute for each state change.
+"""
+import logging
+import os
+import struct
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_HISTORY,
+    DOMAIN,
+    HISTORY_5MIN_RETENTION,
+    HISTORY_HOURLY_RETENTION,
+    HISTORY_RAW_RETENTION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DIR = f"{DOMAIN}_history"
+
+SAMPLE = struct.Struct("<Iii")  # timestamp, duration (s), distance (m)
+HEADER = struct.Struct("<4sII")  # magic, saved until, number of buckets
+BUCKET = struct.Struct("<BIIIIdd")  # kind, start, count, min, max, sums
+MAGIC = b"KRH1"
+
+FIVE_MINUTES = 300
+HOUR = 3600
+
+KIND_5MIN = 0
+KIND_HOURLY = 1
+KIND_WEEKLY = 2
+
+
+def _bucket_add(buckets: dict, start: int, duration: int, distance: int):
+    """Add a sample to a [count, min, max, sum_duration, sum_distance] bucket."""
+    bucket = buckets.get(start)
+    if bucket is None:
+        buckets[start] = [1, duration, duration, duration, distance]
+        return
+    bucket[0] += 1
+    bucket[1] = min(bucket[1], duration)
+    bucket[2] = max(bucket[2], duration)
+    bucket[3] += duration
+    bucket[4] += distance
+
+
+def _bucket_stats(start: int, bucket: list) -> dict:
+    count, low, high, sum_duration, sum_distance = bucket
+    return {
+        "start": start,
+        "count": count,
+        "min": low,
+        "max": high,
+        "mean": sum_duration / count,
+        "distance": sum_distance / count,
+    }
+
+
+def hour_of_week(timestamp: int) -> int:
+    """Return the local hour of the week, 0 being Monday 00:00-01:00."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    return local.weekday() * 24 + local.hour
+
+
+class RouteHistory:
+    """ETA samples of a route, rolled up into buckets.
+
+    Buckets are keyed by start timestamp, weekly ones by hour of the week.
+    File methods block and are run in the executor.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.minutes: dict[int, list] = {}
+        self.hours: dict[int, list] = {}
+        self.weekly: dict[int, list] = {}
+        self.last_sample = 0
+        self.saved_until = 0
+
+    @property
+    def rollup_path(self) -> str:
+        return f"{self.path}.rollup"
+
+    def add(self, timestamp: int, duration: int, distance: int) -> bool:
+        """Add a sample to the buckets.
+
+        Returns True when the sample starts a new hour, after which the
+        rollups should be saved.
+        """
+        new_hour = timestamp // HOUR != self.last_sample // HOUR
+        self.last_sample = max(self.last_sample, timestamp)
+
+        _bucket_add(self.minutes, timestamp - timestamp % FIVE_MINUTES, duration, distance)
+        _bucket_add(self.hours, timestamp - timestamp % HOUR, duration, distance)
+        _bucket_add(self.weekly, hour_of_week(timestamp), duration, distance)
+        return new_hour
+
+    def prune(self, now: int):
+        """Drop buckets past their retention."""
+        for buckets, retention in (
+            (self.minutes, HISTORY_5MIN_RETENTION),
+            (self.hours, HISTORY_HOURLY_RETENTION),
+        ):
+            cutoff = now - retention.total_seconds()
+            for start in [s for s in buckets if s < cutoff]:
+                del buckets[start]
+
+    def series(self, resolution: str = "hourly") -> list[dict]:
+        """Return the buckets of a resolution: 5min, hourly or weekly."""
+        buckets = {"5min": self.minutes, "hourly": self.hours, "weekly": self.weekly}[resolution]
+        return [_bucket_stats(start, buckets[start]) for start in sorted(buckets)]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "last_sample": self.last_sample,
+            "5min_buckets": len(self.minutes),
+            "hourly_buckets": len(self.hours),
+            "weekly_buckets": len(self.weekly),
+        }
+
+    def append(self, timestamp: int, duration: int, distance: int):
+        """Append a raw sample to the sample file."""
+        with open(self.path, "ab") as f:
+            f.write(SAMPLE.pack(timestamp, duration, distance))
+
+    def read_samples(self) -> list[tuple[int, int, int]]:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        # A torn trailing record from a crash is ignored.
+        usable = len(data) - len(data) % SAMPLE.size
+        return list(SAMPLE.iter_unpack(data[:usable]))
+
+    def load(self):
+        """Load the rollup snapshot and replay newer raw samples."""
+        try:
+            with open(self.rollup_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+
+        if data:
+            magic, self.saved_until, count = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError(f"{self.rollup_path} is not a history file")
+            kinds = {KIND_5MIN: self.minutes, KIND_HOURLY: self.hours, KIND_WEEKLY: self.weekly}
+            for i in range(count):
+                kind, start, *bucket = BUCKET.unpack_from(data, HEADER.size + i * BUCKET.size)
+                kinds[kind][start] = bucket
+            self.last_sample = self.saved_until
+
+        for timestamp, duration, distance in self.read_samples():
+            if timestamp > self.saved_until:
+                self.add(timestamp, duration, distance)
+
+    def save(self, now: int):
+        """Write the rollup snapshot and drop raw samples past retention."""
+        self.prune(now)
+
+        buckets = [
+            BUCKET.pack(kind, start, *bucket)
+            for kind, kind_buckets in (
+                (KIND_5MIN, self.minutes),
+                (KIND_HOURLY, self.hours),
+                (KIND_WEEKLY, self.weekly),
+            )
+            for start, bucket in kind_buckets.items()
+        ]
+        self._write(self.rollup_path, HEADER.pack(MAGIC, self.last_sample, len(buckets)) + b"".join(buckets))
+        self.saved_until = self.last_sample
+
+        cutoff = now - HISTORY_RAW_RETENTION.total_seconds()
+        samples = self.read_samples()
+        if samples and samples[0][0] < cutoff:
+            self._write(self.path, b"".join(
+                SAMPLE.pack(*sample) for sample in samples if sample[0] >= cutoff
+            ))
+
+    def remove(self):
+        for path in (self.path, self.rollup_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class HistoryStore:
+    """The histories of all routes, written in one executor job per cycle."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.routes: dict[str, RouteHistory] = {}
+
+    def _path(self, entry_id: str) -> str:
+        return self.hass.config.path(".storage", HISTORY_DIR, f"{entry_id}.bin")
+
+    async def async_load_route(self, entry_id: str) -> RouteHistory:
+        history = RouteHistory(self._path(entry_id))
+
+        def load():
+            os.makedirs(os.path.dirname(history.path), exist_ok=True)
+            history.load()
+
+        try:
+            await self.hass.async_add_executor_job(load)
+        except (OSError, ValueError, struct.error) as e:
+            _LOGGER.warning("Discarding unreadable ETA history of %s: %s", entry_id, e)
+            history = RouteHistory(history.path)
+
+        self.routes[entry_id] = history
+        return history
+
+    async def async_record(self, samples: dict[str, tuple[int, int, int]]):
+        """Record (timestamp, duration, distance) samples by entry id."""
+        writes = []
+        for entry_id, sample in samples.items():
+            history = self.routes.get(entry_id)
+            if history is None:
+                continue
+            writes.append((history, sample, history.add(*sample)))
+
+        if writes:
+            await self.hass.async_add_executor_job(self._write, writes)
+
+    @staticmethod
+    def _write(writes):
+        for history, sample, new_hour in writes:
+            history.append(*sample)
+            if new_hour:
+                history.save(sample[0])
+
+    async def async_unload_route(self, entry_id: str):
+        history = self.routes.pop(entry_id, None)
+        if history is not None:
+            await self.hass.async_add_executor_job(
+                history.save, int(dt_util.utcnow().timestamp())
+            )
+
+    async def async_remove_route(self, entry_id: str):
+        """Delete the files of a removed route."""
+        self.routes.pop(entry_id, None)
+        await self.hass.async_add_executor_job(RouteHistory(self._path(entry_id)).remove)
+
+    @property
+    def stats(self) -> dict:
+        return {entry_id: history.stats for entry_id, history in self.routes.items()}
+
+
+@callback
+def async_get_history(hass: HomeAssistant) -> HistoryStore:
+    """Return the history store shared by all entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_HISTORY not in domain_data:
+        domain_data[DATA_HISTORY] = HistoryStore(hass)
+
+    return domain_data[DATA_HISTORY]
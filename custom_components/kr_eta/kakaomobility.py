@@ -1,62 +1,362 @@
-import requests
+import asyncio
+from datetime import datetime
+import json
+import logging
+import time
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import aiohttp
+import async_timeout
+
+from .etacache import EtaCache
+from .metrics import RouteMetrics, span
+from .ratelimit import ApiKeyLimiter
+from .resilience import Resilience, UpstreamError
+from .routeparser import RouteParser
+from .singleflight import SingleFlight
 from .vworld import Location
 
+_LOGGER = logging.getLogger(__name__)
+
 
 # curl -v -X GET "https://apis-navi.kakaomobility.com/v1/directions?origin=127.10764191124568,37.402464820205246,angle=270&destination=127.11056336672839,37.39419693653072&summary=false&waypoints=127.17354989857544,37.36629687436494&priority=RECOMMEND&car_fuel=GASOLINE&car_hipass=false&alternatives=false&road_details=false" \
 #   -H "Authorization: KakaoAK ${REST_API_KEY}" // 카카오디벨로퍼스에서 발급 받은 API 키 값
 
+# curl -v -X POST "https://apis-navi.kakaomobility.com/v1/destinations/directions" \
+#   -H "Authorization: KakaoAK ${REST_API_KEY}" -H "Content-Type: application/json" \
+#   -d '{"origin":{"x":"127.1","y":"37.4"},"destinations":[{"x":"127.2","y":"37.5","key":"0"}],"radius":10000}'
+
+MAX_WAYPOINTS = 5
+
+# Multi-destination directions accept up to 30 destinations within 10 km of the origin.
+MAX_DESTINATIONS = 30
+MAX_DESTINATION_RADIUS = 10000
+
+# Future directions take a departure time in Korea Standard Time.
+KST = ZoneInfo("Asia/Seoul")
+
+# Priorities fetched when comparing routes.
+PRIORITIES = ("RECOMMEND", "TIME", "DISTANCE")
+
+# Detailed responses are parsed as they arrive, this many bytes at a time.
+DETAIL_CHUNK_SIZE = 16384
+
 
 class Navi:
-    def __init__(self, apikey: str):
+    def __init__(
+        self,
+        apikey: str,
+        session: aiohttp.ClientSession,
+        flight: Optional[SingleFlight] = None,
+        cache: Optional[EtaCache] = None,
+        limiter: Optional[ApiKeyLimiter] = None,
+        resilience: Optional[Resilience] = None,
+        detailed: bool = False,
+    ):
         self.apikey = apikey
+        self.session = session
+        self.flight = flight
+        self.cache = cache
+        self.limiter = limiter
+        self.resilience = resilience
+        self.detailed = detailed
+        self.compare_priorities = False
+        self.metrics: Optional[RouteMetrics] = None
+        self.host = "apis-navi.kakaomobility.com"
         self.apiurl = "https://apis-navi.kakaomobility.com/v1/directions"
-        self.rs = requests.Session()
-        self.rs.headers.update({
+        self.multi_apiurl = "https://apis-navi.kakaomobility.com/v1/destinations/directions"
+        self.future_apiurl = "https://apis-navi.kakaomobility.com/v1/future/directions"
+        self.headers = {
             "Authorization": f"KakaoAK {apikey}"
-        })
+        }
         self.startpoint = None
         self.endpoint = None
         self.waypoints = []
+        self.destinations = []
+        # Encoded route parameters, rebuilt when the route changes.
+        self._params: Optional[dict] = None
+        self._key: Optional[tuple] = None
+        self._multi_body: Optional[dict] = None
+        self._multi_key: Optional[str] = None
 
     def set_startpoint(self, point: Location):
         self.startpoint = point
+        self._update_params()
 
     def set_endpoint(self, point: Location):
         self.endpoint = point
-        
+        self._update_params()
+
     def set_waypoints(self, points: list[Location]):
-        if len(points) > 5:
-            raise ValueError("Waypoints must be less than 5")
+        if len(points) > MAX_WAYPOINTS:
+            raise ValueError(f"Waypoints must be less than {MAX_WAYPOINTS}")
 
-        self.waypoints = points
+        self.waypoints = list(points)
+        self._update_params()
 
-    def _point_to_param_str(self, point: Location):
-        ret = f"{point.x},{point.y}"
-        if point.name is not None:
-            ret += f",name={point.name}"
+    def set_destinations(self, points: list[Location]):
+        if len(points) > MAX_DESTINATIONS:
+            raise ValueError(f"Destinations must be less than {MAX_DESTINATIONS}")
 
-        return ret
+        self.destinations = list(points)
+        self._update_params()
 
-    def get_eta(self):
-        if self.startpoint is None or self.endpoint is None:
+    def _update_params(self):
+        self._params = None
+        self._key = None
+        if self.startpoint is not None and self.endpoint is not None:
+            self._params = {
+                "origin": self.startpoint.param,
+                "destination": self.endpoint.param,
+                "summary": "true",
+            }
+            if len(self.waypoints) > 0:
+                self._params["waypoints"] = "|".join(p.param for p in self.waypoints)
+            self._key = tuple(sorted(self._params.items()))
+
+        self._multi_body = None
+        self._multi_key = None
+        if self.startpoint is not None and self.destinations:
+            self._multi_body = {
+                "origin": {"x": str(self.startpoint.x), "y": str(self.startpoint.y)},
+                "destinations": [
+                    {"x": str(p.x), "y": str(p.y), "key": str(i)}
+                    for i, p in enumerate(self.destinations)
+                ],
+                "radius": MAX_DESTINATION_RADIUS,
+                "priority": "TIME", # TIME, DISTANCE
+            }
+            self._multi_key = json.dumps(self._multi_body, sort_keys=True)
+
+    def _route_params(self, priority: str) -> dict:
+        if self._params is None:
             raise ValueError("Startpoint or endpoint is not set")
 
-        params = {
-            "origin": self._point_to_param_str(self.startpoint),
-            "destination": self._point_to_param_str(self.endpoint),
-            "priority": "RECOMMEND", # RECOMMEND, TIME, DISTANCE
-            "summary": "true",
+        return {**self._params, "priority": priority}
+
+    def _route_key(self, url: str, priority: str, *extra: tuple[str, str]) -> tuple:
+        """Return the cache key of a route request.
+
+        extra holds the parameters added to, or overriding, the route params.
+        """
+        return (url, self.apikey, self._key, ("priority", priority), *extra)
+
+    async def async_get_eta(self):
+        """Get the summary of the route.
+
+        In detailed mode the summary also has a "detail" RouteDetail with
+        the sections and roads of the route. When comparing priorities it is
+        the summary of the fastest option, see async_get_options.
+        """
+        if self.compare_priorities:
+            return await self.async_get_options()
+
+        params = self._route_params("RECOMMEND")
+        fetch = self._async_fetch
+        extra = ()
+        if self.detailed:
+            extra = (("summary", "false"), ("road_details", "true"))
+            params.update(extra)
+            fetch = self._async_fetch_detail
+
+        key = self._route_key(self.apiurl, "RECOMMEND", *extra)
+        return await self._async_cached(key, lambda: fetch(params))
+
+    async def async_get_future_eta(self, departure: datetime):
+        """Get the summary of the route when leaving at a future time.
+
+        Kakao plans future routes at minute resolution.
+        """
+        params = self._route_params("RECOMMEND")
+        params["departure_time"] = departure.astimezone(KST).strftime("%Y%m%d%H%M")
+
+        key = self._route_key(
+            self.future_apiurl, "RECOMMEND", ("departure_time", params["departure_time"])
+        )
+        return await self._async_cached(
+            key, lambda: self._async_fetch(params, self.future_apiurl)
+        )
+
+    async def async_get_options(self):
+        """Get the fastest route over every priority and its alternatives.
+
+        All priorities are requested concurrently. Identical routes found by
+        several priorities are listed once, in "options", with their delta
+        to the fastest duration.
+        """
+        results = await asyncio.gather(
+            *(self._async_get_routes(priority) for priority in PRIORITIES),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+        options = []
+        seen = set()
+        for priority, summaries in zip(PRIORITIES, results):
+            if isinstance(summaries, BaseException):
+                _LOGGER.warning("Failed to get %s routes: %s", priority, summaries)
+                continue
+            for summary in summaries:
+                route_id = (summary.get("distance"), summary.get("duration"))
+                if route_id in seen:
+                    continue
+                seen.add(route_id)
+                options.append({**summary, "priority": priority})
+
+        fastest = min(options, key=lambda o: o.get("duration"))
+        return {
+            **fastest,
+            "options": [
+                {
+                    "priority": o["priority"],
+                    "distance": o.get("distance"),
+                    "duration": o.get("duration"),
+                    "delta": o.get("duration") - fastest.get("duration"),
+                }
+                for o in options
+            ],
         }
 
-        if len(self.waypoints) > 0:
-            params["waypoints"] = "|".join([self._point_to_param_str(p) for p in self.waypoints])
+    async def _async_get_routes(self, priority: str):
+        params = self._route_params(priority)
+        params["alternatives"] = "true"
+
+        key = self._route_key(self.apiurl, priority, ("alternatives", "true"))
+        return await self._async_cached(key, lambda: self._async_fetch_routes(params))
+
+    async def async_get_etas(self):
+        """Get the summary to every destination with one request.
 
-        response = self.rs.get(self.apiurl, params=params)
-        if not response.status_code == 200:
-            raise Exception(f"Failed to get eta: {response.status_code}")
+        Returns a list in destination order, with None for destinations
+        Kakao could not route.
+        """
+        if self._multi_body is None:
+            raise ValueError("Startpoint or destinations are not set")
 
-        data = response.json().get("routes")[0]
+        body = self._multi_body
+        key = (self.multi_apiurl, self.apikey, self._multi_key)
+        return await self._async_cached(key, lambda: self._async_fetch_multi(body))
+
+    async def _async_cached(self, key, fetch):
+        if self.cache is None:
+            return await self._async_request(key, fetch)
+
+        return await self.cache.async_get(key, lambda: self._async_request(key, fetch))
+
+    async def _async_request(self, key, fetch):
+        if self.flight is None:
+            return await self._async_resilient(fetch)
+
+        # Routes with identical parameters share one upstream request.
+        return await self.flight.async_do(key, lambda: self._async_resilient(fetch))
+
+    async def _async_resilient(self, fetch):
+        if self.resilience is None:
+            return await fetch()
+
+        return await self.resilience.async_call(self.host, fetch)
+
+    async def _async_acquire(self):
+        if self.limiter is not None:
+            with span(self.metrics, "rate_limit"):
+                await self.limiter.async_acquire()
+
+    def _observe(self, name: str, start: float):
+        if self.metrics is not None:
+            self.metrics.observe(name, time.perf_counter() - start)
+
+    async def _async_get_json(self, params: dict, url: Optional[str] = None):
+        await self._async_acquire()
+
+        start = time.perf_counter()
+        async with async_timeout.timeout(10):
+            async with self.session.get(url or self.apiurl, params=params, headers=self.headers) as response:
+                if not response.status == 200:
+                    raise UpstreamError.from_status(f"Failed to get eta: {response.status}", response.status)
+
+                await response.read()
+                self._observe("network", start)
+                # The body is read, so this only decodes it.
+                with span(self.metrics, "decode"):
+                    return await response.json()
+
+    async def _async_fetch(self, params: dict, url: Optional[str] = None):
+        data = await self._async_get_json(params, url)
+
+        data = data.get("routes")[0]
         if not data.get("result_code") == 0:
-            raise Exception(f"Failed to get eta: result_code={data.get('result_code')}, result_msg={data.get('result_msg')}")
+            raise UpstreamError(f"Failed to get eta: result_code={data.get('result_code')}, result_msg={data.get('result_msg')}")
+
+        return data.get("summary")
+
+    async def _async_fetch_routes(self, params: dict):
+        """Return the summaries of every route found, alternatives included."""
+        data = await self._async_get_json(params)
+
+        routes = data.get("routes", [])
+        summaries = [r.get("summary") for r in routes if r.get("result_code") == 0]
+        if not summaries:
+            route = routes[0] if routes else {}
+            raise UpstreamError(f"Failed to get eta: result_code={route.get('result_code')}, result_msg={route.get('result_msg')}")
+
+        return summaries
+
+    async def _async_fetch_detail(self, params: dict):
+        await self._async_acquire()
+
+        parser = RouteParser()
+        start = time.perf_counter()
+        decode = 0.0
+        async with async_timeout.timeout(10):
+            async with self.session.get(self.apiurl, params=params, headers=self.headers) as response:
+                if not response.status == 200:
+                    raise UpstreamError.from_status(f"Failed to get eta: {response.status}", response.status)
+
+                try:
+                    async for chunk in response.content.iter_chunked(DETAIL_CHUNK_SIZE):
+                        chunk_start = time.perf_counter()
+                        parser.feed(chunk)
+                        decode += time.perf_counter() - chunk_start
+                    parser.close()
+                except ValueError as e:
+                    raise UpstreamError(f"Failed to parse eta: {e}") from e
+
+        # Parsing is interleaved with the transfer; split the two.
+        if self.metrics is not None:
+            self.metrics.observe("decode", decode)
+            self.metrics.observe("network", time.perf_counter() - start - decode)
+
+        if not parser.result_code == 0:
+            raise UpstreamError(f"Failed to get eta: result_code={parser.result_code}, result_msg={parser.result_msg}")
+
+        return {**(parser.summary or {}), "detail": parser.detail}
+
+    async def _async_fetch_multi(self, body: dict):
+        await self._async_acquire()
+
+        start = time.perf_counter()
+        async with async_timeout.timeout(10):
+            async with self.session.post(self.multi_apiurl, json=body, headers=self.headers) as response:
+                if not response.status == 200:
+                    raise UpstreamError.from_status(f"Failed to get etas: {response.status}", response.status)
+
+                await response.read()
+                self._observe("network", start)
+                with span(self.metrics, "decode"):
+                    data = await response.json()
+
+        summaries = [None] * len(body["destinations"])
+        for route in data.get("routes", []):
+            i = int(route.get("key"))
+            if not route.get("result_code") == 0:
+                _LOGGER.warning(
+                    "Failed to get eta to %s: result_code=%s, result_msg=%s",
+                    self.destinations[i], route.get("result_code"), route.get("result_msg"),
+                )
+                continue
+            summaries[i] = route.get("summary")
 
-        return data.get("summary")
\ No newline at end of file
+        return summaries
@@ -0,0 +1,216 @@
+"""Route origin that follows a device tracker."""
+from datetime import datetime, timedelta
+import logging
+import math
+from typing import NamedTuple, Optional
+
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .kakaomobility import Navi
+from .routeparser import RouteDetail
+from .spatial import METERS_PER_DEGREE, SpatialCache, distance
+from .vworld import GeoCoder, Location
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Projection(NamedTuple):
+    road: int
+    # Part of the road already driven, 0 to 1.
+    fraction: float
+    # Meters between the point and the route.
+    offset: float
+
+
+def project(detail: RouteDetail, x: float, y: float) -> Optional[Projection]:
+    """Return the point of the route closest to x, y."""
+    vertexes = detail.vertexes
+    roads = detail.road_vertexes
+    vertex_count = len(vertexes) // 2
+    # Coordinates are scaled to meters around the point, which is the origin.
+    kx = METERS_PER_DEGREE * math.cos(math.radians(y))
+    ky = METERS_PER_DEGREE
+
+    best = None
+    best_offset = math.inf
+    best_along = best_length = 0.0
+    for road in range(len(roads)):
+        first = roads[road]
+        last = roads[road + 1] if road + 1 < len(roads) else vertex_count
+        length = 0.0
+        ax = (vertexes[2 * first] - x) * kx
+        ay = (vertexes[2 * first + 1] - y) * ky
+        for i in range(first + 1, last):
+            bx = (vertexes[2 * i] - x) * kx
+            by = (vertexes[2 * i + 1] - y) * ky
+            dx, dy = bx - ax, by - ay
+            segment = math.hypot(dx, dy)
+            t = 0.0
+            if segment > 0:
+                t = min(max(-(ax * dx + ay * dy) / (segment * segment), 0.0), 1.0)
+            offset = math.hypot(ax + t * dx, ay + t * dy)
+            if offset < best_offset:
+                best, best_offset, best_along = road, offset, length + t * segment
+            length += segment
+            ax, ay = bx, by
+        if best == road:
+            best_length = length
+
+    if best is None:
+        return None
+    fraction = best_along / best_length if best_length > 0 else 0.0
+    return Projection(best, fraction, best_offset)
+
+
+def estimate(summary: dict, projection: Projection) -> dict:
+    """Estimate what is left of a route summary from a projection onto its
+    detail.
+
+    Roads are weighted by their duration and distance, scaled so the whole
+    route matches the summary.
+    """
+    detail: RouteDetail = summary["detail"]
+    road = projection.road
+    left = 1 - projection.fraction
+
+    estimated = {k: v for k, v in summary.items() if k not in ("detail", "options")}
+    for key, values in (("duration", detail.road_durations), ("distance", detail.road_distances)):
+        total = sum(values)
+        if not total or summary.get(key) is None:
+            continue
+        remaining = values[road] * left + sum(values[road + 1:])
+        estimated[key] = round(summary[key] * remaining / total)
+    estimated["estimated"] = True
+    return estimated
+
+
+class LiveOrigin:
+    """Move the origin of a route along with a device tracker.
+
+    The route is fetched again only once the tracker is min_distance meters
+    from the origin of the last fetch, or off the route by as much, or
+    max_age after the last fetch. Other updates project the tracker onto the
+    detail of the last live route to estimate what is left of it.
+
+    Fetched origins are snapped onto recent ones nearby, and named after
+    their road address, so close-by positions share directions.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator,
+        entry_id: str,
+        navi: Navi,
+        entity_id: str,
+        min_distance: float,
+        max_age: timedelta,
+        spatial: Optional[SpatialCache] = None,
+        geocoder: Optional[GeoCoder] = None,
+    ):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self.navi = navi
+        self.entity_id = entity_id
+        self.min_distance = min_distance
+        self.max_age = max_age
+        self.spatial = spatial
+        self.geocoder = geocoder
+        # Origin and time of the last fetch requested.
+        self.origin: Optional[Location] = None
+        self.fetched_at: Optional[datetime] = None
+        self._base: Optional[dict] = None
+        self._requested_base: Optional[dict] = None
+
+    @callback
+    def async_setup(self) -> CALLBACK_TYPE:
+        """Start following the tracker; returns a function that stops."""
+        location = self._location(self.hass.states.get(self.entity_id))
+        if location is not None:
+            self._async_fetch(location, dt_util.now())
+
+        return async_track_state_change_event(
+            self.hass, [self.entity_id], self._async_state_changed
+        )
+
+    @staticmethod
+    def _location(state: Optional[State]) -> Optional[Location]:
+        if state is None:
+            return None
+        latitude = state.attributes.get(ATTR_LATITUDE)
+        longitude = state.attributes.get(ATTR_LONGITUDE)
+        if latitude is None or longitude is None:
+            return None
+        try:
+            return Location(name=state.name, x=longitude, y=latitude)
+        except ValueError:
+            return None
+
+    def _base_summary(self) -> Optional[dict]:
+        """Return the last live summary with a route detail."""
+        summary = (self.coordinator.data or {}).get(self.entry_id)
+        if summary is not None and not summary.get("estimated") and summary.get("detail") is not None:
+            self._base = summary
+        return self._base
+
+    @callback
+    def _async_state_changed(self, event: Event):
+        location = self._location(event.data.get("new_state"))
+        if location is None:
+            return
+
+        now = dt_util.now()
+        if (
+            self.origin is None
+            or self.fetched_at is None
+            or now - self.fetched_at >= self.max_age
+            or distance(self.origin.x, self.origin.y, location.x, location.y) >= self.min_distance
+        ):
+            self._async_fetch(location, now)
+            return
+
+        base = self._base_summary()
+        if base is None:
+            return
+        projection = project(base["detail"], location.x, location.y)
+        if projection is None:
+            return
+        if projection.offset >= self.min_distance:
+            # Off the route; fetch again, unless the last fetch is still
+            # pending.
+            if base is not self._requested_base:
+                self._async_fetch(location, now)
+            return
+
+        self.coordinator.async_set_route_data(self.entry_id, estimate(base, projection))
+
+    @callback
+    def _async_fetch(self, location: Location, now: datetime):
+        if self.spatial is not None:
+            x, y = self.spatial.snap_origin(location.x, location.y)
+            location = Location(name=location.name, x=x, y=y)
+
+        _LOGGER.debug("Fetching KR ETA route %s from %s", self.entry_id, location)
+        self.origin = location
+        self.fetched_at = now
+        self._requested_base = self._base_summary()
+        self.navi.set_startpoint(location)
+        self.hass.async_create_task(self._async_refresh(location))
+
+    async def _async_refresh(self, location: Location):
+        if self.geocoder is not None:
+            try:
+                address = await self.geocoder.getaddress(location.x, location.y)
+            except Exception as e:
+                _LOGGER.debug("Failed to get the address of %s: %s", location, e)
+                address = None
+            if self.origin is not location:
+                return  # A newer fetch took over.
+            if address:
+                self.navi.set_startpoint(Location(name=address, x=location.x, y=location.y))
+
+        await self.coordinator.async_refresh_route(self.entry_id)
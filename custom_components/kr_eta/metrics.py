@@ -0,0 +1,100 @@
+"""Timing spans, histograms and error counters of route updates."""
+from bisect import bisect_left
+from contextlib import contextmanager
+import time
+from typing import Optional
+
+# Upper bounds of the histogram buckets, in milliseconds.
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# queue: waiting for a request slot; rate_limit: waiting for the API key's
+# token bucket; network: request and body transfer; decode: JSON parsing;
+# write: state writes; total: fetching a route, once it has a slot.
+SPANS = ("queue", "rate_limit", "network", "decode", "write", "total")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the q quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 3),
+            "buckets": dict(zip([*map(str, BUCKETS_MS), "inf"], self.counts)),
+        }
+
+
+class RouteMetrics:
+    """Spans and errors of a route."""
+
+    def __init__(self):
+        self.spans = {name: Histogram() for name in SPANS}
+        self.errors: dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+
+    def observe(self, name: str, seconds: float):
+        self.spans[name].observe(seconds * 1000)
+
+    def error(self, err: Exception):
+        kind = type(err).__name__
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        self.last_error = f"{kind}: {err}"
+
+    def success(self):
+        self.last_success = time.time()
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "spans": {name: histogram.stats for name, histogram in self.spans.items()},
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+            "last_success": self.last_success,
+        }
+
+
+@contextmanager
+def span(metrics: Optional[RouteMetrics], name: str):
+    """Time a block into a span of metrics, if there are metrics."""
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, time.perf_counter() - start)
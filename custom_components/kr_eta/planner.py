@@ -0,0 +1,118 @@
+"""Find the latest departure that arrives on time."""
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from typing import Optional
+
+from .const import PLANNER_CONCURRENCY, PLANNER_HORIZON, PLANNER_MAX_CALLS, PLANNER_STEP
+from .kakaomobility import Navi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _align(moment: datetime, step: timedelta, up: bool) -> datetime:
+    """Round a time to a multiple of step."""
+    seconds = step.total_seconds()
+    offset = moment.timestamp() % seconds
+    if offset == 0:
+        return moment
+    return moment + timedelta(seconds=(seconds - offset) if up else -offset)
+
+
+class DeparturePlanner:
+    """Search departure slots coarse to fine with Kakao future directions.
+
+    Arrival time grows with departure time, so the slots that arrive on time
+    are a prefix of the search window. Every round probes a few slots spread
+    over the unresolved range, concurrently, and narrows the range to the
+    boundary between on-time and late probes. Results come from the shared
+    ETA cache when possible, and calls stop at max_calls.
+    """
+
+    def __init__(
+        self,
+        navi: Navi,
+        max_calls: int = PLANNER_MAX_CALLS,
+        concurrency: int = PLANNER_CONCURRENCY,
+        step: timedelta = PLANNER_STEP,
+    ):
+        self.navi = navi
+        self.max_calls = max_calls
+        self.concurrency = concurrency
+        self.step = step
+        self.calls = 0
+        self.durations: dict[datetime, Optional[int]] = {}
+
+    async def _async_evaluate(self, departures: list[datetime]) -> int:
+        """Fetch the durations of new departures; return how many were fetched."""
+        todo = [d for d in departures if d not in self.durations]
+        todo = todo[:self.max_calls - self.calls]
+        self.calls += len(todo)
+        await asyncio.gather(*(self._async_duration(d) for d in todo))
+        return len(todo)
+
+    async def _async_duration(self, departure: datetime):
+        try:
+            summary = await self.navi.async_get_future_eta(departure)
+        except Exception as e:
+            _LOGGER.warning("Failed to get eta departing at %s: %s", departure, e)
+            self.durations[departure] = None
+            return
+        self.durations[departure] = summary.get("duration")
+
+    def _on_time(self, departure: datetime, arrive_by: datetime) -> Optional[bool]:
+        duration = self.durations.get(departure)
+        if duration is None:
+            return None
+        return departure + timedelta(seconds=duration) <= arrive_by
+
+    async def async_plan(self, arrive_by: datetime, earliest: datetime) -> dict:
+        """Return the latest departure slot between earliest and arrive_by."""
+        start = _align(max(earliest, arrive_by - PLANNER_HORIZON), self.step, up=True)
+        end = _align(arrive_by, self.step, up=False)
+        slots = []
+        while start <= end:
+            slots.append(start)
+            start += self.step
+        if not slots:
+            raise ValueError("The arrival time is too soon")
+
+        best = None
+        late = len(slots)
+        lo, hi = 0, len(slots) - 1
+        while lo <= hi and self.calls < self.max_calls:
+            count = min(self.concurrency, self.max_calls - self.calls)
+            if hi - lo + 1 <= count:
+                probes = list(range(lo, hi + 1))
+            else:
+                probes = sorted({lo + (hi - lo) * (k + 1) // (count + 1) for k in range(count)})
+
+            if not await self._async_evaluate([slots[i] for i in probes]):
+                break
+
+            for i in probes:
+                on_time = self._on_time(slots[i], arrive_by)
+                if on_time is True and i < late:
+                    best = i if best is None else max(best, i)
+                elif on_time is False:
+                    late = min(late, i)
+            lo = best + 1 if best is not None else lo
+            hi = late - 1
+            if all(self.durations.get(slots[i]) is None for i in probes):
+                break  # Upstream is failing; don't spend the rest of the budget.
+
+        chosen = slots[best if best is not None else 0]
+        duration = self.durations.get(chosen)
+        return {
+            "departure": chosen.isoformat(),
+            "arrival": (chosen + timedelta(seconds=duration)).isoformat() if duration is not None else None,
+            "duration": duration,
+            "on_time": best is not None,
+            # The answer is exact when the next slot is known to be late.
+            "exact": best is not None and best + 1 == late,
+            "calls": self.calls,
+            "evaluated": [
+                {"departure": d.isoformat(), "duration": self.durations[d]}
+                for d in sorted(self.durations)
+            ],
+        }
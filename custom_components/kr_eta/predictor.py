@@ -0,0 +1,105 @@
+"""Predict ETAs from the history of a route.
+
+Hourly history buckets are grouped by hour of the week, and the 10th, 50th
+and 90th percentiles of their means form the profile of that slot. When a
+slot is narrow enough, its median is served instead of calling Kakao. The
+error budget bounds how far predictions may stray before a live refresh is
+forced.
+"""
+from statistics import quantiles
+from typing import Optional
+
+from .const import PREDICTOR_MAX_SKIPS, PREDICTOR_MIN_WEEKS
+from .history import HOUR, RouteHistory, hour_of_week
+
+
+class EtaPredictor:
+    """Quantile profile of a route per hour of the week."""
+
+    def __init__(
+        self,
+        history: RouteHistory,
+        error_budget: float,
+        min_weeks: int = PREDICTOR_MIN_WEEKS,
+        max_skips: int = PREDICTOR_MAX_SKIPS,
+    ):
+        """Initialize the predictor.
+
+        error_budget is the relative error (0.1 for 10%) predictions may
+        spend between live refreshes.
+        """
+        self.history = history
+        self.error_budget = error_budget
+        self.min_weeks = min_weeks
+        self.max_skips = max_skips
+        # hour of week -> (p10, p50, p90)
+        self.profile: dict[int, tuple[float, float, float]] = {}
+        self._built_hour = None
+        self._untrusted: set[int] = set()
+        self._spent = 0.0
+        self._skips = 0
+        self._last_prediction: Optional[tuple[int, float]] = None
+        self.predicted = 0
+        self.live = 0
+
+    def rebuild(self):
+        """Recompute the profile from the hourly history."""
+        slots: dict[int, list[float]] = {}
+        for start, bucket in self.history.hours.items():
+            count, _, _, sum_duration, _ = bucket
+            slots.setdefault(hour_of_week(start), []).append(sum_duration / count)
+
+        self.profile = {}
+        for slot, means in slots.items():
+            if len(means) < self.min_weeks:
+                continue
+            p10, p50, p90 = quantiles(means, n=10, method="inclusive")[0::4]
+            self.profile[slot] = (p10, p50, p90)
+        self._untrusted.clear()
+
+    def predict(self, timestamp: int) -> Optional[int]:
+        """Return a predicted duration, or None when a live refresh is due."""
+        if self._built_hour != timestamp // HOUR:
+            self._built_hour = timestamp // HOUR
+            self.rebuild()
+
+        slot = hour_of_week(timestamp)
+        band = self.profile.get(slot)
+        if band is None or slot in self._untrusted or self._skips >= self.max_skips:
+            return None
+
+        p10, p50, p90 = band
+        # Half the band is the expected error of serving the median.
+        cost = (p90 - p10) / 2 / p50
+        if self._spent + cost > self.error_budget:
+            return None
+
+        self._spent += cost
+        self._skips += 1
+        self.predicted += 1
+        self._last_prediction = (slot, p50)
+        return round(p50)
+
+    def record_live(self, timestamp: int, duration: Optional[int]):
+        """Check the last prediction against a live result."""
+        self.live += 1
+        self._spent = 0.0
+        self._skips = 0
+        if duration is None:
+            return
+
+        slot = hour_of_week(timestamp)
+        if self._last_prediction is not None and self._last_prediction[0] == slot:
+            error = abs(self._last_prediction[1] - duration) / duration
+            if error > self.error_budget:
+                # Traffic is off profile; stay live until the next rebuild.
+                self._untrusted.add(slot)
+        self._last_prediction = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "slots": len(self.profile),
+            "predicted": self.predicted,
+            "live": self.live,
+        }
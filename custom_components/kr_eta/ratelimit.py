@@ -0,0 +1,160 @@
+"""Client-side rate limiting and daily quota accounting per API key."""
+import asyncio
+import hashlib
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_LIMITERS,
+    DOMAIN,
+    QUOTA_SAVE_DELAY,
+    QUOTA_SLOWDOWN,
+    RATE_LIMITS,
+    STORAGE_VERSION,
+)
+
+STORAGE_KEY = f"{DOMAIN}.quota"
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def async_acquire(self):
+        # The lock keeps waiters in order.
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class ApiKeyLimiter:
+    """Rate limit and count the calls made with one API key."""
+
+    def __init__(self, registry: "RateLimiterRegistry", service: str, rate: float, burst: float, daily_quota: int):
+        self.registry = registry
+        self.service = service
+        self.bucket = TokenBucket(rate, burst)
+        self.daily_quota = daily_quota
+        self.day = dt_util.now().date().isoformat()
+        self.calls = 0
+
+    def _roll_day(self):
+        today = dt_util.now().date().isoformat()
+        if today != self.day:
+            self.day = today
+            self.calls = 0
+
+    @property
+    def calls_today(self) -> int:
+        self._roll_day()
+        return self.calls
+
+    @property
+    def usage(self) -> float:
+        return self.calls_today / self.daily_quota
+
+    @property
+    def slowdown(self) -> int:
+        """Return how much to stretch polling intervals as the quota runs out."""
+        usage = self.usage
+        factor = 1
+        for threshold, threshold_factor in QUOTA_SLOWDOWN:
+            if usage >= threshold:
+                factor = threshold_factor
+        return factor
+
+    async def async_acquire(self):
+        """Wait for a token and count the call against today's quota."""
+        if self.calls_today >= self.daily_quota:
+            raise QuotaExceededError(f"Daily {self.service} quota of {self.daily_quota} calls exceeded")
+
+        await self.bucket.async_acquire()
+        self._roll_day()
+        self.calls += 1
+        self.registry.async_schedule_save()
+
+
+class RateLimiterRegistry:
+    """One limiter per service and API key, shared by all entries."""
+
+    def __init__(self, store: Store = None):
+        self.store = store
+        self.limiters: dict[str, ApiKeyLimiter] = {}
+        self._stored: dict = {}
+
+    @staticmethod
+    def key_id(service: str, api_key: str) -> str:
+        # Never persist the API key itself.
+        return f"{service}:{hashlib.sha256(api_key.encode()).hexdigest()[:12]}"
+
+    def get(self, service: str, api_key: str) -> ApiKeyLimiter:
+        key_id = self.key_id(service, api_key)
+        if key_id not in self.limiters:
+            rate, burst, daily_quota = RATE_LIMITS[service]
+            limiter = ApiKeyLimiter(self, service, rate, burst, daily_quota)
+            stored = self._stored.get(key_id)
+            if stored is not None and stored.get("day") == limiter.day:
+                limiter.calls = stored.get("calls", 0)
+            self.limiters[key_id] = limiter
+
+        return self.limiters[key_id]
+
+    def async_schedule_save(self):
+        if self.store is not None:
+            self.store.async_delay_save(self._data_to_save, QUOTA_SAVE_DELAY)
+
+    async def async_load(self):
+        if self.store is None:
+            return
+
+        data = await self.store.async_load()
+        if data:
+            self._stored = data.get("keys", {})
+
+    def _data_to_save(self) -> dict:
+        keys = dict(self._stored)
+        keys.update({
+            key_id: {"day": limiter.day, "calls": limiter.calls}
+            for key_id, limiter in self.limiters.items()
+        })
+        return {"keys": keys}
+
+    @property
+    def stats(self) -> dict:
+        return {
+            key_id: {
+                "calls_today": limiter.calls_today,
+                "daily_quota": limiter.daily_quota,
+            }
+            for key_id, limiter in self.limiters.items()
+        }
+
+
+async def async_get_limiters(hass: HomeAssistant) -> RateLimiterRegistry:
+    """Return the rate limiters shared by all entries and config flows."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_LIMITERS not in domain_data:
+        registry = RateLimiterRegistry(Store(hass, STORAGE_VERSION, STORAGE_KEY))
+        domain_data[DATA_LIMITERS] = registry
+        await registry.async_load()
+
+    return domain_data[DATA_LIMITERS]
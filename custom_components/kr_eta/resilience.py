@@ -0,0 +1,178 @@
+"""Retries and circuit breaking around upstream API calls."""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    DATA_RESILIENCE,
+    DOMAIN,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """An error response from an upstream API."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+    @classmethod
+    def from_status(cls, message: str, status: int):
+        # Rate limiting and server errors are worth retrying, other 4xx are not.
+        return cls(message, status, retryable=status == 429 or status >= 500)
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+def _is_retryable(err: Exception) -> bool:
+    if isinstance(err, UpstreamError):
+        return err.retryable
+    return isinstance(err, (asyncio.TimeoutError, aiohttp.ClientError))
+
+
+class CircuitBreaker:
+    """Stop calling a host after repeated failures, then probe for recovery."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self):
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        # Only one probe goes through while half open.
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        raise CircuitOpenError(f"Circuit open for {self.host}")
+
+    def release_probe(self):
+        """Let another call probe, when one was abandoned without a result."""
+        self._probing = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            _LOGGER.info("%s recovered, closing circuit", self.host)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                _LOGGER.warning("%s is failing, opening circuit for %d seconds", self.host, self.reset_timeout)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Resilience:
+    """Retry transient upstream errors with jittered exponential backoff.
+
+    One circuit breaker per host is shared by every caller.
+    """
+
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(host)
+        return self.breakers[host]
+
+    async def async_call(self, host: str, func: Callable[[], Awaitable[Any]]):
+        breaker = self.breaker(host)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            try:
+                result = await func()
+            except Exception as e:
+                if not _is_retryable(e):
+                    # The host answered; the request itself was bad.
+                    breaker.record_success()
+                    raise
+
+                breaker.record_failure()
+                attempt += 1
+                if attempt >= self.attempts or breaker.state == CircuitBreaker.OPEN:
+                    raise
+
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                _LOGGER.debug("Retrying %s in %.1f seconds: %s", host, delay, e)
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled; the call says nothing about the host.
+                breaker.release_probe()
+                raise
+
+            breaker.record_success()
+            return result
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "breakers": {
+                host: {"state": breaker.state, "failures": breaker.failures}
+                for host, breaker in self.breakers.items()
+            },
+        }
+
+
+@callback
+def async_get_resilience(hass: HomeAssistant) -> Resilience:
+    """Return the retry policy and circuit breakers shared by all entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_RESILIENCE not in domain_data:
+        domain_data[DATA_RESILIENCE] = Resilience()
+
+    return domain_data[DATA_RESILIENCE]
@@ -0,0 +1,275 @@
+"""Incremental parser for detailed Kakao Mobility directions.
+
+A detailed response (summary=false) carries every road of the route with
+its vertexes and traffic state, and easily runs to hundreds of kilobytes.
+RouteParser consumes the body chunk by chunk and keeps only the summary and
+compact arrays, so the document is never held in memory as a whole.
+"""
+import codecs
+from array import array
+from json.decoder import scanstring
+from typing import Any, Optional
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class JsonEventParser:
+    """Turn JSON text fed in chunks into (prefix, event, value) events.
+
+    Events and prefixes follow ijson: prefixes join map keys with "." and
+    array members are "item", e.g. "routes.item.summary.duration".
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        # One entry per open container: "item" for arrays, the current key
+        # (None before the first one) for maps.
+        self._path: list[Optional[str]] = []
+        self._containers: list[str] = []
+        self._expect_key = False
+
+    def feed(self, data: bytes) -> list[tuple[str, str, Any]]:
+        """Parse a chunk, returning the events it completes."""
+        self._buf += self._decoder.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> list[tuple[str, str, Any]]:
+        """Parse what is left at the end of the document."""
+        self._buf += self._decoder.decode(b"", final=True)
+        events = self._parse(final=True)
+        if self._buf.strip() or self._containers:
+            raise ValueError("Truncated JSON document")
+        return events
+
+    def _prefix(self) -> str:
+        return ".".join(p for p in self._path if p is not None)
+
+    def _parse(self, final: bool) -> list[tuple[str, str, Any]]:
+        events = []
+        buf = self._buf
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            c = buf[pos]
+            if c in _WHITESPACE or c == ":":
+                pos += 1
+            elif c == ",":
+                self._expect_key = self._containers[-1:] == ["map"]
+                pos += 1
+            elif c == "{":
+                events.append((self._prefix(), "start_map", None))
+                self._containers.append("map")
+                self._path.append(None)
+                self._expect_key = True
+                pos += 1
+            elif c == "}":
+                self._containers.pop()
+                self._path.pop()
+                events.append((self._prefix(), "end_map", None))
+                self._expect_key = False
+                pos += 1
+            elif c == "[":
+                events.append((self._prefix(), "start_array", None))
+                self._containers.append("array")
+                self._path.append("item")
+                pos += 1
+            elif c == "]":
+                self._containers.pop()
+                self._path.pop()
+                events.append((self._prefix(), "end_array", None))
+                pos += 1
+            elif c == '"':
+                try:
+                    value, next_pos = scanstring(buf, pos + 1)
+                except ValueError:
+                    if final:
+                        raise
+                    break  # The string continues in the next chunk.
+                if self._expect_key:
+                    self._path[-1] = None
+                    events.append((self._prefix(), "map_key", value))
+                    self._path[-1] = value
+                    self._expect_key = False
+                else:
+                    events.append((self._prefix(), "string", value))
+                pos = next_pos
+            elif c in _NUMBER_CHARS:
+                next_pos = pos
+                while next_pos < end and buf[next_pos] in _NUMBER_CHARS:
+                    next_pos += 1
+                if next_pos == end and not final:
+                    break  # More digits may follow.
+                token = buf[pos:next_pos]
+                if any(ch in token for ch in ".eE"):
+                    events.append((self._prefix(), "number", float(token)))
+                else:
+                    events.append((self._prefix(), "number", int(token)))
+                pos = next_pos
+            else:
+                for literal, value in _LITERALS.items():
+                    if buf.startswith(literal, pos):
+                        event = "null" if value is None else "boolean"
+                        events.append((self._prefix(), event, value))
+                        pos += len(literal)
+                        break
+                else:
+                    if end - pos < 5 and not final:
+                        break  # A literal split across chunks.
+                    raise ValueError(f"Unexpected {c!r} in JSON document")
+
+        # Drop what was consumed, so the buffer stays chunk sized.
+        self._buf = buf[pos:]
+        return events
+
+
+class RouteDetail:
+    """Sections and roads of a route, as flat arrays.
+
+    Roads of all sections are numbered together; section_roads and
+    road_vertexes hold the index of the first road of every section and the
+    first vertex of every road. vertexes holds x, y pairs.
+    """
+
+    __slots__ = (
+        "section_distances",
+        "section_durations",
+        "section_roads",
+        "road_distances",
+        "road_durations",
+        "road_speeds",
+        "road_states",
+        "road_vertexes",
+        "vertexes",
+    )
+
+    def __init__(self):
+        self.section_distances = array("d")
+        self.section_durations = array("d")
+        self.section_roads = array("I")
+        self.road_distances = array("d")
+        self.road_durations = array("d")
+        self.road_speeds = array("d")
+        self.road_states = array("b")
+        self.road_vertexes = array("I")
+        self.vertexes = array("d")
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays."""
+        return sum(
+            len(a) * a.itemsize for a in (getattr(self, name) for name in self.__slots__)
+        )
+
+    def sections(self) -> list[tuple[float, float]]:
+        """Return (distance, duration) of every section."""
+        return list(zip(self.section_distances, self.section_durations))
+
+
+_ROUTE = "routes.item"
+_SUMMARY = _ROUTE + ".summary"
+_SECTION = _ROUTE + ".sections.item"
+_ROAD = _SECTION + ".roads.item"
+_VERTEX = _ROAD + ".vertexes.item"
+
+_SECTION_FIELDS = {
+    _SECTION + ".distance": "section_distances",
+    _SECTION + ".duration": "section_durations",
+}
+_ROAD_FIELDS = {
+    _ROAD + ".distance": "road_distances",
+    _ROAD + ".duration": "road_durations",
+    _ROAD + ".traffic_speed": "road_speeds",
+    _ROAD + ".traffic_state": "road_states",
+}
+
+
+class RouteParser:
+    """Build the summary and RouteDetail of the first route of a response."""
+
+    def __init__(self):
+        self._events = JsonEventParser()
+        self._routes = 0
+        self._summary_stack: list[Any] = []
+        self._summary_key: Optional[str] = None
+        self.result_code = None
+        self.result_msg = None
+        self.summary: Optional[dict] = None
+        self.detail = RouteDetail()
+
+    def feed(self, data: bytes):
+        """Consume a chunk of the response body."""
+        for event in self._events.feed(data):
+            self._handle(*event)
+
+    def close(self):
+        """Consume the end of the response body."""
+        for event in self._events.close():
+            self._handle(*event)
+
+    def _handle(self, prefix: str, event: str, value: Any):
+        if prefix == _ROUTE and event == "start_map":
+            self._routes += 1
+        # Only the first route is kept; alternatives are not requested.
+        if self._routes != 1 or not prefix.startswith(_ROUTE):
+            return
+
+        if self._summary_stack or prefix == _SUMMARY:
+            self._handle_summary(event, value)
+        elif prefix == _VERTEX:
+            self.detail.vertexes.append(value)
+        elif event == "start_map" and prefix == _ROAD:
+            self._start_road()
+        elif event == "start_map" and prefix == _SECTION:
+            self._start_section()
+        elif prefix in _ROAD_FIELDS and value is not None:
+            getattr(self.detail, _ROAD_FIELDS[prefix])[-1] = value
+        elif prefix in _SECTION_FIELDS and value is not None:
+            getattr(self.detail, _SECTION_FIELDS[prefix])[-1] = value
+        elif prefix == _ROUTE + ".result_code":
+            self.result_code = value
+        elif prefix == _ROUTE + ".result_msg":
+            self.result_msg = value
+
+    def _start_section(self):
+        detail = self.detail
+        detail.section_distances.append(0)
+        detail.section_durations.append(0)
+        detail.section_roads.append(len(detail.road_vertexes))
+
+    def _start_road(self):
+        detail = self.detail
+        detail.road_distances.append(0)
+        detail.road_durations.append(0)
+        detail.road_speeds.append(0)
+        detail.road_states.append(0)
+        detail.road_vertexes.append(len(detail.vertexes) // 2)
+
+    def _handle_summary(self, event: str, value: Any):
+        """Build the summary, which is small, as plain objects."""
+        if event == "map_key":
+            self._summary_key = value
+            return
+
+        if event in ("start_map", "start_array"):
+            container = {} if event == "start_map" else []
+            self._add_summary_value(container)
+            self._summary_stack.append(container)
+        elif event in ("end_map", "end_array"):
+            container = self._summary_stack.pop()
+            if not self._summary_stack:
+                self.summary = container
+        else:
+            self._add_summary_value(value)
+
+    def _add_summary_value(self, value: Any):
+        if not self._summary_stack:
+            return
+        parent = self._summary_stack[-1]
+        if isinstance(parent, list):
+            parent.append(value)
+        else:
+            parent[self._summary_key] = value
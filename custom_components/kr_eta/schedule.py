@@ -0,0 +1,174 @@
+"""Time-of-day aware polling schedule for a route."""
+from collections import deque
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from .const import (
+    BACKOFF_SAMPLES,
+    BACKOFF_THRESHOLD,
+    CONF_COMMUTE_WINDOWS,
+    CONF_DORMANT_INTERVAL,
+    CONF_OFFPEAK_INTERVAL,
+    CONF_PEAK_INTERVAL,
+    CONF_TRIGGER_CALENDAR,
+    CONF_TRIGGER_ENTITIES,
+    DEFAULT_COMMUTE_WINDOWS,
+    DEFAULT_DORMANT_INTERVAL,
+    DEFAULT_OFFPEAK_INTERVAL,
+    DEFAULT_PEAK_INTERVAL,
+    MAX_BACKOFF_FACTOR,
+)
+
+
+def parse_windows(value: str) -> list[tuple[time, time]]:
+    """Parse "HH:MM-HH:MM, ..." into (start, end) pairs.
+
+    A window whose end is before its start runs past midnight.
+    """
+    windows = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, end = part.split("-")
+            windows.append((time.fromisoformat(start.strip()), time.fromisoformat(end.strip())))
+        except ValueError as e:
+            raise ValueError(f"Invalid commute window: {part}") from e
+
+    return windows
+
+
+class RouteSchedule:
+    MODE_SCHEDULED = "scheduled"
+    MODE_DORMANT = "dormant"
+    MODE_ACTIVE = "active"
+
+    def __init__(
+        self,
+        windows: list[tuple[time, time]],
+        peak_interval: timedelta,
+        offpeak_interval: timedelta,
+        dormant_interval: Optional[timedelta] = None,
+    ):
+        """Initialize the schedule.
+
+        With a dormant interval the route is trigger driven: commute windows
+        are ignored, and it polls at the peak interval only while activated.
+        """
+        self.windows = windows
+        self.peak_interval = peak_interval
+        self.offpeak_interval = offpeak_interval
+        self.dormant_interval = dormant_interval
+        self.active_until: Optional[datetime] = None
+        self.next_refresh: Optional[datetime] = None
+        self.backoff = 1
+        self.slowdown = 1
+        self._durations = deque(maxlen=BACKOFF_SAMPLES)
+
+    @classmethod
+    def from_options(cls, options):
+        dormant_interval = None
+        if options.get(CONF_TRIGGER_ENTITIES) or options.get(CONF_TRIGGER_CALENDAR):
+            dormant_interval = timedelta(
+                minutes=options.get(CONF_DORMANT_INTERVAL, DEFAULT_DORMANT_INTERVAL)
+            )
+
+        return cls(
+            parse_windows(options.get(CONF_COMMUTE_WINDOWS, DEFAULT_COMMUTE_WINDOWS)),
+            timedelta(minutes=options.get(CONF_PEAK_INTERVAL, DEFAULT_PEAK_INTERVAL)),
+            timedelta(minutes=options.get(CONF_OFFPEAK_INTERVAL, DEFAULT_OFFPEAK_INTERVAL)),
+            dormant_interval,
+        )
+
+    def mode(self, now: datetime) -> str:
+        if self.dormant_interval is None:
+            return self.MODE_SCHEDULED
+        if self.active_until is not None and now < self.active_until:
+            return self.MODE_ACTIVE
+        return self.MODE_DORMANT
+
+    def activate(self, now: datetime, duration: timedelta):
+        """Poll at the peak interval for a while, starting now."""
+        until = now + duration
+        if self.active_until is None or self.active_until < until:
+            self.active_until = until
+        self.backoff = 1
+        self.request_refresh()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "next_refresh": self.next_refresh.isoformat() if self.next_refresh is not None else None,
+            "backoff": self.backoff,
+            "slowdown": self.slowdown,
+            "active_until": self.active_until.isoformat() if self.active_until is not None else None,
+        }
+
+    def in_window(self, now: datetime) -> bool:
+        t = now.time()
+        for start, end in self.windows:
+            if start <= end:
+                if start <= t < end:
+                    return True
+            elif t >= start or t < end:
+                return True
+
+        return False
+
+    def next_window_start(self, now: datetime) -> Optional[datetime]:
+        starts = [
+            datetime.combine(now.date(), start, now.tzinfo)
+            for start, _ in self.windows
+        ]
+        if not starts:
+            return None
+
+        starts = [s if s > now else s + timedelta(days=1) for s in starts]
+        return min(starts)
+
+    def is_due(self, now: datetime) -> bool:
+        return self.next_refresh is None or now >= self.next_refresh
+
+    def request_refresh(self):
+        """Make the route due on the next coordinator cycle."""
+        self.next_refresh = None
+
+    def interval(self, now: datetime) -> timedelta:
+        factor = self.backoff * self.slowdown
+        mode = self.mode(now)
+        if mode == self.MODE_DORMANT:
+            return self.dormant_interval * factor
+        if mode == self.MODE_ACTIVE or self.in_window(now):
+            return self.peak_interval * factor
+
+        return self.offpeak_interval * factor
+
+    def record(self, now: datetime, duration: Optional[int], slowdown: int = 1):
+        """Record a fetch result and schedule the next refresh.
+
+        Back off while the last few durations stay within BACKOFF_THRESHOLD
+        seconds of each other; a failed fetch (duration None) keeps the
+        current backoff. slowdown stretches the interval further while the
+        API quota runs low.
+        """
+        self.slowdown = slowdown
+        if duration is not None:
+            self._durations.append(duration)
+            if (
+                len(self._durations) == self._durations.maxlen
+                and max(self._durations) - min(self._durations) <= BACKOFF_THRESHOLD
+            ):
+                self.backoff = min(self.backoff * 2, MAX_BACKOFF_FACTOR)
+            else:
+                self.backoff = 1
+
+        next_refresh = now + self.interval(now)
+        # Never sleep through the start of a commute window.
+        if self.dormant_interval is None and not self.in_window(now):
+            window_start = self.next_window_start(now)
+            if window_start is not None and window_start < next_refresh:
+                next_refresh = window_start
+                self.backoff = 1
+
+        self.next_refresh = next_refresh
@@ -1,16 +1,23 @@
+from datetime import timedelta
+from functools import partial
 import logging
 import voluptuous as vol
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 from homeassistant.const import (
+    EntityCategory,
     UnitOfTime,
 )
 
 from .const import (
     DOMAIN,
+    DATA_COORDINATOR,
     CONF_VWORLD_API_KEY,
     CONF_KAKAODEVELOPERS_API_KEY,
     CONF_STARTPOINT,
@@ -20,12 +27,125 @@ from .const import (
     CONF_LOCATION_ADDRESS,
     CONF_LOCATION_X,
     CONF_LOCATION_Y,
+    CONF_ROUTE_TYPE,
+    CONF_DESTINATIONS,
+    CONF_DETAILED,
+    CONF_COMPARE_PRIORITIES,
+    CONF_ERROR_BUDGET,
+    CONF_MIN_DISTANCE_DELTA,
+    CONF_MIN_DURATION_DELTA,
+    CONF_ORIGIN_MAX_AGE,
+    CONF_ORIGIN_MIN_DISTANCE,
+    CONF_ORIGIN_TRACKER,
+    DEFAULT_ERROR_BUDGET,
+    DEFAULT_MIN_DISTANCE_DELTA,
+    DEFAULT_MIN_DURATION_DELTA,
+    DEFAULT_ORIGIN_MAX_AGE,
+    DEFAULT_ORIGIN_MIN_DISTANCE,
+    ROUTE_TYPE_MATRIX,
+    ROUTE_TYPE_SINGLE,
+    SERVICE_KAKAO,
+    SERVICE_VWORLD,
 )
+from .coordinator import KrEtaCoordinator
+from .geocache import async_get_geocache
 from .kakaomobility import Navi
-from .vworld import Location
+from .liveorigin import LiveOrigin
+from .metrics import RouteMetrics, span
+from .ratelimit import ApiKeyLimiter, async_get_limiters
+from .resilience import async_get_resilience
+from .schedule import RouteSchedule
+from .sessions import async_get_sessions
+from .spatial import async_get_spatial_cache
+from .triggers import RouteTriggers
+from .vworld import GeoCoder, Location
 
 _LOGGER = logging.getLogger(__name__)
 
+# Config entry data that makes up the points of a route.
+ROUTE_POINTS = (CONF_STARTPOINT, CONF_ENDPOINT, CONF_WAYPOINTS, CONF_DESTINATIONS)
+
+
+def _location(config, default_name: str) -> Location:
+    return Location(
+        name=config.get(CONF_LOCATION_NAME, default_name),
+        x=config[CONF_LOCATION_X],
+        y=config[CONF_LOCATION_Y]
+    )
+
+
+def _deltas(options) -> dict:
+    return {
+        "min_duration_delta": options.get(CONF_MIN_DURATION_DELTA, DEFAULT_MIN_DURATION_DELTA),
+        "min_distance_delta": options.get(CONF_MIN_DISTANCE_DELTA, DEFAULT_MIN_DISTANCE_DELTA),
+    }
+
+
+def _set_route(navi: Navi, config, options):
+    """Set the points and options of a config entry on its Navi."""
+    navi.set_startpoint(_location(config[CONF_STARTPOINT], "Start"))
+    if config.get(CONF_ROUTE_TYPE, ROUTE_TYPE_SINGLE) == ROUTE_TYPE_MATRIX:
+        navi.set_destinations([_location(dest, "End") for dest in config[CONF_DESTINATIONS]])
+        # Matrix routes only have summaries.
+        return
+
+    navi.set_endpoint(_location(config[CONF_ENDPOINT], "End"))
+    navi.set_waypoints([_location(wp, "Waypoint") for wp in config.get(CONF_WAYPOINTS, [])])
+    navi.detailed = options.get(CONF_DETAILED, False)
+    navi.compare_priorities = options.get(CONF_COMPARE_PRIORITIES, False)
+
+
+def _add_route(
+    coordinator: KrEtaCoordinator, entry: ConfigEntry, navi: Navi, predict_from_history: bool = True
+):
+    coordinator.add_route(
+        entry.entry_id,
+        navi,
+        RouteSchedule.from_options(entry.options),
+        entry.options.get(CONF_ERROR_BUDGET, DEFAULT_ERROR_BUDGET) / 100,
+        predict_from_history,
+        live_origin=not navi.destinations and bool(entry.options.get(CONF_ORIGIN_TRACKER)),
+    )
+
+
+async def _async_start_listeners(
+    hass: HomeAssistant, coordinator: KrEtaCoordinator, entry: ConfigEntry, navi: Navi
+) -> list[CALLBACK_TYPE]:
+    """Start the triggers and live origin of a route, per its options."""
+    unsubs = []
+    if coordinator.schedules[entry.entry_id].dormant_interval is not None:
+        triggers = RouteTriggers(hass, coordinator, entry.entry_id, entry.options)
+        unsubs.append(triggers.async_setup())
+
+    if not navi.destinations and entry.options.get(CONF_ORIGIN_TRACKER):
+        # ETAs between fetches are estimated from the route geometry.
+        navi.detailed = True
+        spatial = async_get_spatial_cache(hass)
+        vworld_api_key = entry.data[CONF_VWORLD_API_KEY]
+        live_origin = LiveOrigin(
+            hass,
+            coordinator,
+            entry.entry_id,
+            navi,
+            entry.options[CONF_ORIGIN_TRACKER],
+            entry.options.get(CONF_ORIGIN_MIN_DISTANCE, DEFAULT_ORIGIN_MIN_DISTANCE),
+            timedelta(minutes=entry.options.get(CONF_ORIGIN_MAX_AGE, DEFAULT_ORIGIN_MAX_AGE)),
+            spatial,
+            # Names fetched origins after their road address.
+            GeoCoder(
+                vworld_api_key,
+                async_get_clientsession(hass),
+                await async_get_geocache(hass),
+                (await async_get_limiters(hass)).get(SERVICE_VWORLD, vworld_api_key),
+                async_get_resilience(hass),
+                spatial.addresses,
+            ),
+        )
+        unsubs.append(live_origin.async_setup())
+
+    return unsubs
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -35,55 +155,190 @@ async def async_setup_entry(
     config = entry.data
     
     kakao_api_key = config[CONF_KAKAODEVELOPERS_API_KEY]
-    
-    start_config = config[CONF_STARTPOINT]
-    end_config = config[CONF_ENDPOINT]
-    waypoints_config = config.get(CONF_WAYPOINTS, [])
-
-    start_point = Location(
-        name=start_config.get(CONF_LOCATION_NAME, "Start"),
-        x=start_config[CONF_LOCATION_X],
-        y=start_config[CONF_LOCATION_Y]
+
+    coordinator: KrEtaCoordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    limiters = await async_get_limiters(hass)
+    kakao_limiter = limiters.get(SERVICE_KAKAO, kakao_api_key)
+    vworld_limiter = limiters.get(SERVICE_VWORLD, config[CONF_VWORLD_API_KEY])
+
+    # Routes of an API key share one connection pool. The session is
+    # released on unload, which also runs when the setup fails.
+    sessions = async_get_sessions(hass)
+    session = sessions.async_acquire(kakao_api_key, entry.entry_id)
+    entry.async_on_unload(partial(sessions.async_release, entry.entry_id))
+
+    navi = Navi(
+        kakao_api_key,
+        session,
+        coordinator.flight,
+        coordinator.eta_cache,
+        kakao_limiter,
+        async_get_resilience(hass),
     )
-    
-    end_point = Location(
-        name=end_config.get(CONF_LOCATION_NAME, "End"),
-        x=end_config[CONF_LOCATION_X],
-        y=end_config[CONF_LOCATION_Y]
+    _set_route(navi, config, entry.options)
+
+    deltas = _deltas(entry.options)
+    if navi.destinations:
+        # One batched request serves a sensor per destination.
+        sensors = [
+            KrEtaSensor(coordinator, navi.startpoint, dest, [], entry.entry_id, index=i, **deltas)
+            for i, dest in enumerate(navi.destinations)
+        ]
+    else:
+        sensors = [
+            KrEtaSensor(
+                coordinator, navi.startpoint, navi.endpoint, navi.waypoints, entry.entry_id, **deltas
+            )
+        ]
+
+    _add_route(coordinator, entry, navi)
+    route = hass.data[DOMAIN][entry.entry_id]
+    route["sensors"] = sensors
+    route["unsub_route_listeners"] = await _async_start_listeners(hass, coordinator, entry, navi)
+    route["applied"] = (dict(entry.data), dict(entry.options))
+
+    @callback
+    def async_stop_listeners():
+        for unsub in route["unsub_route_listeners"]:
+            unsub()
+        route["unsub_route_listeners"] = []
+
+    entry.async_on_unload(async_stop_listeners)
+
+    metrics = coordinator.metrics[entry.entry_id]
+    async_add_entities([
+        *sensors,
+        KrEtaQuotaSensor(coordinator, kakao_limiter, entry.entry_id),
+        KrEtaQuotaSensor(coordinator, vworld_limiter, entry.entry_id),
+        KrEtaLatencySensor(coordinator, metrics, entry.entry_id),
+        KrEtaErrorSensor(coordinator, metrics, entry.entry_id),
+        KrEtaNextRefreshSensor(coordinator, entry.entry_id),
+    ])
+    # Debounced, so routes set up together are fetched in one cycle.
+    await coordinator.async_request_refresh()
+
+
+async def async_update_route(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Apply the data and options of an entry to its running route.
+
+    The Navi, sensors, caches and history of the route are kept, and it is
+    refreshed once. Once the points of the route change, its last result is
+    dropped and its history, recorded for the old points, no longer feeds
+    predictions until the entry is reloaded.
+
+    Returns False if the entry has to be reloaded instead, e.g. because its
+    API key or number of sensors changed.
+    """
+    domain_data = hass.data.get(DOMAIN, {})
+    route = domain_data.get(entry.entry_id)
+    coordinator: KrEtaCoordinator = domain_data.get(DATA_COORDINATOR)
+    navi = coordinator.routes.get(entry.entry_id) if coordinator is not None else None
+    if route is None or navi is None or "sensors" not in route:
+        return False
+
+    applied = (dict(entry.data), dict(entry.options))
+    if route["applied"] == applied:
+        # The options flow updates data and options separately.
+        return True
+
+    config = entry.data
+    matrix = config.get(CONF_ROUTE_TYPE, ROUTE_TYPE_SINGLE) == ROUTE_TYPE_MATRIX
+    sensor_count = len(config[CONF_DESTINATIONS]) if matrix else 1
+    if (
+        config[CONF_KAKAODEVELOPERS_API_KEY] != navi.apikey
+        or config[CONF_VWORLD_API_KEY] != route["applied"][0][CONF_VWORLD_API_KEY]
+        or matrix != bool(navi.destinations)
+        or sensor_count != len(route["sensors"])
+    ):
+        return False
+
+    points_changed = any(
+        route["applied"][0].get(key) != config.get(key) for key in ROUTE_POINTS
     )
-    
-    waypoints = []
-    for wp in waypoints_config:
-        waypoints.append(Location(
-            name=wp.get(CONF_LOCATION_NAME, "Waypoint"),
-            x=wp[CONF_LOCATION_X],
-            y=wp[CONF_LOCATION_Y]
-        ))
+    route["history_stale"] = route.get("history_stale", False) or points_changed
+    if points_changed and coordinator.data is not None:
+        coordinator.data.pop(entry.entry_id, None)
+
+    for unsub in route["unsub_route_listeners"]:
+        unsub()
+    _set_route(navi, config, entry.options)
+    _add_route(coordinator, entry, navi, predict_from_history=not route["history_stale"])
+    route["unsub_route_listeners"] = await _async_start_listeners(hass, coordinator, entry, navi)
+    route["applied"] = applied
+
+    deltas = _deltas(entry.options)
+    for i, sensor in enumerate(route["sensors"]):
+        if matrix:
+            sensor.reconfigure(navi.startpoint, navi.destinations[i], [], **deltas)
+        else:
+            sensor.reconfigure(navi.startpoint, navi.endpoint, navi.waypoints, **deltas)
 
-    async_add_entities([KrEtaSensor(kakao_api_key, start_point, end_point, waypoints, entry.entry_id)], True)
+    _LOGGER.debug("Updated KR ETA route %s in place", entry.entry_id)
+    await coordinator.async_refresh_route(entry.entry_id)
+    return True
 
 
-class KrEtaSensor(SensorEntity):
+class KrEtaSensor(CoordinatorEntity, SensorEntity):
     """Representation of a KR ETA Sensor."""
 
-    def __init__(self, api_key, start_point, end_point, waypoints, entry_id):
-        """Initialize the sensor."""
-        self._navi = Navi(api_key)
-        self._navi.set_startpoint(start_point)
-        self._navi.set_endpoint(end_point)
-        self._navi.set_waypoints(waypoints)
-        
+    # Change on every update and are kept in the ETA history instead.
+    _unrecorded_attributes = frozenset({"sections", "options"})
+    # Attributes that don't trigger a state write by themselves; distance is
+    # compared against min_distance_delta.
+    _delta_attributes = frozenset({"distance", "sections", "options"})
+
+    def __init__(
+        self,
+        coordinator,
+        start_point,
+        end_point,
+        waypoints,
+        entry_id,
+        index=None,
+        min_duration_delta=DEFAULT_MIN_DURATION_DELTA,
+        min_distance_delta=DEFAULT_MIN_DISTANCE_DELTA,
+    ):
+        """Initialize the sensor.
+
+        index selects the destination of a matrix route. The state is only
+        written when the ETA moves by min_duration_delta minutes or the
+        distance by min_distance_delta meters, or another attribute changes.
+        """
+        super().__init__(coordinator)
+        self._min_duration_delta = min_duration_delta
+        self._min_distance_delta = min_distance_delta
+
         self._start_point = start_point
         self._end_point = end_point
         self._waypoints = waypoints
         self._entry_id = entry_id
+        self._index = index
         
         self._state = None
         self._attributes = {}
         
         # Unique ID based on entry_id to allow multiple instances
         self._attr_unique_id = f"kreta_{entry_id}"
+        if index is not None:
+            self._attr_unique_id += f"_{index}"
+        self._attr_name = f"{start_point.name} ➡ {end_point.name}"
+
+    def reconfigure(
+        self, start_point, end_point, waypoints, min_duration_delta, min_distance_delta
+    ):
+        """Take the points and thresholds of a changed route.
+
+        The attributes are written right away; the ETA of the changed route
+        follows with the next refresh.
+        """
+        self._start_point = start_point
+        self._end_point = end_point
+        self._waypoints = waypoints
+        self._min_duration_delta = min_duration_delta
+        self._min_distance_delta = min_distance_delta
         self._attr_name = f"{start_point.name} ➡ {end_point.name}"
+        if self.hass is not None:
+            self._handle_coordinator_update()
 
     @property
     def native_value(self):
@@ -105,24 +360,271 @@ class KrEtaSensor(SensorEntity):
         """Return the icon to use in the frontend."""
         return "mdi:car"
 
-    def update(self):
-        """Fetch new state data for the sensor."""
-        try:
-            summary = self._navi.get_eta()
-            
-            # Duration is in seconds, convert to minutes
-            duration_seconds = summary.get("duration")
-            self._state = round(duration_seconds / 60)
-            
-            self._attributes = {
-                "distance": summary.get("distance"), # meters
-                "fare": summary.get("fare"),
-                "taxi_fare": summary.get("taxi_fare"),
-                "origin": self._start_point.name,
-                "destination": self._end_point.name,
-                "waypoints_count": len(self._waypoints)
-            }
-            
-        except Exception as e:
-            _LOGGER.error("Error updating KR ETA sensor: %s", e)
+    async def async_update(self):
+        """Refresh this route now, e.g. on homeassistant.update_entity."""
+        await self.coordinator.async_refresh_route(self._entry_id)
+
+    async def async_added_to_hass(self):
+        """Pick up the latest result when added to hass."""
+        await super().async_added_to_hass()
+        self._update_from_summary(self._summary())
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator."""
+        if self._update_from_summary(self._summary()):
+            with span(self.coordinator.metrics.get(self._entry_id), "write"):
+                self.async_write_ha_state()
+        else:
+            self.coordinator.skipped_writes += 1
+
+    def _summary(self):
+        if self.coordinator.data is None:
+            return None
+        result = self.coordinator.data.get(self._entry_id)
+        if result is None or self._index is None:
+            return result
+        return result[self._index]
+
+    def _origin_name(self):
+        # A live origin moves the start point of the route.
+        navi = self.coordinator.routes.get(self._entry_id)
+        if navi is not None and navi.startpoint is not None:
+            return navi.startpoint.name
+        return self._start_point.name
+
+    def _refresh_mode(self):
+        schedule = self.coordinator.schedules.get(self._entry_id)
+        if schedule is None:
+            return None
+        return schedule.mode(dt_util.now())
+
+    def _update_from_summary(self, summary):
+        """Update state and attributes from a route summary.
+
+        Returns whether anything changed enough to be written.
+        """
+        if summary is None:
+            changed = self._state is not None
             self._state = None
+            return changed
+
+        # Duration is in seconds, convert to minutes
+        duration_seconds = summary.get("duration")
+        state = round(duration_seconds / 60)
+
+        attributes = {
+            "distance": summary.get("distance"), # meters
+            "fare": summary.get("fare"),
+            "taxi_fare": summary.get("taxi_fare"),
+            "origin": self._origin_name(),
+            "destination": self._end_point.name,
+            "waypoints_count": len(self._waypoints),
+            "refresh_mode": self._refresh_mode(),
+            "predicted": summary.get("predicted", False),
+            "estimated": summary.get("estimated", False),
+            "stale": summary.get("stale", False),
+        }
+
+        options = summary.get("options")
+        if options is not None:
+            attributes["fastest_priority"] = summary.get("priority")
+            attributes["options"] = options
+
+        detail = summary.get("detail")
+        if detail is not None:
+            attributes["sections"] = self._sections(detail)
+
+        if not self._is_significant(state, attributes):
+            # Keep the written state and attribute dict as they are.
+            return False
+
+        self._state = state
+        self._attributes = attributes
+        return True
+
+    def _is_significant(self, state, attributes):
+        """Whether an update differs enough from the written state."""
+        if self._state is None:
+            return True
+        if state != self._state and abs(state - self._state) >= self._min_duration_delta:
+            return True
+
+        old_distance = self._attributes.get("distance")
+        distance = attributes.get("distance")
+        if old_distance != distance and (
+            old_distance is None
+            or distance is None
+            or abs(distance - old_distance) >= self._min_distance_delta
+        ):
+            return True
+
+        return any(
+            attributes.get(key) != self._attributes.get(key)
+            for key in attributes.keys() | self._attributes.keys()
+            if key not in self._delta_attributes
+        )
+
+    def _sections(self, detail):
+        """Distance, duration and arrival time of every section."""
+        sections = []
+        arrival = dt_util.now()
+        for distance, duration in detail.sections():
+            arrival += timedelta(seconds=duration)
+            sections.append({
+                "distance": int(distance),
+                "duration": int(duration),
+                "arrival": arrival.isoformat(),
+            })
+        return sections
+
+
+class KrEtaQuotaSensor(CoordinatorEntity, SensorEntity):
+    """API calls made today with the key of a route.
+
+    The key is shared with other entries, so every entry has a copy; they
+    are disabled by default.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:counter"
+    _attr_native_unit_of_measurement = "calls"
+
+    def __init__(self, coordinator, limiter: ApiKeyLimiter, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._limiter = limiter
+        self._written_calls = None
+
+        self._attr_unique_id = f"kreta_{entry_id}_{limiter.service}_calls"
+        self._attr_name = f"KR ETA {limiter.service} API calls"
+
+    @property
+    def native_value(self):
+        """Return the number of calls made today."""
+        return self._limiter.calls_today
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when calls were made."""
+        if self._limiter.calls_today == self._written_calls:
+            self.coordinator.skipped_writes += 1
+            return
+        self._written_calls = self._limiter.calls_today
+        self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            "daily_quota": self._limiter.daily_quota,
+            "usage": round(self._limiter.usage, 3),
+        }
+
+
+class KrEtaLatencySensor(CoordinatorEntity, SensorEntity):
+    """95th percentile time to fetch a route, with every span as attributes."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _unrecorded_attributes = frozenset({"spans"})
+
+    def __init__(self, coordinator, metrics: RouteMetrics, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._metrics = metrics
+
+        self._attr_unique_id = f"kreta_{entry_id}_latency"
+        self._attr_name = "KR ETA latency"
+
+    @property
+    def native_value(self):
+        """Return the 95th percentile fetch time."""
+        return self._metrics.spans["total"].quantile(0.95)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            "spans": {
+                name: {"p50": histogram.quantile(0.5), "p95": histogram.quantile(0.95)}
+                for name, histogram in self._metrics.spans.items()
+            },
+        }
+
+
+class KrEtaErrorSensor(CoordinatorEntity, SensorEntity):
+    """Failed updates of a route, by error type."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_native_unit_of_measurement = "errors"
+
+    def __init__(self, coordinator, metrics: RouteMetrics, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._metrics = metrics
+        self._written_errors = None
+
+        self._attr_unique_id = f"kreta_{entry_id}_errors"
+        self._attr_name = "KR ETA errors"
+
+    @property
+    def native_value(self):
+        """Return the number of failed updates."""
+        return self._metrics.error_count
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            "errors": dict(self._metrics.errors),
+            "last_error": self._metrics.last_error,
+        }
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when errors were counted."""
+        if self._metrics.error_count == self._written_errors:
+            self.coordinator.skipped_writes += 1
+            return
+        self._written_errors = self._metrics.error_count
+        self.async_write_ha_state()
+
+
+class KrEtaNextRefreshSensor(CoordinatorEntity, SensorEntity):
+    """When the route is fetched next, per its schedule."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:update"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, coordinator, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._entry_id = entry_id
+        self._written_next_refresh = None
+
+        self._attr_unique_id = f"kreta_{entry_id}_next_refresh"
+        self._attr_name = "KR ETA next refresh"
+
+    @property
+    def native_value(self):
+        """Return the next scheduled refresh."""
+        # The schedule is replaced when the options change.
+        schedule = self.coordinator.schedules.get(self._entry_id)
+        return schedule.next_refresh if schedule is not None else None
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when the route was rescheduled."""
+        if self.native_value == self._written_next_refresh:
+            self.coordinator.skipped_writes += 1
+            return
+        self._written_next_refresh = self.native_value
+        self.async_write_ha_state()
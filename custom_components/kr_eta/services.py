@@ -0,0 +1,280 @@
+"""Services of the KR ETA integration."""
+import asyncio
+import csv
+from datetime import datetime, time, timedelta
+import logging
+import os
+from typing import Any
+from urllib.parse import unquote_plus
+
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+from homeassistant.util.yaml import load_yaml
+import voluptuous as vol
+
+from .const import (
+    CONF_DESTINATIONS,
+    CONF_ENDPOINT,
+    CONF_KAKAODEVELOPERS_API_KEY,
+    CONF_LOCATION_ADDRESS,
+    CONF_LOCATION_NAME,
+    CONF_LOCATION_X,
+    CONF_LOCATION_Y,
+    CONF_ROUTE_TYPE,
+    CONF_STARTPOINT,
+    CONF_VWORLD_API_KEY,
+    CONF_WAYPOINTS,
+    DATA_COORDINATOR,
+    DOMAIN,
+    PLANNER_MAX_CALLS,
+    ROUTE_TYPE_MATRIX,
+    SERVICE_VWORLD,
+)
+from .config_flow import route_points
+from .geocache import async_get_geocache
+from .planner import DeparturePlanner
+from .ratelimit import async_get_limiters
+from .resilience import async_get_resilience
+from .vworld import AddressNotFound, GeoCoder
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_IMPORT_ROUTES = "import_routes"
+SERVICE_PLAN_DEPARTURE = "plan_departure"
+
+ATTR_PATH = "path"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ARRIVE_BY = "arrive_by"
+ATTR_MAX_CALLS = "max_calls"
+
+IMPORT_ROUTES_SCHEMA = vol.Schema({
+    vol.Required(ATTR_PATH): cv.string,
+    vol.Optional(CONF_VWORLD_API_KEY): cv.string,
+    vol.Optional(CONF_KAKAODEVELOPERS_API_KEY): cv.string,
+})
+
+PLAN_DEPARTURE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    # A datetime, or a time of day for its next occurrence.
+    vol.Required(ATTR_ARRIVE_BY): vol.Any(cv.datetime, cv.time),
+    vol.Optional(ATTR_MAX_CALLS, default=PLANNER_MAX_CALLS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=30)
+    ),
+})
+
+LOCATION_SCHEMA = vol.Schema({
+    vol.Required(CONF_LOCATION_NAME): cv.string,
+    vol.Required(CONF_LOCATION_ADDRESS): cv.string,
+})
+
+def _no_waypoints_with_destinations(route: dict[str, Any]) -> dict[str, Any]:
+    # Multi-destination directions have no waypoints.
+    if CONF_DESTINATIONS in route and route[CONF_WAYPOINTS]:
+        raise vol.Invalid(f"{CONF_WAYPOINTS} can't be combined with {CONF_DESTINATIONS}")
+    return route
+
+
+# A route of an import file. It has either an end, with optional waypoints,
+# or destinations.
+ROUTE_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Required("start"): LOCATION_SCHEMA,
+        vol.Optional("end"): LOCATION_SCHEMA,
+        vol.Optional(CONF_DESTINATIONS): [LOCATION_SCHEMA],
+        vol.Optional(CONF_WAYPOINTS, default=[]): [cv.string],
+    }),
+    cv.has_at_least_one_key("end", CONF_DESTINATIONS),
+    cv.has_at_most_one_key("end", CONF_DESTINATIONS),
+    _no_waypoints_with_destinations,
+)
+
+
+def _read_routes(path: str) -> list[dict[str, Any]]:
+    """Read routes from a YAML or CSV file.
+
+    YAML holds a list of routes (or a mapping with a "routes" list) as in
+    ROUTE_SCHEMA. CSV has start_name, start_address, end_name, end_address
+    and an optional waypoints column of "|" separated addresses.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            return [
+                {
+                    "start": {CONF_LOCATION_NAME: row["start_name"], CONF_LOCATION_ADDRESS: row["start_address"]},
+                    "end": {CONF_LOCATION_NAME: row["end_name"], CONF_LOCATION_ADDRESS: row["end_address"]},
+                    CONF_WAYPOINTS: [wp.strip() for wp in (row.get("waypoints") or "").split("|") if wp.strip()],
+                }
+                for row in csv.DictReader(f)
+            ]
+
+    data = load_yaml(path)
+    if isinstance(data, dict):
+        data = data.get("routes")
+    if not isinstance(data, list):
+        raise HomeAssistantError(f"{path} has no list of routes")
+    return data
+
+
+def _route_to_entry_data(route: dict[str, Any]) -> dict[str, Any]:
+    data = {
+        CONF_STARTPOINT: dict(route["start"]),
+        CONF_WAYPOINTS: [{CONF_LOCATION_ADDRESS: wp} for wp in route[CONF_WAYPOINTS]],
+    }
+    if CONF_DESTINATIONS in route:
+        data[CONF_ROUTE_TYPE] = ROUTE_TYPE_MATRIX
+        data[CONF_DESTINATIONS] = [dict(dest) for dest in route[CONF_DESTINATIONS]]
+    else:
+        data[CONF_ENDPOINT] = dict(route["end"])
+    return data
+
+
+def _api_keys(hass: HomeAssistant, call: ServiceCall) -> dict[str, str]:
+    keys = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.data.get(CONF_VWORLD_API_KEY) and entry.data.get(CONF_KAKAODEVELOPERS_API_KEY):
+            keys = {
+                CONF_VWORLD_API_KEY: entry.data[CONF_VWORLD_API_KEY],
+                CONF_KAKAODEVELOPERS_API_KEY: entry.data[CONF_KAKAODEVELOPERS_API_KEY],
+            }
+            break
+
+    for key in (CONF_VWORLD_API_KEY, CONF_KAKAODEVELOPERS_API_KEY):
+        if key in call.data:
+            keys[key] = call.data[key]
+        if not keys.get(key):
+            raise HomeAssistantError("API keys are not configured; pass them to the service")
+    return keys
+
+
+async def _async_import_routes(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Create a config entry for every route in a file."""
+    path = hass.config.path(call.data[ATTR_PATH])
+    if not os.path.abspath(path).startswith(os.path.abspath(hass.config.config_dir) + os.sep):
+        raise HomeAssistantError(f"{call.data[ATTR_PATH]} is outside the configuration directory")
+
+    try:
+        raw_routes = await hass.async_add_executor_job(_read_routes, path)
+    except (OSError, KeyError, ValueError) as e:
+        raise HomeAssistantError(f"Failed to read routes from {path}: {e}") from e
+
+    api_keys = _api_keys(hass, call)
+
+    failed = []
+    routes = []
+    for i, raw_route in enumerate(raw_routes):
+        try:
+            routes.append((i, _route_to_entry_data(ROUTE_SCHEMA(raw_route))))
+        except vol.Invalid as e:
+            failed.append({"route": i, "reason": "invalid_route", "error": str(e)})
+
+    # Geocode every distinct address once, concurrently, and hand the
+    # coordinates to the imports.
+    gc = GeoCoder(
+        api_keys[CONF_VWORLD_API_KEY],
+        async_get_clientsession(hass),
+        await async_get_geocache(hass),
+        (await async_get_limiters(hass)).get(SERVICE_VWORLD, api_keys[CONF_VWORLD_API_KEY]),
+        async_get_resilience(hass),
+    )
+    coords, errors = await gc.getcoords([
+        unquote_plus(point[CONF_LOCATION_ADDRESS])
+        for _, route in routes
+        for point in route_points(route)
+    ])
+
+    geocoded = []
+    for i, route in routes:
+        addresses = [unquote_plus(point[CONF_LOCATION_ADDRESS]) for point in route_points(route)]
+        route_errors = {a: errors[a] for a in dict.fromkeys(addresses) if a in errors}
+        if not all(isinstance(err, AddressNotFound) for err in route_errors.values()):
+            failed.append({"route": i, "reason": "cannot_connect"})
+            continue
+        if route_errors:
+            failed.append({"route": i, "reason": "addresses_not_found", "addresses": ", ".join(route_errors)})
+            continue
+        for point, address in zip(route_points(route), addresses):
+            point[CONF_LOCATION_X], point[CONF_LOCATION_Y] = coords[address]
+        geocoded.append((i, route))
+
+    results = await asyncio.gather(*(
+        hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_IMPORT}, data={**api_keys, **route}
+        )
+        for _, route in geocoded
+    ))
+
+    created = []
+    for (i, _), result in zip(geocoded, results):
+        if result["type"] == FlowResultType.CREATE_ENTRY:
+            created.append(result["title"])
+        else:
+            failed.append({
+                "route": i,
+                "reason": result.get("reason"),
+                **(result.get("description_placeholders") or {}),
+            })
+
+    failed.sort(key=lambda f: f["route"])
+    _LOGGER.info("Imported %d routes from %s, %d failed", len(created), path, len(failed))
+    return {"created": created, "failed": failed}
+
+
+def _arrival_time(value) -> datetime:
+    now = dt_util.now()
+    if isinstance(value, time):
+        arrival = datetime.combine(now.date(), value, now.tzinfo)
+        return arrival if arrival > now else arrival + timedelta(days=1)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value
+
+
+async def _async_plan_departure(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Find the latest departure for a route that arrives on time."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    coordinator = hass.data.get(DOMAIN, {}).get(DATA_COORDINATOR)
+    navi = coordinator.routes.get(entry_id) if coordinator is not None else None
+    if navi is None:
+        raise HomeAssistantError(f"{entry_id} is not a loaded KR ETA route")
+    if navi.destinations:
+        raise HomeAssistantError("Departures can only be planned for single routes")
+
+    arrive_by = _arrival_time(call.data[ATTR_ARRIVE_BY])
+    # Future directions need a departure in the future.
+    earliest = dt_util.now() + timedelta(minutes=1)
+    if arrive_by <= earliest:
+        raise HomeAssistantError("The arrival time must be in the future")
+
+    planner = DeparturePlanner(navi, max_calls=call.data[ATTR_MAX_CALLS])
+    try:
+        return await planner.async_plan(arrive_by, earliest)
+    except ValueError as e:
+        raise HomeAssistantError(str(e)) from e
+
+
+def async_setup_services(hass: HomeAssistant):
+    async def async_import_routes(call: ServiceCall) -> ServiceResponse:
+        return await _async_import_routes(hass, call)
+
+    async def async_plan_departure(call: ServiceCall) -> ServiceResponse:
+        return await _async_plan_departure(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_ROUTES,
+        async_import_routes,
+        schema=IMPORT_ROUTES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_DEPARTURE,
+        async_plan_departure,
+        schema=PLAN_DEPARTURE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,82 @@
+"""Pooled HTTP sessions, one per Kakao Mobility API key."""
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util import ssl as ssl_util
+
+from .const import DATA_SESSIONS, DOMAIN, SESSION_KEEPALIVE, SESSION_POOL_SIZE
+
+
+class SessionPool:
+    """Keep-alive sessions shared by the routes of each API key.
+
+    A session is created for the first route of a key, and closed when the
+    last route using it is unloaded.
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        # Entry ids of the routes using each key.
+        self._users: dict[str, set[str]] = {}
+        self.created = 0
+
+    @callback
+    def async_acquire(self, api_key: str, entry_id: str) -> aiohttp.ClientSession:
+        """Return the session of an API key, for a route."""
+        session = self._sessions.get(api_key)
+        if session is None or session.closed:
+            session = self._sessions[api_key] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=SESSION_POOL_SIZE,
+                    keepalive_timeout=SESSION_KEEPALIVE,
+                    ssl=ssl_util.get_default_context(),
+                ),
+                headers={"User-Agent": SERVER_SOFTWARE},
+            )
+            self.created += 1
+
+        self._users.setdefault(api_key, set()).add(entry_id)
+        return session
+
+    async def async_release(self, entry_id: str):
+        """Release the sessions of a route, closing those no longer used."""
+        for api_key in [k for k, users in self._users.items() if entry_id in users]:
+            users = self._users[api_key]
+            users.discard(entry_id)
+            if not users:
+                del self._users[api_key]
+                session = self._sessions.pop(api_key, None)
+                if session is not None:
+                    await session.close()
+
+    async def async_close(self):
+        """Close every session."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._users.clear()
+        for session in sessions:
+            await session.close()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "routes": sum(len(users) for users in self._users.values()),
+            "created": self.created,
+        }
+
+
+@callback
+def async_get_sessions(hass: HomeAssistant) -> SessionPool:
+    """Return the session pool shared by all entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SESSIONS not in domain_data:
+        pool = domain_data[DATA_SESSIONS] = SessionPool()
+
+        async def async_close(event: Event):
+            await pool.async_close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close)
+
+    return domain_data[DATA_SESSIONS]
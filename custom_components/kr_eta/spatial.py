@@ -0,0 +1,134 @@
+"""Grid index of nearby points, for snapping and reverse geocoding."""
+from collections import OrderedDict
+import math
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_SPATIAL,
+    DOMAIN,
+    GRID_CELL_SIZE,
+    GRID_MAX_SIZE,
+    SNAP_TOLERANCE,
+)
+
+# Meters per degree of latitude; a degree of longitude is shorter by cos(lat).
+METERS_PER_DEGREE = 111_320
+
+
+def distance(x1: float, y1: float, x2: float, y2: float) -> float:
+    """Return the distance in meters between two nearby points."""
+    kx = METERS_PER_DEGREE * math.cos(math.radians((y1 + y2) / 2))
+    return math.hypot((x2 - x1) * kx, (y2 - y1) * METERS_PER_DEGREE)
+
+
+class GridIndex:
+    """Points with values, bucketed into cells of about cell_size meters.
+
+    Lookups visit the 3x3 cells around a point, so they find every point
+    within cell_size. The least recently used cells are evicted beyond
+    max_size points.
+    """
+
+    def __init__(self, cell_size: float = GRID_CELL_SIZE, max_size: int = GRID_MAX_SIZE):
+        self.cell_size = cell_size
+        self.max_size = max_size
+        self._lat_step = cell_size / METERS_PER_DEGREE
+        self._cells: OrderedDict[tuple[int, int], list[tuple[float, float, Any]]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _column(self, row: int, x: float) -> int:
+        # Cells of a row are as wide as they are tall at its latitude.
+        cos = math.cos(math.radians((row + 0.5) * self._lat_step))
+        return math.floor(x * max(cos, 0.01) / self._lat_step)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        row = math.floor(y / self._lat_step)
+        return row, self._column(row, x)
+
+    def nearest(self, x: float, y: float, tolerance: float) -> Optional[tuple[float, float, Any]]:
+        """Return the (x, y, value) closest to a point, within tolerance meters."""
+        best = None
+        best_distance = tolerance
+        row = math.floor(y / self._lat_step)
+        for r in (row - 1, row, row + 1):
+            column = self._column(r, x)
+            for c in (column - 1, column, column + 1):
+                for point in self._cells.get((r, c), ()):
+                    d = distance(x, y, point[0], point[1])
+                    if d <= best_distance:
+                        best, best_distance = point, d
+
+        if best is not None:
+            self._cells.move_to_end(self._cell(best[0], best[1]))
+        return best
+
+    def get(self, x: float, y: float, tolerance: float) -> tuple[bool, Any]:
+        """Return (found, value) of the closest point within tolerance."""
+        point = self.nearest(x, y, tolerance)
+        if point is None:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        return True, point[2]
+
+    def add(self, x: float, y: float, value: Any = None):
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, []).append((x, y, value))
+        self._cells.move_to_end(cell)
+        self._size += 1
+        while self._size > self.max_size:
+            _, points = self._cells.popitem(last=False)
+            self._size -= len(points)
+            self.evictions += len(points)
+
+    def snap(self, x: float, y: float, tolerance: float) -> tuple[float, float]:
+        """Return a known point within tolerance, or add and return x, y."""
+        point = self.nearest(x, y, tolerance)
+        if point is not None:
+            self.hits += 1
+            return point[0], point[1]
+
+        self.misses += 1
+        self.add(x, y)
+        return x, y
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "cells": len(self._cells),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SpatialCache:
+    """Snapped live origins and reverse geocoded addresses."""
+
+    def __init__(self):
+        self.origins = GridIndex()
+        self.addresses = GridIndex()
+
+    def snap_origin(self, x: float, y: float) -> tuple[float, float]:
+        return self.origins.snap(x, y, SNAP_TOLERANCE)
+
+    @property
+    def stats(self) -> dict:
+        return {"origins": self.origins.stats, "addresses": self.addresses.stats}
+
+
+@callback
+def async_get_spatial_cache(hass: HomeAssistant) -> SpatialCache:
+    """Return the spatial cache shared by all entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SPATIAL not in domain_data:
+        domain_data[DATA_SPATIAL] = SpatialCache()
+
+    return domain_data[DATA_SPATIAL]
@@ -0,0 +1,128 @@
+"""Presence and calendar triggers that wake a dormant route."""
+from datetime import datetime, timedelta
+import logging
+from typing import Callable, Optional
+
+from homeassistant.const import STATE_HOME
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ACTIVE_DURATION,
+    CONF_TRIGGER_CALENDAR,
+    CONF_TRIGGER_ENTITIES,
+    CONF_TRIGGER_LEAD,
+    CONF_TRIGGER_ZONE,
+    DEFAULT_ACTIVE_DURATION,
+    DEFAULT_TRIGGER_LEAD,
+    DEFAULT_TRIGGER_ZONE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RouteTriggers:
+    """Activate a route when a tracked person leaves a zone or a calendar
+    event is about to start."""
+
+    def __init__(self, hass: HomeAssistant, coordinator, entry_id: str, options):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self.entities = list(options.get(CONF_TRIGGER_ENTITIES) or [])
+        self.zone = options.get(CONF_TRIGGER_ZONE) or DEFAULT_TRIGGER_ZONE
+        self.calendar = options.get(CONF_TRIGGER_CALENDAR)
+        self.lead = timedelta(minutes=options.get(CONF_TRIGGER_LEAD, DEFAULT_TRIGGER_LEAD))
+        self.active_duration = timedelta(
+            minutes=options.get(CONF_ACTIVE_DURATION, DEFAULT_ACTIVE_DURATION)
+        )
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        self._activated_for: Optional[datetime] = None
+
+    @callback
+    def async_setup(self) -> Callable[[], None]:
+        """Start listening; returns a function that stops."""
+        if self.entities:
+            self._unsubs.append(async_track_state_change_event(
+                self.hass, self.entities, self._async_tracker_changed
+            ))
+        if self.calendar:
+            self._unsubs.append(async_track_state_change_event(
+                self.hass, [self.calendar], self._async_calendar_changed
+            ))
+            self._async_calendar_changed()
+        return self.async_unsubscribe
+
+    @callback
+    def async_unsubscribe(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        self._cancel_timer()
+
+    def _zone_state(self) -> Optional[str]:
+        """Return the state of a tracker inside the zone."""
+        if self.zone == DEFAULT_TRIGGER_ZONE:
+            return STATE_HOME
+        state = self.hass.states.get(self.zone)
+        return state.name if state is not None else None
+
+    @callback
+    def _async_tracker_changed(self, event: Event):
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is None or new_state is None:
+            return
+
+        zone = self._zone_state()
+        if old_state.state == zone and new_state.state != zone:
+            self._async_activate(f"{new_state.entity_id} left {self.zone}")
+
+    @callback
+    def _async_calendar_changed(self, event: Optional[Event] = None):
+        """Schedule activation ahead of the next calendar event."""
+        self._cancel_timer()
+        state = self.hass.states.get(self.calendar)
+        start_time = state.attributes.get("start_time") if state is not None else None
+        start = dt_util.parse_datetime(start_time) if start_time else None
+        if start is None:
+            return
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+        now = dt_util.now()
+        if start <= now or start == self._activated_for:
+            return
+
+        if start - self.lead <= now:
+            self._activated_for = start
+            self._async_activate(f"{self.calendar} starts at {start}")
+            return
+
+        @callback
+        def async_due(_now: datetime):
+            self._unsub_timer = None
+            self._activated_for = start
+            self._async_activate(f"{self.calendar} starts at {start}")
+
+        self._unsub_timer = async_track_point_in_time(self.hass, async_due, start - self.lead)
+
+    def _cancel_timer(self):
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_activate(self, reason: str):
+        schedule = self.coordinator.schedules.get(self.entry_id)
+        if schedule is None:
+            return
+
+        _LOGGER.debug("Activating KR ETA route %s: %s", self.entry_id, reason)
+        schedule.activate(dt_util.now(), self.active_duration)
+        self.hass.async_create_task(self.coordinator.async_refresh_route(self.entry_id))
@@ -1,13 +1,54 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
 import aiohttp
 import async_timeout
 
+from .const import REVERSE_GEOCODE_TOLERANCE
+from .resilience import Resilience, UpstreamError
+
+if TYPE_CHECKING:
+    from .geocache import GeoCache
+    from .ratelimit import ApiKeyLimiter
+    from .spatial import GridIndex
+
+MAX_CONCURRENT_GEOCODES = 4
+
+
+class AddressNotFound(Exception):
+    """VWorld has no coordinates for an address."""
+
+
 class GeoCoder:
-    def __init__(self, api_key: str, session: aiohttp.ClientSession):
+    def __init__(
+        self,
+        api_key: str,
+        session: aiohttp.ClientSession,
+        cache: Optional["GeoCache"] = None,
+        limiter: Optional["ApiKeyLimiter"] = None,
+        resilience: Optional[Resilience] = None,
+        addresses: Optional["GridIndex"] = None,
+    ):
         self.api_key = api_key
         self.session = session
+        self.cache = cache
+        self.limiter = limiter
+        self.resilience = resilience
+        # Reverse geocoded addresses, reused for nearby points.
+        self.addresses = addresses
+        self.host = "api.vworld.kr"
         self.apiurl = "https://api.vworld.kr/req/address?"
 
     async def getcoord(self, address: str, crs: str = "epsg:4326"):
+        if self.cache is not None:
+            key = self.cache.key(address, crs)
+            found, point = self.cache.get(key)
+            if found:
+                if point is None:
+                    raise AddressNotFound(f"Address not found: {address}")
+                return point
+
         params = {
             "service": "address",
             "request": "getCoord",
@@ -17,31 +58,126 @@ class GeoCoder:
             "format": "json",
             "type": "road",
         }
-        async with async_timeout.timeout(10):
-            async with self.session.get(self.apiurl, params=params) as response:
-                if not response.status == 200:
-                    raise Exception(f"Failed to get coordinate: {response.status}")
+        if self.resilience is None:
+            data = await self._async_fetch(params)
+        else:
+            data = await self.resilience.async_call(self.host, lambda: self._async_fetch(params))
 
-                data = await response.json()
-        
         data = data.get('response')
         data_status = data.get('status')
         if data_status == 'OK':
             result = data.get('result')
-            return result.get('point').get('x'), result.get('point').get('y')
+            point = result.get('point').get('x'), result.get('point').get('y')
+            if self.cache is not None:
+                self.cache.set(key, point)
+            return point
 
         if data_status == 'ERROR':
-            raise Exception(f"VWorld API Error: {data.get('error').get('text')}")
+            raise UpstreamError(f"VWorld API Error: {data.get('error').get('text')}")
         elif data_status == 'NOT_FOUND':
-            raise Exception(f"Address not found: {address}")
+            if self.cache is not None:
+                self.cache.set_not_found(key)
+            raise AddressNotFound(f"Address not found: {address}")
         else:
-            raise Exception(f"Unknown status: {data_status}")
+            raise UpstreamError(f"Unknown status: {data_status}")
 
+    async def getaddress(self, x: float, y: float, crs: str = "epsg:4326") -> Optional[str]:
+        """Return the road address of a point, or None if it has none."""
+        if self.addresses is not None:
+            found, address = self.addresses.get(x, y, REVERSE_GEOCODE_TOLERANCE)
+            if found:
+                return address
+
+        params = {
+            "service": "address",
+            "request": "getAddress",
+            "key": self.api_key,
+            "crs": crs,
+            "point": f"{x},{y}",
+            "format": "json",
+            "type": "road",
+        }
+        if self.resilience is None:
+            data = await self._async_fetch(params)
+        else:
+            data = await self.resilience.async_call(self.host, lambda: self._async_fetch(params))
+
+        data = data.get('response')
+        data_status = data.get('status')
+        if data_status == 'OK':
+            address = data.get('result')[0].get('text')
+        elif data_status == 'NOT_FOUND':
+            address = None
+        elif data_status == 'ERROR':
+            raise UpstreamError(f"VWorld API Error: {data.get('error').get('text')}")
+        else:
+            raise UpstreamError(f"Unknown status: {data_status}")
+
+        if self.addresses is not None:
+            self.addresses.add(x, y, address)
+        return address
+
+    async def getcoords(self, addresses: list[str], crs: str = "epsg:4326", limit: int = MAX_CONCURRENT_GEOCODES):
+        """Geocode many addresses concurrently.
+
+        Returns (points, errors), both keyed by address, so every failed
+        address is reported in one pass.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def getcoord(address):
+            async with semaphore:
+                return await self.getcoord(address, crs)
+
+        unique = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(*(getcoord(a) for a in unique), return_exceptions=True)
+
+        points, errors = {}, {}
+        for address, result in zip(unique, results):
+            if isinstance(result, Exception):
+                errors[address] = result
+            else:
+                points[address] = result
+
+        return points, errors
+
+    async def _async_fetch(self, params: dict):
+        if self.limiter is not None:
+            await self.limiter.async_acquire()
+
+        async with async_timeout.timeout(10):
+            async with self.session.get(self.apiurl, params=params) as response:
+                if not response.status == 200:
+                    raise UpstreamError.from_status(f"Failed to get coordinate: {response.status}", response.status)
+
+                return await response.json()
+
+@dataclass(frozen=True, slots=True)
 class Location:
-    def __init__(self, name: str, x: float, y: float):
-        self.name = name
-        self.x = x
-        self.y = y
+    """An immutable named point; x is the longitude and y the latitude."""
+
+    name: Optional[str]
+    x: float
+    y: float
+    # The point as a Kakao Mobility directions parameter.
+    param: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Config entries store coordinates as strings.
+        try:
+            x, y = float(self.x), float(self.y)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid coordinates for {self.name}: {self.x}, {self.y}") from e
+        if not (-180 <= x <= 180 and -90 <= y <= 90):
+            raise ValueError(f"Coordinates out of range for {self.name}: {x}, {y}")
+
+        param = f"{x},{y}"
+        if self.name is not None:
+            param += f",name={self.name}"
+
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "param", param)
 
     @classmethod
     async def from_address(cls, gc: GeoCoder, name: str, addr: str):
@@ -0,0 +1,20 @@
+"""Smoke test so the benchmark harness keeps up with the integration."""
+import pytest
+
+from benchmarks.bench_polling import parse_args, run
+
+# The fake upstream listens on a local socket.
+@pytest.mark.usefixtures("socket_enabled")
+async def test_benchmark_runs():
+    result = await run(parse_args([
+        "--routes", "6",
+        "--cycles", "2",
+        "--latency", "0",
+        "--jitter", "0",
+        "--duplicate-ratio", "0.5",
+    ]))
+
+    assert result["sensors_with_state"] == 6
+    assert result["geocode_upstream_calls"] == 4
+    assert result["upstream_calls_per_refresh"] <= 6
+    assert result["update_latency_p99_ms"] >= result["fetch_latency_p50_ms"] >= 0
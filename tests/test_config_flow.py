@@ -0,0 +1,238 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant import config_entries, data_entry_flow
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.kr_eta.const import (
+    CONF_DESTINATIONS,
+    CONF_ENDPOINT,
+    CONF_KAKAODEVELOPERS_API_KEY,
+    CONF_STARTPOINT,
+    CONF_VWORLD_API_KEY,
+    CONF_ROUTE_TYPE,
+    CONF_WAYPOINTS,
+    DOMAIN,
+    ROUTE_TYPE_MATRIX,
+)
+from custom_components.kr_eta.resilience import UpstreamError
+from custom_components.kr_eta.vworld import AddressNotFound, GeoCoder
+
+API_KEYS = {
+    CONF_VWORLD_API_KEY: "vworld_key",
+    CONF_KAKAODEVELOPERS_API_KEY: "kakao_key",
+}
+
+def fake_point(address):
+    # About 18 km east of the others.
+    return ("127.2", "37.0") if "far" in address else ("127.0", "37.0")
+
+async def fake_getcoords(self, addresses, crs="epsg:4326", limit=4):
+    points = {a: fake_point(a) for a in addresses if "unknown" not in a}
+    errors = {a: AddressNotFound(f"Address not found: {a}") for a in addresses if "unknown" in a}
+    return points, errors
+
+@pytest.fixture(autouse=True)
+def mock_geocoder():
+    with patch.object(GeoCoder, "getcoords", fake_getcoords):
+        yield
+
+@pytest.fixture(autouse=True)
+def mock_setup_entry():
+    with patch("custom_components.kr_eta.async_setup_entry", AsyncMock(return_value=True)):
+        yield
+
+async def test_route_step(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], API_KEYS)
+    assert result["type"] == data_entry_flow.FlowResultType.MENU
+
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "route"})
+    assert result["step_id"] == "route"
+
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {
+        "start_name": "Home",
+        "start_address": "home address",
+        "end_name": "Office",
+        "end_address": "office address",
+        "waypoints": "waypoint 1\n\nwaypoint 2\n",
+    })
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["title"] == "ETA Home ➡ Office (2 waypoints)"
+    data = result["data"]
+    assert data[CONF_STARTPOINT] == {"name": "Home", "address": "home address", "x": "127.0", "y": "37.0"}
+    assert data[CONF_ENDPOINT]["x"] == "127.0"
+    assert [wp["address"] for wp in data[CONF_WAYPOINTS]] == ["waypoint 1", "waypoint 2"]
+
+async def test_route_step_reports_all_failed_addresses(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], API_KEYS)
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "route"})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {
+        "start_name": "Home",
+        "start_address": "unknown home",
+        "end_name": "Office",
+        "end_address": "office address",
+        "waypoints": "unknown waypoint",
+    })
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"base": "addresses_not_found"}
+    assert result["description_placeholders"] == {"addresses": "unknown home, unknown waypoint"}
+
+async def test_route_step_tells_outages_from_unknown_addresses(hass):
+    async def getcoords(self, addresses, crs="epsg:4326", limit=4):
+        return {}, {a: UpstreamError("VWorld API Error: down") for a in addresses}
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], API_KEYS)
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "route"})
+    with patch.object(GeoCoder, "getcoords", getcoords):
+        result = await hass.config_entries.flow.async_configure(result["flow_id"], {
+            "start_name": "Home",
+            "start_address": "home address",
+            "end_name": "Office",
+            "end_address": "office address",
+        })
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+async def test_import(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={
+            **API_KEYS,
+            CONF_STARTPOINT: {"name": "Home", "address": "home address"},
+            CONF_ENDPOINT: {"name": "Office", "address": "office address"},
+        },
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["title"] == "ETA Home ➡ Office"
+    assert result["data"][CONF_ENDPOINT]["y"] == "37.0"
+    assert result["data"][CONF_WAYPOINTS] == []
+
+async def test_import_needs_api_keys(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={
+            CONF_STARTPOINT: {"name": "Home", "address": "home address"},
+            CONF_ENDPOINT: {"name": "Office", "address": "office address"},
+        },
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.ABORT
+    assert result["reason"] == "need_api_keys"
+
+async def test_import_address_not_found(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={
+            **API_KEYS,
+            CONF_STARTPOINT: {"name": "Home", "address": "home address"},
+            CONF_ENDPOINT: {"name": "Office", "address": "unknown office"},
+        },
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.ABORT
+    assert result["reason"] == "addresses_not_found"
+
+async def test_destination_step_rejects_far_destinations(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], API_KEYS)
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "start_location"}
+    )
+    with patch.object(GeoCoder, "getcoord", AsyncMock(side_effect=fake_point)):
+        result = await hass.config_entries.flow.async_configure(result["flow_id"], {
+            "name": "Home", "address": "home address", CONF_ROUTE_TYPE: ROUTE_TYPE_MATRIX,
+        })
+        assert result["step_id"] == "destination_location"
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"name": "Gym", "address": "far gym address"}
+        )
+        assert result["type"] == data_entry_flow.FlowResultType.FORM
+        assert result["errors"] == {"base": "destination_too_far"}
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"name": "School", "address": "school address"}
+        )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert [d["name"] for d in result["data"][CONF_DESTINATIONS]] == ["School"]
+
+async def test_import_rejects_far_destinations(hass):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={
+            **API_KEYS,
+            CONF_ROUTE_TYPE: ROUTE_TYPE_MATRIX,
+            CONF_STARTPOINT: {"name": "Home", "address": "home address"},
+            CONF_DESTINATIONS: [
+                {"name": "School", "address": "school address"},
+                {"name": "Gym", "address": "far gym address"},
+            ],
+        },
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.ABORT
+    assert result["reason"] == "destinations_too_far"
+    assert result["description_placeholders"] == {"addresses": "far gym address"}
+
+async def test_options_reject_live_origin_with_compared_priorities(hass):
+    entry = MockConfigEntry(domain=DOMAIN, data={
+        **API_KEYS,
+        CONF_STARTPOINT: {"name": "Home", "address": "a", "x": "127.0", "y": "37.0"},
+        CONF_ENDPOINT: {"name": "Work", "address": "b", "x": "127.1", "y": "37.1"},
+        CONF_WAYPOINTS: [],
+    })
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={"origin_tracker": "device_tracker.car", "compare_priorities": True},
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"origin_tracker": "origin_tracker_compare_priorities"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={"origin_tracker": "device_tracker.car"},
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options["origin_tracker"] == "device_tracker.car"
+
+async def test_options_reject_detailed_with_compared_priorities(hass):
+    entry = MockConfigEntry(domain=DOMAIN, data={
+        **API_KEYS,
+        CONF_STARTPOINT: {"name": "Home", "address": "a", "x": "127.0", "y": "37.0"},
+        CONF_ENDPOINT: {"name": "Work", "address": "b", "x": "127.1", "y": "37.1"},
+        CONF_WAYPOINTS: [],
+    })
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={"detailed": True, "compare_priorities": True},
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"detailed": "detailed_compare_priorities"}
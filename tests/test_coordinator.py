@@ -0,0 +1,152 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from custom_components.kr_eta import coordinator as coordinator_module
+from custom_components.kr_eta.coordinator import KrEtaCoordinator
+from custom_components.kr_eta.history import HistoryStore, RouteHistory
+from custom_components.kr_eta.schedule import RouteSchedule
+
+def make_navi(summary=None, side_effect=None):
+    navi = Mock(destinations=[], limiter=None)
+    navi.async_get_eta = AsyncMock(return_value=summary, side_effect=side_effect)
+    return navi
+
+async def test_refresh_fetches_all_routes(hass):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route("a", make_navi({"duration": 60}), RouteSchedule.from_options({}))
+    coordinator.add_route("b", make_navi({"duration": 120}), RouteSchedule.from_options({}))
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data == {"a": {"duration": 60}, "b": {"duration": 120}}
+
+async def test_failed_route_does_not_fail_others(hass):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route("a", make_navi(side_effect=Exception("boom")), RouteSchedule.from_options({}))
+    coordinator.add_route("b", make_navi({"duration": 120}), RouteSchedule.from_options({}))
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data == {"a": None, "b": {"duration": 120}}
+
+async def test_remove_route(hass):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route("a", make_navi({"duration": 60}), RouteSchedule.from_options({}))
+    await coordinator.async_refresh()
+
+    coordinator.remove_route("a")
+
+    assert coordinator.routes == {}
+    assert coordinator.data == {}
+
+async def test_concurrency_is_bounded(hass):
+    coordinator = KrEtaCoordinator(hass)
+    running = 0
+    peak = 0
+
+    async def get_eta():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return {"duration": 60}
+
+    for i in range(coordinator_module.MAX_CONCURRENT_REQUESTS * 3):
+        navi = Mock(destinations=[], limiter=None)
+        navi.async_get_eta = get_eta
+        coordinator.add_route(str(i), navi, RouteSchedule.from_options({}))
+
+    await coordinator.async_refresh()
+
+    assert len(coordinator.data) == coordinator_module.MAX_CONCURRENT_REQUESTS * 3
+    assert peak == coordinator_module.MAX_CONCURRENT_REQUESTS
+
+async def test_only_due_routes_are_fetched(hass):
+    coordinator = KrEtaCoordinator(hass)
+    navi_a = make_navi({"duration": 60})
+    navi_b = make_navi({"duration": 120})
+    coordinator.add_route("a", navi_a, RouteSchedule.from_options({}))
+    coordinator.add_route("b", navi_b, RouteSchedule.from_options({}))
+    await coordinator.async_refresh()
+
+    navi_a.async_get_eta.return_value = {"duration": 90}
+    coordinator.schedules["a"].request_refresh()
+    await coordinator.async_refresh()
+
+    assert navi_a.async_get_eta.await_count == 2
+    assert navi_b.async_get_eta.await_count == 1
+    assert coordinator.data == {"a": {"duration": 90}, "b": {"duration": 120}}
+    assert coordinator.schedules["b"].next_refresh is not None
+
+async def test_predicted_routes_are_not_fetched(hass, tmp_path):
+    coordinator = KrEtaCoordinator(hass, HistoryStore(hass))
+    coordinator.history.routes["a"] = RouteHistory(str(tmp_path / "a.bin"))
+    navi = make_navi({"duration": 600, "distance": 10000})
+    coordinator.add_route("a", navi, RouteSchedule.from_options({}), error_budget=0.1)
+    predictor = coordinator.predictors["a"]
+
+    await coordinator.async_refresh()
+    assert navi.async_get_eta.await_count == 1
+
+    predictor.predict = Mock(return_value=620)
+    coordinator.schedules["a"].request_refresh()
+    await coordinator.async_refresh()
+
+    assert navi.async_get_eta.await_count == 1
+    assert coordinator.data["a"] == {"duration": 620, "distance": 10000, "predicted": True}
+
+async def test_readding_route_replaces_predictor(hass, tmp_path):
+    coordinator = KrEtaCoordinator(hass, HistoryStore(hass))
+    coordinator.history.routes["a"] = RouteHistory(str(tmp_path / "a.bin"))
+    navi = make_navi({"duration": 600})
+    coordinator.add_route("a", navi, RouteSchedule.from_options({}), error_budget=0.1)
+
+    coordinator.add_route("a", navi, RouteSchedule.from_options({}), error_budget=0)
+    assert "a" not in coordinator.predictors
+
+    coordinator.add_route(
+        "a", navi, RouteSchedule.from_options({}), error_budget=0.1, predict_from_history=False
+    )
+    assert "a" not in coordinator.predictors
+
+async def test_live_origin_routes_have_no_history(hass, tmp_path):
+    coordinator = KrEtaCoordinator(hass, HistoryStore(hass))
+    coordinator.history.routes["a"] = RouteHistory(str(tmp_path / "a.bin"))
+    coordinator.history.async_record = AsyncMock()
+    navi = make_navi({"duration": 600, "distance": 10000})
+    coordinator.add_route(
+        "a", navi, RouteSchedule.from_options({}), error_budget=0.1, live_origin=True
+    )
+    assert "a" not in coordinator.predictors
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data["a"] == {"duration": 600, "distance": 10000}
+    coordinator.history.async_record.assert_not_awaited()
+
+    # Without the tracker, the route is recorded again.
+    coordinator.add_route("a", navi, RouteSchedule.from_options({}), error_budget=0.1)
+    assert "a" in coordinator.predictors
+    coordinator.schedules["a"].request_refresh()
+    await coordinator.async_refresh()
+    coordinator.history.async_record.assert_awaited_once()
+
+async def test_stale_results_are_not_recorded(hass, tmp_path):
+    coordinator = KrEtaCoordinator(hass, HistoryStore(hass))
+    coordinator.history.routes["a"] = RouteHistory(str(tmp_path / "a.bin"))
+    coordinator.history.async_record = AsyncMock()
+    navi = make_navi({"duration": 600, "distance": 10000, "stale": True})
+    coordinator.add_route("a", navi, RouteSchedule.from_options({}), error_budget=0.1)
+    predictor = coordinator.predictors["a"]
+    schedule = coordinator.schedules["a"]
+    schedule.record = Mock(wraps=schedule.record)
+
+    await coordinator.async_refresh()
+
+    # Served, and rescheduled as if the fetch had failed.
+    assert coordinator.data["a"]["duration"] == 600
+    assert schedule.record.call_args.args[1] is None
+    assert predictor.live == 0
+    coordinator.history.async_record.assert_not_awaited()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.kr_eta.etacache import EtaCache
+
+def at(offset):
+    return patch(
+        "custom_components.kr_eta.etacache.time.monotonic",
+        return_value=time.monotonic() + offset,
+    )
+
+async def test_fresh_hit():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    fetch = AsyncMock(return_value={"duration": 60})
+
+    assert await cache.async_get("k", fetch) == {"duration": 60}
+    assert await cache.async_get("k", fetch) == {"duration": 60}
+
+    fetch.assert_awaited_once()
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+async def test_stale_while_revalidate():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    await cache.async_get("k", AsyncMock(return_value={"duration": 60}))
+
+    fetch = AsyncMock(return_value={"duration": 90})
+    with at(15):
+        assert await cache.async_get("k", fetch) == {"duration": 60, "stale": True}
+        await asyncio.sleep(0)
+    fetch.assert_awaited_once()
+    assert cache.stale_hits == 1
+
+    # The background refresh replaced the entry.
+    assert await cache.async_get("k", fetch) == {"duration": 90}
+    assert cache.hits == 1
+
+async def test_expired_entry_is_refetched():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    await cache.async_get("k", AsyncMock(return_value={"duration": 60}))
+
+    with at(30):
+        assert await cache.async_get("k", AsyncMock(return_value={"duration": 90})) == {"duration": 90}
+
+async def test_serve_cached_on_error():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    await cache.async_get("k", AsyncMock(return_value={"duration": 60}))
+
+    failing = AsyncMock(side_effect=Exception("boom"))
+    with at(30):
+        assert await cache.async_get("k", failing) == {"duration": 60, "stale": True}
+    assert cache.error_hits == 1
+
+    with at(61), pytest.raises(Exception, match="boom"):
+        await cache.async_get("k", failing)
+
+async def test_stale_matrix_summaries_are_tagged():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    await cache.async_get("k", AsyncMock(return_value=[{"duration": 60}, None]))
+
+    with at(30):
+        assert await cache.async_get("k", AsyncMock(side_effect=Exception("boom"))) == [
+            {"duration": 60, "stale": True}, None,
+        ]
+    # The cached value itself is untouched.
+    assert await cache.async_get("k", AsyncMock()) == [{"duration": 60}, None]
+
+async def test_error_without_cache_raises():
+    cache = EtaCache()
+    with pytest.raises(Exception, match="boom"):
+        await cache.async_get("k", AsyncMock(side_effect=Exception("boom")))
+
+async def test_old_entries_are_pruned():
+    cache = EtaCache(ttl=10, stale_ttl=20, error_ttl=60)
+    await cache.async_get("a", AsyncMock(return_value=1))
+
+    with at(61):
+        await cache.async_get("b", AsyncMock(return_value=2))
+    assert cache.stats["size"] == 1
@@ -0,0 +1,80 @@
+import time
+from unittest.mock import patch
+
+from homeassistant.helpers.storage import Store
+
+from custom_components.kr_eta.geocache import GeoCache, STORAGE_KEY, async_get_geocache
+
+def test_key_normalization():
+    assert GeoCache.key("  서울특별시  중구\t세종대로 110 ", "EPSG:4326") == \
+        GeoCache.key("서울특별시 중구 세종대로 110", "epsg:4326")
+    assert GeoCache.key("Some Address", "epsg:4326") != GeoCache.key("Some Address", "epsg:5186")
+
+def test_hit_and_miss():
+    cache = GeoCache()
+    assert cache.get("k") == (False, None)
+
+    cache.set("k", ("127.1", "37.1"))
+    assert cache.get("k") == (True, ("127.1", "37.1"))
+    assert cache.stats == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+def test_not_found_is_cached():
+    cache = GeoCache()
+    cache.set_not_found("k")
+    assert cache.get("k") == (True, None)
+
+def test_expiry():
+    cache = GeoCache(ttl=10, not_found_ttl=1)
+    cache.set("k", (1, 2))
+    cache.set_not_found("nf")
+
+    with patch("custom_components.kr_eta.geocache.time.time", return_value=time.time() + 5):
+        assert cache.get("k") == (True, (1, 2))
+        assert cache.get("nf") == (False, None)
+
+    with patch("custom_components.kr_eta.geocache.time.time", return_value=time.time() + 11):
+        assert cache.get("k") == (False, None)
+    assert cache.stats["size"] == 0
+
+def test_lru_eviction():
+    cache = GeoCache(max_size=2)
+    cache.set("a", (1, 1))
+    cache.set("b", (2, 2))
+    cache.get("a")
+    cache.set("c", (3, 3))
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, (1, 1))
+    assert cache.get("c") == (True, (3, 3))
+    assert cache.evictions == 1
+
+async def test_persistence(hass, hass_storage):
+    cache = GeoCache(Store(hass, 1, STORAGE_KEY))
+    cache.set("k", ("127.1", "37.1"))
+    await cache.store.async_save(cache._data_to_save())
+
+    loaded = GeoCache(Store(hass, 1, STORAGE_KEY))
+    await loaded.async_load()
+    assert loaded.get("k") == (True, ("127.1", "37.1"))
+
+async def test_persistence_keeps_lru_order(hass, hass_storage):
+    cache = GeoCache(Store(hass, 1, STORAGE_KEY), max_size=3)
+    cache.set("a", (1, 1))
+    cache.set("b", (2, 2))
+    cache.set("c", (3, 3))
+    cache.get("a")
+    await cache.store.async_save(cache._data_to_save())
+
+    loaded = GeoCache(Store(hass, 1, STORAGE_KEY), max_size=3)
+    await loaded.async_load()
+    assert list(loaded._entries) == ["b", "c", "a"]
+
+    # b, the least recently used before saving, is evicted first.
+    loaded.set("d", (4, 4))
+    assert list(loaded._entries) == ["c", "a", "d"]
+    loaded.set("e", (5, 5))
+    assert list(loaded._entries) == ["a", "d", "e"]
+
+async def test_async_get_geocache_is_shared(hass):
+    cache = await async_get_geocache(hass)
+    assert await async_get_geocache(hass) is cache
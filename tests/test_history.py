@@ -0,0 +1,110 @@
+import os
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.kr_eta.history import (
+    HOUR,
+    SAMPLE,
+    HistoryStore,
+    RouteHistory,
+    hour_of_week,
+)
+
+# 2024-01-01 00:00 UTC, a Monday.
+T0 = 1704067200
+
+
+def add(history, timestamp, duration, distance=10000):
+    history.append(timestamp, duration, distance)
+    return history.add(timestamp, duration, distance)
+
+
+def test_rollups():
+    history = RouteHistory()
+    history.add(T0, 600, 10000)
+    history.add(T0 + 60, 900, 12000)
+    history.add(T0 + 400, 1200, 10000)
+
+    assert history.series("5min") == [
+        {"start": T0, "count": 2, "min": 600, "max": 900, "mean": 750, "distance": 11000},
+        {"start": T0 + 300, "count": 1, "min": 1200, "max": 1200, "mean": 1200, "distance": 10000},
+    ]
+    assert [b["count"] for b in history.series("hourly")] == [3]
+    assert [b["start"] for b in history.series("weekly")] == [hour_of_week(T0)]
+
+
+def test_new_hour():
+    history = RouteHistory()
+    assert history.add(T0, 600, 0)
+    assert not history.add(T0 + 60, 600, 0)
+    assert history.add(T0 + HOUR, 600, 0)
+
+
+def test_prune():
+    history = RouteHistory()
+    history.add(T0, 600, 0)
+    history.add(T0 + 14 * 24 * HOUR, 600, 0)
+    history.prune(T0 + 14 * 24 * HOUR)
+
+    assert len(history.minutes) == 1
+    assert len(history.hours) == 2
+    assert len(history.weekly) == 1
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "route.bin")
+    history = RouteHistory(path)
+    add(history, T0, 600)
+    add(history, T0 + 60, 900)
+    history.save(T0 + 60)
+    # Samples after the snapshot are replayed on load.
+    add(history, T0 + 120, 1200)
+
+    assert os.path.getsize(path) == 3 * SAMPLE.size
+
+    loaded = RouteHistory(path)
+    loaded.load()
+    assert loaded.series("5min") == history.series("5min")
+    assert loaded.series("weekly") == history.series("weekly")
+    assert loaded.last_sample == T0 + 120
+
+
+def test_save_compacts_samples(tmp_path):
+    path = str(tmp_path / "route.bin")
+    history = RouteHistory(path)
+    add(history, T0, 600)
+    add(history, T0 + 3 * 24 * HOUR, 900)
+    history.save(T0 + 3 * 24 * HOUR)
+
+    assert history.read_samples() == [(T0 + 3 * 24 * HOUR, 900, 10000)]
+    # The hourly rollups still have the dropped sample.
+    assert len(history.hours) == 2
+
+
+def test_torn_sample_is_ignored(tmp_path):
+    path = str(tmp_path / "route.bin")
+    history = RouteHistory(path)
+    add(history, T0, 600)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02")
+
+    loaded = RouteHistory(path)
+    loaded.load()
+    assert loaded.read_samples() == [(T0, 600, 10000)]
+
+
+async def test_store(hass, tmp_path):
+    hass.config.config_dir = str(tmp_path)
+    store = HistoryStore(hass)
+    await store.async_load_route("entry")
+
+    now = int(dt_util.utcnow().timestamp())
+    await store.async_record({"entry": (now, 600, 10000), "other": (now, 700, 10000)})
+    await store.async_unload_route("entry")
+
+    history = await store.async_load_route("entry")
+    assert history.series("hourly")[0]["count"] == 1
+    assert "other" not in store.routes
+
+    await store.async_remove_route("entry")
+    assert not os.path.exists(history.path)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.kr_eta.const import DATA_COORDINATOR, DOMAIN
+from custom_components.kr_eta.kakaomobility import Navi
+from custom_components.kr_eta.sessions import async_get_sessions
+
+def location(name, x, y):
+    return {"name": name, "address": name, "x": x, "y": y}
+
+@pytest.fixture
+def get_eta():
+    with patch.object(Navi, "async_get_eta", AsyncMock(return_value={"duration": 600, "distance": 5000})) as mock:
+        yield mock
+
+@pytest.fixture
+def options():
+    return {}
+
+@pytest.fixture
+async def entry(hass, get_eta, options):
+    entry = MockConfigEntry(domain=DOMAIN, options=options, data={
+        "vworld_api_key": "vworld",
+        "kakao_developers_api_key": "kakao",
+        "startpoint": location("Home", "127.0", "37.0"),
+        "endpoint": location("Work", "127.1", "37.1"),
+        "waypoints": [location("School", "127.05", "37.05")],
+    })
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    yield entry
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+async def test_options_update_route_in_place(hass, entry, get_eta):
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    navi = coordinator.routes[entry.entry_id]
+    get_eta.reset_mock()
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(entry, data={**entry.data, "waypoints": []})
+        hass.config_entries.async_update_entry(entry, options={"peak_interval": 10, "min_duration_delta": 3})
+        await hass.async_block_till_done()
+    # Past the cooldown of the refresh at setup
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    assert coordinator.routes[entry.entry_id] is navi
+    assert navi.waypoints == []
+    assert coordinator.schedules[entry.entry_id].peak_interval.total_seconds() == 600
+    get_eta.assert_awaited_once()
+
+    sensor = hass.data[DOMAIN][entry.entry_id]["sensors"][0]
+    assert sensor._min_duration_delta == 3
+    assert hass.states.get(sensor.entity_id).attributes["waypoints_count"] == 0
+
+async def test_api_key_change_reloads(hass, entry):
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(entry, data={**entry.data, "kakao_developers_api_key": "other"})
+        await hass.async_block_till_done()
+
+    reload.assert_called_once_with(entry.entry_id)
+
+@pytest.mark.parametrize("options", [{"error_budget": 10}])
+async def test_error_budget_off_stops_predictions(hass, entry):
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    assert entry.entry_id in coordinator.predictors
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(entry, options={"error_budget": 0})
+        await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    assert entry.entry_id not in coordinator.predictors
+
+@pytest.mark.parametrize("options", [{"error_budget": 10}])
+async def test_changed_points_stop_predictions_from_old_history(hass, entry):
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    assert coordinator.data[entry.entry_id] is not None
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, "endpoint": location("Gym", "127.2", "37.2")}
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    assert entry.entry_id not in coordinator.predictors
+    # The result for the old endpoint is gone until the route is refreshed.
+    assert entry.entry_id not in coordinator.data
+
+    # Later option changes don't bring the old history back.
+    hass.config_entries.async_update_entry(entry, options={"error_budget": 20})
+    await hass.async_block_till_done()
+    assert entry.entry_id not in coordinator.predictors
+
+async def test_failed_setup_releases_session(hass, get_eta):
+    entry = MockConfigEntry(domain=DOMAIN, data={
+        "vworld_api_key": "vworld",
+        "kakao_developers_api_key": "kakao",
+        "startpoint": location("Home", "127.0", "37.0"),
+        "endpoint": location("Work", "north", "east"),
+        "waypoints": [],
+    })
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert async_get_sessions(hass).stats["routes"] == 1
+    await hass.config_entries.async_unload(entry.entry_id)
+    assert async_get_sessions(hass).stats == {"sessions": 0, "routes": 0, "created": 1}
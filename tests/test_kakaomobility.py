@@ -1,11 +1,20 @@
+from datetime import datetime, timezone
+import json
+import asyncio
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock
 from custom_components.kr_eta.kakaomobility import Navi
+from custom_components.kr_eta.singleflight import SingleFlight
 from custom_components.kr_eta.vworld import Location
 
 @pytest.fixture
-def navi():
-    return Navi("test_api_key")
+def mock_session():
+    session = Mock()
+    return session
+
+@pytest.fixture
+def navi(mock_session):
+    return Navi("test_api_key", mock_session)
 
 @pytest.fixture
 def location_start():
@@ -15,10 +24,21 @@ def location_start():
 def location_end():
     return Location("End", 127.1, 37.1)
 
+def mock_get(mock_session, status, json_data=None):
+    mock_response = AsyncMock()
+    mock_response.status = status
+    mock_response.json.return_value = json_data
+
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    mock_get_ctx.__aexit__.return_value = None
+
+    mock_session.get.return_value = mock_get_ctx
+
 def test_init(navi):
     assert navi.apikey == "test_api_key"
     assert navi.apiurl == "https://apis-navi.kakaomobility.com/v1/directions"
-    assert navi.rs.headers["Authorization"] == "KakaoAK test_api_key"
+    assert navi.headers["Authorization"] == "KakaoAK test_api_key"
     assert navi.startpoint is None
     assert navi.endpoint is None
     assert navi.waypoints == []
@@ -39,102 +59,299 @@ def test_set_waypoints(navi, location_start):
     with pytest.raises(ValueError, match="Waypoints must be less than 5"):
         navi.set_waypoints([location_start] * 6)
 
-def test_point_to_param_str(navi, location_start):
+def test_location_param(location_start):
     # Test with name
-    param_str = navi._point_to_param_str(location_start)
-    assert param_str == "127.0,37.0,name=Start"
+    assert location_start.param == "127.0,37.0,name=Start"
 
     # Test without name
-    location_no_name = Location(None, 127.0, 37.0)
-    param_str = navi._point_to_param_str(location_no_name)
-    assert param_str == "127.0,37.0"
+    assert Location(None, 127.0, 37.0).param == "127.0,37.0"
+
+def test_route_params_follow_setters(navi, location_start, location_end):
+    with pytest.raises(ValueError):
+        navi._route_params("RECOMMEND")
 
-def test_get_eta_success(navi, location_start, location_end):
     navi.set_startpoint(location_start)
     navi.set_endpoint(location_end)
+    params = navi._route_params("RECOMMEND")
+    assert params["origin"] == "127.0,37.0,name=Start"
+    assert "waypoints" not in params
+    # Callers get a copy of the cached parameters.
+    params["summary"] = "false"
+    assert navi._route_params("TIME")["summary"] == "true"
+
+    key = navi._route_key(navi.apiurl, "TIME")
+
+    navi.set_waypoints([Location("WP", 127.05, 37.05)])
+    assert navi._route_params("TIME")["waypoints"] == "127.05,37.05,name=WP"
+    # The cache key is rebuilt with the params, not per request.
+    assert navi._route_key(navi.apiurl, "TIME") != key
+    assert navi._route_key(navi.apiurl, "TIME")[2] is navi._key
 
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+@pytest.mark.asyncio
+async def test_get_eta_success(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_endpoint(location_end)
+
+    mock_get(mock_session, 200, {
         "routes": [{
             "result_code": 0,
             "summary": {"duration": 1234}
         }]
-    }
-    
-    # Mock the session object directly
-    navi.rs = Mock()
-    navi.rs.get.return_value = mock_response
+    })
 
-    duration = navi.get_eta()
+    duration = await navi.async_get_eta()
     assert duration.get("duration") == 1234
-    
-    navi.rs.get.assert_called_once()
-    args, kwargs = navi.rs.get.call_args
+
+    mock_session.get.assert_called_once()
+    args, kwargs = mock_session.get.call_args
     assert args[0] == navi.apiurl
+    assert kwargs["headers"]["Authorization"] == "KakaoAK test_api_key"
     assert kwargs["params"]["origin"] == "127.0,37.0,name=Start"
     assert kwargs["params"]["destination"] == "127.1,37.1,name=End"
 
-def test_get_eta_with_waypoints(navi, location_start, location_end):
+@pytest.mark.asyncio
+async def test_get_eta_with_waypoints(navi, mock_session, location_start, location_end):
     navi.set_startpoint(location_start)
     navi.set_endpoint(location_end)
     navi.set_waypoints([location_start, location_end])
 
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_get(mock_session, 200, {
         "routes": [{
             "result_code": 0,
             "summary": {"duration": 1234}
         }]
-    }
-    
-    navi.rs = Mock()
-    navi.rs.get.return_value = mock_response
+    })
+
+    await navi.async_get_eta()
 
-    navi.get_eta()
-    
-    _, kwargs = navi.rs.get.call_args
+    _, kwargs = mock_session.get.call_args
     assert "waypoints" in kwargs["params"]
     assert kwargs["params"]["waypoints"] == "127.0,37.0,name=Start|127.1,37.1,name=End"
 
-def test_get_eta_missing_points(navi, location_start):
+@pytest.mark.asyncio
+async def test_get_eta_missing_points(navi, location_start):
     with pytest.raises(ValueError, match="Startpoint or endpoint is not set"):
-        navi.get_eta()
+        await navi.async_get_eta()
 
     navi.set_startpoint(location_start)
     with pytest.raises(ValueError, match="Startpoint or endpoint is not set"):
-        navi.get_eta()
+        await navi.async_get_eta()
 
-def test_get_eta_http_error(navi, location_start, location_end):
+@pytest.mark.asyncio
+async def test_get_eta_http_error(navi, mock_session, location_start, location_end):
     navi.set_startpoint(location_start)
     navi.set_endpoint(location_end)
 
-    mock_response = Mock()
-    mock_response.status_code = 500
-    
-    navi.rs = Mock()
-    navi.rs.get.return_value = mock_response
+    mock_get(mock_session, 500)
 
     with pytest.raises(Exception, match="Failed to get eta: 500"):
-        navi.get_eta()
+        await navi.async_get_eta()
 
-def test_get_eta_api_error(navi, location_start, location_end):
+@pytest.mark.asyncio
+async def test_get_eta_api_error(navi, mock_session, location_start, location_end):
     navi.set_startpoint(location_start)
     navi.set_endpoint(location_end)
 
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_get(mock_session, 200, {
         "routes": [{
             "result_code": 101,
             "result_msg": "Some error",
             "summary": {}
         }]
-    }
-    
-    navi.rs = Mock()
-    navi.rs.get.return_value = mock_response
+    })
 
     with pytest.raises(Exception, match="Failed to get eta: result_code=101, result_msg=Some error"):
-        navi.get_eta()
+        await navi.async_get_eta()
+
+@pytest.mark.asyncio
+async def test_get_eta_coalesced(mock_session, location_start, location_end):
+    flight = SingleFlight()
+    navis = [Navi("test_api_key", mock_session, flight) for _ in range(2)]
+    for n in navis:
+        n.set_startpoint(location_start)
+        n.set_endpoint(location_end)
+
+    mock_get(mock_session, 200, {
+        "routes": [{
+            "result_code": 0,
+            "summary": {"duration": 1234}
+        }]
+    })
+
+    results = await asyncio.gather(*(n.async_get_eta() for n in navis))
+
+    assert results == [{"duration": 1234}] * 2
+    mock_session.get.assert_called_once()
+    assert flight.saved == 1
+
+def mock_post(mock_session, status, json_data=None):
+    mock_response = AsyncMock()
+    mock_response.status = status
+    mock_response.json.return_value = json_data
+
+    mock_post_ctx = AsyncMock()
+    mock_post_ctx.__aenter__.return_value = mock_response
+    mock_post_ctx.__aexit__.return_value = None
+
+    mock_session.post.return_value = mock_post_ctx
+
+def test_set_destinations(navi, location_end):
+    navi.set_destinations([location_end] * 30)
+    assert len(navi.destinations) == 30
+
+    with pytest.raises(ValueError, match="Destinations must be less than 30"):
+        navi.set_destinations([location_end] * 31)
+
+@pytest.mark.asyncio
+async def test_get_etas_success(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_destinations([location_end, Location("Gym", 127.2, 37.2), Location("Far", 128.0, 36.0)])
+
+    mock_post(mock_session, 200, {
+        "trans_id": "abc",
+        "routes": [
+            {"result_code": 0, "key": "1", "summary": {"duration": 200, "distance": 2000}},
+            {"result_code": 0, "key": "0", "summary": {"duration": 100, "distance": 1000}},
+            {"result_code": 104, "key": "2", "result_msg": "too far"},
+        ]
+    })
+
+    summaries = await navi.async_get_etas()
+    assert summaries == [
+        {"duration": 100, "distance": 1000},
+        {"duration": 200, "distance": 2000},
+        None,
+    ]
+
+    mock_session.post.assert_called_once()
+    args, kwargs = mock_session.post.call_args
+    assert args[0] == navi.multi_apiurl
+    assert kwargs["json"]["origin"] == {"x": "127.0", "y": "37.0"}
+    assert kwargs["json"]["destinations"][1] == {"x": "127.2", "y": "37.2", "key": "1"}
+
+@pytest.mark.asyncio
+async def test_get_etas_missing_points(navi, location_start):
+    with pytest.raises(ValueError, match="Startpoint or destinations are not set"):
+        await navi.async_get_etas()
+
+    navi.set_startpoint(location_start)
+    with pytest.raises(ValueError, match="Startpoint or destinations are not set"):
+        await navi.async_get_etas()
+
+@pytest.mark.asyncio
+async def test_get_etas_http_error(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_destinations([location_end])
+
+    mock_post(mock_session, 401)
+
+    with pytest.raises(Exception, match="Failed to get etas: 401"):
+        await navi.async_get_etas()
+
+@pytest.mark.asyncio
+async def test_get_eta_detailed(mock_session, location_start, location_end):
+    navi = Navi("test_api_key", mock_session, detailed=True)
+    navi.set_startpoint(location_start)
+    navi.set_endpoint(location_end)
+
+    body = json.dumps({
+        "routes": [{
+            "result_code": 0,
+            "summary": {"duration": 1234},
+            "sections": [{"distance": 100, "duration": 1234, "roads": []}],
+        }]
+    }).encode()
+
+    async def iter_chunked(size):
+        for i in range(0, len(body), 10):
+            yield body[i:i + 10]
+
+    mock_get(mock_session, 200)
+    response = mock_session.get.return_value.__aenter__.return_value
+    response.content = Mock()
+    response.content.iter_chunked = iter_chunked
+
+    summary = await navi.async_get_eta()
+
+    assert summary["duration"] == 1234
+    assert summary["detail"].sections() == [(100, 1234)]
+    params = mock_session.get.call_args[1]["params"]
+    assert params["summary"] == "false"
+    assert params["road_details"] == "true"
+
+@pytest.mark.asyncio
+async def test_get_eta_compare_priorities(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_endpoint(location_end)
+    navi.compare_priorities = True
+
+    responses = {
+        "RECOMMEND": [{"distance": 10000, "duration": 1200}, {"distance": 9000, "duration": 1300}],
+        "TIME": [{"distance": 12000, "duration": 1100}],
+        # The shortest route is the recommended alternative.
+        "DISTANCE": [{"distance": 9000, "duration": 1300}],
+    }
+
+    def get(url, params, headers):
+        assert params["alternatives"] == "true"
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.json.return_value = {"routes": [
+            {"result_code": 0, "summary": summary} for summary in responses[params["priority"]]
+        ]}
+        ctx = AsyncMock()
+        ctx.__aenter__.return_value = mock_response
+        return ctx
+
+    mock_session.get.side_effect = get
+
+    summary = await navi.async_get_eta()
+
+    assert mock_session.get.call_count == 3
+    assert summary["duration"] == 1100
+    assert summary["priority"] == "TIME"
+    assert summary["options"] == [
+        {"priority": "RECOMMEND", "distance": 10000, "duration": 1200, "delta": 100},
+        {"priority": "RECOMMEND", "distance": 9000, "duration": 1300, "delta": 200},
+        {"priority": "TIME", "distance": 12000, "duration": 1100, "delta": 0},
+    ]
+
+@pytest.mark.asyncio
+async def test_get_eta_compare_priorities_partial_failure(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_endpoint(location_end)
+    navi.compare_priorities = True
+
+    def get(url, params, headers):
+        mock_response = AsyncMock()
+        mock_response.status = 200 if params["priority"] == "DISTANCE" else 400
+        mock_response.json.return_value = {"routes": [
+            {"result_code": 0, "summary": {"distance": 9000, "duration": 1300}}
+        ]}
+        ctx = AsyncMock()
+        ctx.__aenter__.return_value = mock_response
+        return ctx
+
+    mock_session.get.side_effect = get
+
+    summary = await navi.async_get_eta()
+    assert summary["priority"] == "DISTANCE"
+    assert len(summary["options"]) == 1
+
+@pytest.mark.asyncio
+async def test_get_future_eta(navi, mock_session, location_start, location_end):
+    navi.set_startpoint(location_start)
+    navi.set_endpoint(location_end)
+
+    mock_get(mock_session, 200, {
+        "routes": [{"result_code": 0, "summary": {"duration": 1800}}]
+    })
+
+    departure = datetime(2024, 1, 1, 23, 30, tzinfo=timezone.utc)
+    summary = await navi.async_get_future_eta(departure)
+
+    assert summary["duration"] == 1800
+    args, kwargs = mock_session.get.call_args
+    assert args[0] == "https://apis-navi.kakaomobility.com/v1/future/directions"
+    # Departure times are in Korea Standard Time.
+    assert kwargs["params"]["departure_time"] == "202401020830"
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from custom_components.kr_eta.liveorigin import LiveOrigin, estimate, project
+from custom_components.kr_eta.routeparser import RouteDetail
+from custom_components.kr_eta.spatial import SpatialCache
+from custom_components.kr_eta.vworld import Location
+
+def make_detail():
+    """Two roads heading east along latitude 37: 0.01 degree, then 0.02."""
+    detail = RouteDetail()
+    detail.section_roads.append(0)
+    for first, points, duration in ((0, (127.00, 127.01), 60), (2, (127.01, 127.02, 127.03), 240)):
+        detail.road_vertexes.append(first)
+        detail.road_durations.append(duration)
+        detail.road_distances.append(1000 * (len(points) - 1))
+        for x in points:
+            detail.vertexes.extend((x, 37.0))
+    return detail
+
+def test_project():
+    detail = make_detail()
+
+    projection = project(detail, 127.005, 37.001)
+    assert projection.road == 0
+    assert projection.fraction == pytest.approx(0.5)
+    assert projection.offset == pytest.approx(111, abs=1)
+
+    projection = project(detail, 127.025, 37.0)
+    assert projection.road == 1
+    assert projection.fraction == pytest.approx(0.75)
+    assert projection.offset == pytest.approx(0)
+
+def test_project_empty_detail():
+    assert project(RouteDetail(), 127.0, 37.0) is None
+
+def test_estimate_scales_to_summary():
+    summary = {"duration": 600, "distance": 3000, "fare": 0, "detail": make_detail()}
+
+    estimated = estimate(summary, project(summary["detail"], 127.02, 37.0))
+
+    # Half of the second road is left: 120 of 300 seconds of road durations.
+    assert estimated == {"duration": 240, "distance": 1000, "fare": 0, "estimated": True}
+
+def tracker(hass, x, y):
+    hass.states.async_set("device_tracker.car", "not_home", {"latitude": y, "longitude": x})
+
+def make_live_origin(hass, **kwargs):
+    coordinator = Mock(data={}, async_refresh_route=AsyncMock())
+    return LiveOrigin(
+        hass, coordinator, "a", Mock(), "device_tracker.car", 500, timedelta(minutes=10), **kwargs
+    )
+
+@pytest.fixture
+async def live(hass):
+    tracker(hass, 127.0, 37.0)
+    origin = make_live_origin(hass)
+    unsubscribe = origin.async_setup()
+    await hass.async_block_till_done()
+    origin.coordinator.async_refresh_route.reset_mock()
+    yield origin
+    unsubscribe()
+
+async def test_setup_starts_from_tracker(hass):
+    tracker(hass, 127.0, 37.0)
+    live = make_live_origin(hass)
+    unsubscribe = live.async_setup()
+    await hass.async_block_till_done()
+
+    live.navi.set_startpoint.assert_called_once()
+    assert (live.origin.x, live.origin.y) == (127.0, 37.0)
+    live.coordinator.async_refresh_route.assert_awaited_once_with("a")
+    unsubscribe()
+
+async def test_origins_are_snapped_and_named(hass):
+    spatial = SpatialCache()
+    spatial.snap_origin(127.0001, 37.0001)
+    geocoder = Mock(getaddress=AsyncMock(return_value="서울특별시 중구 세종대로 110"))
+    tracker(hass, 127.0, 37.0)
+    live = make_live_origin(hass, spatial=spatial, geocoder=geocoder)
+    unsubscribe = live.async_setup()
+    await hass.async_block_till_done()
+
+    geocoder.getaddress.assert_awaited_once_with(127.0001, 37.0001)
+    assert live.navi.set_startpoint.call_args.args[0] == Location(
+        name="서울특별시 중구 세종대로 110", x=127.0001, y=37.0001
+    )
+    live.coordinator.async_refresh_route.assert_awaited_once_with("a")
+    unsubscribe()
+
+async def test_small_moves_are_estimated(hass, live):
+    live.coordinator.data = {"a": {"duration": 600, "distance": 3000, "detail": make_detail()}}
+
+    tracker(hass, 127.002, 37.0)
+    await hass.async_block_till_done()
+
+    live.coordinator.async_refresh_route.assert_not_called()
+    entry_id, summary = live.coordinator.async_set_route_data.call_args.args
+    assert entry_id == "a"
+    assert summary["estimated"]
+    assert summary["duration"] < 600
+
+async def test_moving_far_fetches_again(hass, live):
+    live.coordinator.data = {"a": {"duration": 600, "distance": 3000, "detail": make_detail()}}
+
+    tracker(hass, 127.01, 37.0)
+    await hass.async_block_till_done()
+
+    live.coordinator.async_refresh_route.assert_awaited_once_with("a")
+    assert live.origin.x == 127.01
+    live.coordinator.async_set_route_data.assert_not_called()
+
+async def test_leaving_route_fetches_once(hass, live):
+    live.coordinator.data = {"a": {"duration": 600, "distance": 3000, "detail": make_detail()}}
+    # Far off the route, but close to the last origin.
+    live.origin = Location(name=None, x=127.0, y=37.004)
+
+    tracker(hass, 127.0, 37.006)
+    await hass.async_block_till_done()
+    tracker(hass, 127.0, 37.007)
+    await hass.async_block_till_done()
+
+    # The second update waits for the pending fetch.
+    live.coordinator.async_refresh_route.assert_awaited_once_with("a")
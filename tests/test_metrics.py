@@ -0,0 +1,82 @@
+from unittest.mock import AsyncMock, Mock
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.kr_eta.const import (
+    CONF_KAKAODEVELOPERS_API_KEY,
+    CONF_VWORLD_API_KEY,
+    DATA_COORDINATOR,
+    DOMAIN,
+)
+from custom_components.kr_eta.coordinator import KrEtaCoordinator
+from custom_components.kr_eta.diagnostics import async_get_config_entry_diagnostics
+from custom_components.kr_eta.metrics import Histogram, RouteMetrics, span
+from custom_components.kr_eta.resilience import UpstreamError
+from custom_components.kr_eta.schedule import RouteSchedule
+
+
+def test_histogram():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+
+    for ms in (3, 4, 20, 40, 700):
+        histogram.observe(ms)
+
+    assert histogram.quantile(0.5) == 25
+    assert histogram.quantile(0.95) == 700
+    stats = histogram.stats
+    assert stats["count"] == 5
+    assert stats["buckets"]["5"] == 2
+    assert stats["buckets"]["inf"] == 0
+
+
+def test_span():
+    metrics = RouteMetrics()
+    with span(metrics, "decode"):
+        pass
+    with span(None, "decode"):
+        pass
+
+    assert metrics.spans["decode"].count == 1
+
+
+def make_navi(**kwargs):
+    navi = Mock(destinations=[], limiter=None)
+    navi.async_get_eta = AsyncMock(**kwargs)
+    return navi
+
+
+async def test_coordinator_metrics(hass):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route("a", make_navi(return_value={"duration": 60}), RouteSchedule.from_options({}))
+    coordinator.add_route("b", make_navi(side_effect=UpstreamError("boom")), RouteSchedule.from_options({}))
+
+    await coordinator.async_refresh()
+
+    a, b = coordinator.metrics["a"], coordinator.metrics["b"]
+    assert coordinator.routes["a"].metrics is a
+    assert a.spans["queue"].count == 1
+    assert a.spans["total"].count == 1
+    assert a.last_success is not None
+    assert b.errors == {"UpstreamError": 1}
+    assert b.last_error == "UpstreamError: boom"
+
+
+async def test_diagnostics_redact_api_keys(hass):
+    entry = MockConfigEntry(domain=DOMAIN, data={
+        CONF_VWORLD_API_KEY: "vworld-secret",
+        CONF_KAKAODEVELOPERS_API_KEY: "kakao-secret",
+    })
+    entry.add_to_hass(hass)
+    coordinator = KrEtaCoordinator(hass)
+    navi = make_navi(side_effect=UpstreamError("GET https://api.vworld.kr/req?key=vworld-secret failed"))
+    coordinator.add_route(entry.entry_id, navi, RouteSchedule.from_options({}))
+    hass.data.setdefault(DOMAIN, {})[DATA_COORDINATOR] = coordinator
+    await coordinator.async_refresh()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert "secret" not in str(diagnostics)
+    metrics = diagnostics["coordinator"]["metrics"]
+    assert metrics["errors"] == {"UpstreamError": 1}
+    assert metrics["spans"]["total"]["count"] == 1
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.kr_eta.planner import DeparturePlanner
+
+KST = timezone(timedelta(hours=9))
+ARRIVE_BY = datetime(2024, 1, 2, 9, 0, tzinfo=KST)
+EARLIEST = datetime(2024, 1, 2, 5, 0, tzinfo=KST)
+
+
+def make_navi(duration):
+    navi = Mock()
+    departures = []
+
+    async def get_future_eta(departure):
+        departures.append(departure)
+        return {"duration": duration(departure)}
+
+    navi.async_get_future_eta = get_future_eta
+    return navi, departures
+
+
+def rush_hour(departure):
+    """30 minutes before 7:30, growing by a minute per minute after."""
+    late = max(0, (departure - ARRIVE_BY.replace(hour=7, minute=30)).total_seconds())
+    return 1800 + late
+
+
+async def test_plan():
+    navi, departures = make_navi(rush_hour)
+    planner = DeparturePlanner(navi, max_calls=10)
+
+    result = await planner.async_plan(ARRIVE_BY, EARLIEST)
+
+    # Leaving at 8:00 arrives at 9:00; 8:05 would arrive at 9:10.
+    assert result["departure"] == "2024-01-02T08:00:00+09:00"
+    assert result["arrival"] == "2024-01-02T09:00:00+09:00"
+    assert result["on_time"]
+    assert result["exact"]
+    assert result["calls"] == len(departures) <= 10
+    # The search window is the horizon before the arrival.
+    assert min(departures) >= ARRIVE_BY - timedelta(hours=3)
+
+
+async def test_plan_is_bounded():
+    navi, departures = make_navi(rush_hour)
+    planner = DeparturePlanner(navi, max_calls=3)
+
+    result = await planner.async_plan(ARRIVE_BY, EARLIEST)
+
+    assert len(departures) == 3
+    assert result["on_time"]
+    assert not result["exact"]
+
+
+async def test_plan_too_late():
+    navi, _ = make_navi(lambda departure: 5 * 3600)
+    planner = DeparturePlanner(navi)
+
+    result = await planner.async_plan(ARRIVE_BY, EARLIEST)
+
+    assert not result["on_time"]
+    assert result["departure"] == "2024-01-02T06:00:00+09:00"
+
+
+async def test_plan_upstream_failure():
+    navi = Mock()
+
+    async def get_future_eta(departure):
+        raise Exception("boom")
+
+    navi.async_get_future_eta = get_future_eta
+    planner = DeparturePlanner(navi, max_calls=10, concurrency=3)
+
+    result = await planner.async_plan(ARRIVE_BY, EARLIEST)
+
+    assert result["calls"] == 3
+    assert result["duration"] is None
+
+
+async def test_plan_arrival_too_soon():
+    navi, _ = make_navi(rush_hour)
+    with pytest.raises(ValueError):
+        await DeparturePlanner(navi).async_plan(ARRIVE_BY, ARRIVE_BY + timedelta(minutes=1))
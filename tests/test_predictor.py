@@ -0,0 +1,56 @@
+from custom_components.kr_eta.history import HOUR, RouteHistory
+from custom_components.kr_eta.predictor import EtaPredictor
+
+# 2024-01-01 00:00 UTC, a Monday.
+T0 = 1704067200
+WEEK = 7 * 24 * HOUR
+
+
+def make_history(durations):
+    """History with one sample in the first hour of consecutive weeks."""
+    history = RouteHistory()
+    for week, duration in enumerate(durations):
+        history.add(T0 + week * WEEK, duration, 10000)
+    return history
+
+
+def test_profile():
+    predictor = EtaPredictor(make_history([1000, 1010, 990, 1000]), 0.1)
+    predictor.rebuild()
+
+    assert len(predictor.profile) == 1
+    p10, p50, p90 = next(iter(predictor.profile.values()))
+    assert p10 <= p50 <= p90
+    assert p50 == 1000
+
+
+def test_needs_enough_weeks():
+    predictor = EtaPredictor(make_history([1000, 1000]), 0.1)
+    assert predictor.predict(T0 + 4 * WEEK) is None
+
+
+def test_predicts_within_budget():
+    predictor = EtaPredictor(make_history([1000, 1010, 990, 1000]), 0.1, max_skips=2)
+    now = T0 + 4 * WEEK
+
+    assert predictor.predict(now) == 1000
+    assert predictor.predict(now + 60) == 1000
+    # A live refresh is forced after max_skips predictions.
+    assert predictor.predict(now + 120) is None
+    predictor.record_live(now + 120, 1000)
+    assert predictor.predict(now + 180) == 1000
+    assert predictor.stats == {"slots": 1, "predicted": 3, "live": 1}
+
+
+def test_wide_profile_is_not_predicted():
+    predictor = EtaPredictor(make_history([600, 1800, 900, 1500]), 0.1)
+    assert predictor.predict(T0 + 4 * WEEK) is None
+
+
+def test_off_profile_live_result_stops_predictions():
+    predictor = EtaPredictor(make_history([1000, 1010, 990, 1000]), 0.1)
+    now = T0 + 4 * WEEK
+
+    assert predictor.predict(now) == 1000
+    predictor.record_live(now + 60, 1500)
+    assert predictor.predict(now + 120) is None
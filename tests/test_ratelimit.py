@@ -0,0 +1,79 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.kr_eta.ratelimit import (
+    QuotaExceededError,
+    RateLimiterRegistry,
+    STORAGE_KEY,
+    TokenBucket,
+    async_get_limiters,
+)
+
+async def test_token_bucket_burst_then_waits():
+    bucket = TokenBucket(rate=10, capacity=2)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        bucket.updated -= delay
+
+    with patch("custom_components.kr_eta.ratelimit.asyncio.sleep", fake_sleep):
+        for _ in range(3):
+            await bucket.async_acquire()
+
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.1, abs=0.01)
+
+async def test_limiter_counts_and_enforces_quota():
+    registry = RateLimiterRegistry()
+    limiter = registry.get("kakao", "key")
+    limiter.daily_quota = 2
+
+    await limiter.async_acquire()
+    await limiter.async_acquire()
+    assert limiter.calls_today == 2
+
+    with pytest.raises(QuotaExceededError, match="Daily kakao quota of 2 calls exceeded"):
+        await limiter.async_acquire()
+
+async def test_limiter_is_shared_per_key():
+    registry = RateLimiterRegistry()
+    assert registry.get("kakao", "key") is registry.get("kakao", "key")
+    assert registry.get("kakao", "key") is not registry.get("kakao", "other")
+    assert registry.get("kakao", "key") is not registry.get("vworld", "key")
+    assert "key" not in RateLimiterRegistry.key_id("kakao", "key")
+
+async def test_limiter_resets_daily():
+    limiter = RateLimiterRegistry().get("kakao", "key")
+    await limiter.async_acquire()
+
+    tomorrow = dt_util.now() + timedelta(days=1)
+    with patch("custom_components.kr_eta.ratelimit.dt_util.now", return_value=tomorrow):
+        assert limiter.calls_today == 0
+
+async def test_slowdown():
+    limiter = RateLimiterRegistry().get("kakao", "key")
+    limiter.daily_quota = 100
+    assert limiter.slowdown == 1
+    limiter.calls = 80
+    assert limiter.slowdown == 2
+    limiter.calls = 95
+    assert limiter.slowdown == 4
+
+async def test_persistence(hass):
+    registry = RateLimiterRegistry(Store(hass, 1, STORAGE_KEY))
+    await registry.get("kakao", "key").async_acquire()
+    await registry.store.async_save(registry._data_to_save())
+
+    loaded = RateLimiterRegistry(Store(hass, 1, STORAGE_KEY))
+    await loaded.async_load()
+    assert loaded.get("kakao", "key").calls_today == 1
+
+async def test_async_get_limiters_is_shared(hass):
+    registry = await async_get_limiters(hass)
+    assert await async_get_limiters(hass) is registry
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.kr_eta.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    UpstreamError,
+    async_get_resilience,
+)
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch("custom_components.kr_eta.resilience.asyncio.sleep", AsyncMock()) as mock_sleep:
+        yield mock_sleep
+
+def test_from_status():
+    assert UpstreamError.from_status("", 429).retryable
+    assert UpstreamError.from_status("", 503).retryable
+    assert not UpstreamError.from_status("", 401).retryable
+
+async def test_retry_then_success(no_sleep):
+    resilience = Resilience(attempts=3)
+    func = AsyncMock(side_effect=[UpstreamError.from_status("busy", 503), "ok"])
+
+    assert await resilience.async_call("host", func) == "ok"
+    assert func.await_count == 2
+    assert resilience.retries == 1
+    no_sleep.assert_awaited_once()
+    assert resilience.breaker("host").failures == 0
+
+async def test_retry_timeouts():
+    resilience = Resilience(attempts=3)
+    func = AsyncMock(side_effect=[asyncio.TimeoutError(), "ok"])
+
+    assert await resilience.async_call("host", func) == "ok"
+
+async def test_gives_up_after_attempts():
+    resilience = Resilience(attempts=3)
+    func = AsyncMock(side_effect=UpstreamError.from_status("busy", 429))
+
+    with pytest.raises(UpstreamError, match="busy"):
+        await resilience.async_call("host", func)
+    assert func.await_count == 3
+
+async def test_client_errors_fail_fast():
+    resilience = Resilience(attempts=3)
+    func = AsyncMock(side_effect=UpstreamError("result_code=104"))
+
+    with pytest.raises(UpstreamError, match="result_code=104"):
+        await resilience.async_call("host", func)
+    func.assert_awaited_once()
+
+    func = AsyncMock(side_effect=UpstreamError.from_status("unauthorized", 401))
+    with pytest.raises(UpstreamError):
+        await resilience.async_call("host", func)
+    func.assert_awaited_once()
+
+async def test_backoff_is_jittered_and_bounded(no_sleep):
+    resilience = Resilience(attempts=5, base_delay=1, max_delay=3)
+    func = AsyncMock(side_effect=UpstreamError.from_status("busy", 500))
+
+    with pytest.raises(UpstreamError):
+        await resilience.async_call("host", func)
+
+    delays = [call.args[0] for call in no_sleep.await_args_list]
+    assert len(delays) == 4
+    assert all(0 <= d <= 3 for d in delays)
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker("host", failure_threshold=2, reset_timeout=60)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError, match="Circuit open for host"):
+        breaker.before_call()
+
+    with patch("custom_components.kr_eta.resilience.time.monotonic", return_value=time.monotonic() + 61):
+        breaker.before_call()  # the probe
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("host", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    with patch("custom_components.kr_eta.resilience.time.monotonic", return_value=time.monotonic() + 61):
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+async def test_cancelled_probe_is_released():
+    resilience = Resilience(attempts=1)
+    breaker = resilience.breakers["host"] = CircuitBreaker("host", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    with patch("custom_components.kr_eta.resilience.time.monotonic", return_value=time.monotonic() + 61):
+        func = AsyncMock(side_effect=asyncio.CancelledError())
+        with pytest.raises(asyncio.CancelledError):
+            await resilience.async_call("host", func)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # The next call probes again.
+        assert await resilience.async_call("host", AsyncMock(return_value="ok")) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+async def test_open_circuit_stops_calls():
+    resilience = Resilience(attempts=1)
+    resilience.breakers["host"] = CircuitBreaker("host", failure_threshold=1)
+    func = AsyncMock(side_effect=UpstreamError.from_status("down", 502))
+
+    with pytest.raises(UpstreamError, match="down"):
+        await resilience.async_call("host", func)
+    with pytest.raises(CircuitOpenError):
+        await resilience.async_call("host", func)
+    func.assert_awaited_once()
+
+    # Other hosts are unaffected.
+    assert await resilience.async_call("other", AsyncMock(return_value="ok")) == "ok"
+
+async def test_async_get_resilience_is_shared(hass):
+    assert async_get_resilience(hass) is async_get_resilience(hass)
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from custom_components.kr_eta.routeparser import JsonEventParser, RouteParser
+
+RESPONSE = {
+    "trans_id": "abc",
+    "routes": [{
+        "result_code": 0,
+        "result_msg": "길 찾기 성공",
+        "summary": {
+            "origin": {"name": "Start", "x": 127.0, "y": 37.0},
+            "waypoints": [{"name": "WP1", "x": 127.05, "y": 37.05}],
+            "fare": {"taxi": 15000, "toll": 0},
+            "distance": 10000,
+            "duration": 1200,
+        },
+        "sections": [
+            {
+                "distance": 4000,
+                "duration": 500,
+                "roads": [
+                    {"name": "A", "distance": 1500, "duration": 200, "traffic_speed": 27.5,
+                     "traffic_state": 2, "vertexes": [127.0, 37.0, 127.01, 37.01]},
+                    {"name": "B", "distance": 2500, "duration": 300, "traffic_speed": 30.0,
+                     "traffic_state": 1, "vertexes": [127.01, 37.01, 127.05, 37.05]},
+                ],
+                "guides": [{"name": "출발지", "type": 100}],
+            },
+            {
+                "distance": 6000,
+                "duration": 700,
+                "roads": [
+                    {"name": "C", "distance": 6000, "duration": 700, "traffic_speed": 31.0,
+                     "traffic_state": 0, "vertexes": [127.05, 37.05, 127.1, 37.1]},
+                ],
+            },
+        ],
+    }],
+}
+
+
+def parse(data: bytes, chunk_size: int) -> RouteParser:
+    parser = RouteParser()
+    for i in range(0, len(data), chunk_size):
+        parser.feed(data[i:i + chunk_size])
+    parser.close()
+    return parser
+
+
+def test_events():
+    parser = JsonEventParser()
+    events = parser.feed(b'{"a": [1, 2.5, "x"], "b": {"c": true, "d": nu')
+    events += parser.feed(b'll}}')
+    events += parser.close()
+
+    assert events == [
+        ("", "start_map", None),
+        ("", "map_key", "a"),
+        ("a", "start_array", None),
+        ("a.item", "number", 1),
+        ("a.item", "number", 2.5),
+        ("a.item", "string", "x"),
+        ("a", "end_array", None),
+        ("", "map_key", "b"),
+        ("b", "start_map", None),
+        ("b", "map_key", "c"),
+        ("b.c", "boolean", True),
+        ("b", "map_key", "d"),
+        ("b.d", "null", None),
+        ("b", "end_map", None),
+        ("", "end_map", None),
+    ]
+
+
+def test_truncated_document():
+    parser = JsonEventParser()
+    parser.feed(b'{"a": [1, 2')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_route_parser(chunk_size):
+    # Splits land inside strings, numbers and multi-byte characters.
+    parser = parse(json.dumps(RESPONSE, ensure_ascii=False).encode(), chunk_size)
+
+    assert parser.result_code == 0
+    assert parser.result_msg == "길 찾기 성공"
+    assert parser.summary == RESPONSE["routes"][0]["summary"]
+
+    detail = parser.detail
+    assert detail.sections() == [(4000, 500), (6000, 700)]
+    assert list(detail.section_roads) == [0, 2]
+    assert list(detail.road_speeds) == [27.5, 30.0, 31.0]
+    assert list(detail.road_states) == [2, 1, 0]
+    assert list(detail.road_vertexes) == [0, 2, 4]
+    assert len(detail.vertexes) == 12
+    assert detail.nbytes < 512
+
+
+def test_route_parser_failure():
+    parser = parse(json.dumps({
+        "routes": [{"result_code": 104, "result_msg": "출발지와 도착지가 5 m 이내로 설정된 경우 경로를 탐색할 수 없음"}],
+    }).encode(), 16)
+
+    assert parser.result_code == 104
+    assert parser.summary is None
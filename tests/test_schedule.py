@@ -0,0 +1,123 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from custom_components.kr_eta.schedule import RouteSchedule, parse_windows
+
+@pytest.fixture
+def schedule():
+    return RouteSchedule(
+        parse_windows("07:00-09:30, 23:00-01:00"),
+        timedelta(minutes=5),
+        timedelta(minutes=30),
+    )
+
+def test_parse_windows():
+    assert parse_windows("07:00-09:30,17:30-19:30") == [
+        (time(7, 0), time(9, 30)),
+        (time(17, 30), time(19, 30)),
+    ]
+    assert parse_windows("") == []
+
+    with pytest.raises(ValueError, match="Invalid commute window: 7am"):
+        parse_windows("7am")
+
+def test_from_options_defaults():
+    schedule = RouteSchedule.from_options({})
+    assert schedule.peak_interval == timedelta(minutes=5)
+    assert schedule.offpeak_interval == timedelta(minutes=30)
+    assert len(schedule.windows) == 2
+
+def test_in_window(schedule):
+    assert schedule.in_window(datetime(2024, 1, 1, 8, 0))
+    assert not schedule.in_window(datetime(2024, 1, 1, 9, 30))
+    # Window running past midnight
+    assert schedule.in_window(datetime(2024, 1, 1, 23, 30))
+    assert schedule.in_window(datetime(2024, 1, 1, 0, 30))
+    assert not schedule.in_window(datetime(2024, 1, 1, 3, 0))
+
+def test_is_due(schedule):
+    now = datetime(2024, 1, 1, 8, 0)
+    assert schedule.is_due(now)
+
+    schedule.record(now, 600)
+    assert schedule.next_refresh == now + timedelta(minutes=5)
+    assert not schedule.is_due(now + timedelta(minutes=4))
+    assert schedule.is_due(now + timedelta(minutes=5))
+
+    schedule.request_refresh()
+    assert schedule.is_due(now)
+
+def test_stats(schedule):
+    now = datetime(2024, 1, 1, 8, 0)
+    schedule.record(now, 600, slowdown=2)
+
+    assert schedule.stats == {
+        "next_refresh": "2024-01-01T08:10:00",
+        "backoff": 1,
+        "slowdown": 2,
+        "active_until": None,
+    }
+
+def test_offpeak_interval(schedule):
+    now = datetime(2024, 1, 1, 12, 0)
+    schedule.record(now, 600)
+    assert schedule.next_refresh == now + timedelta(minutes=30)
+
+def test_offpeak_stops_at_window_start(schedule):
+    now = datetime(2024, 1, 1, 6, 50)
+    schedule.record(now, 600)
+    assert schedule.next_refresh == datetime(2024, 1, 1, 7, 0)
+
+def test_backoff_when_stable(schedule):
+    now = datetime(2024, 1, 1, 8, 0)
+    for duration in (600, 620, 610):
+        schedule.record(now, duration)
+    assert schedule.backoff == 2
+    assert schedule.next_refresh == now + timedelta(minutes=10)
+
+    schedule.record(now, 605)
+    schedule.record(now, 615)
+    assert schedule.backoff == 4 # capped
+
+    # A real change resets the backoff
+    schedule.record(now, 900)
+    assert schedule.backoff == 1
+    assert schedule.next_refresh == now + timedelta(minutes=5)
+
+def test_failure_keeps_backoff(schedule):
+    now = datetime(2024, 1, 1, 8, 0)
+    for duration in (600, 600, 600):
+        schedule.record(now, duration)
+    schedule.record(now, None)
+    assert schedule.backoff == 2
+
+def test_quota_slowdown(schedule):
+    now = datetime(2024, 1, 1, 8, 0)
+    schedule.record(now, 600, slowdown=4)
+    assert schedule.next_refresh == now + timedelta(minutes=20)
+
+def test_trigger_options_make_route_dormant():
+    assert RouteSchedule.from_options({}).mode(datetime(2024, 1, 1, 8, 0)) == RouteSchedule.MODE_SCHEDULED
+
+    schedule = RouteSchedule.from_options({"trigger_entities": ["person.me"], "dormant_interval": 120})
+    now = datetime(2024, 1, 1, 8, 0)
+    assert schedule.mode(now) == RouteSchedule.MODE_DORMANT
+    # Commute windows are ignored while dormant.
+    assert schedule.interval(now) == timedelta(minutes=120)
+    schedule.record(now, 600)
+    assert schedule.next_refresh == now + timedelta(minutes=120)
+
+def test_activate_polls_at_peak_until_expired():
+    schedule = RouteSchedule.from_options({"trigger_entities": ["person.me"]})
+    now = datetime(2024, 1, 1, 12, 0)
+    schedule.record(now, 600)
+
+    schedule.activate(now, timedelta(minutes=60))
+
+    assert schedule.is_due(now)
+    assert schedule.mode(now) == RouteSchedule.MODE_ACTIVE
+    assert schedule.interval(now) == timedelta(minutes=5)
+    later = now + timedelta(minutes=60)
+    assert schedule.mode(later) == RouteSchedule.MODE_DORMANT
+    assert schedule.interval(later) == timedelta(minutes=180)
@@ -1,98 +1,194 @@
-import unittest
-from unittest.mock import MagicMock, patch
-import sys
-import os
-
-# Add custom_components to path so we can import modules
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../custom_components')))
-
-# Mock homeassistant modules
-sys.modules['homeassistant'] = MagicMock()
-sys.modules['homeassistant.components'] = MagicMock()
-sys.modules['homeassistant.components.sensor'] = MagicMock()
-sys.modules['homeassistant.config_entries'] = MagicMock()
-sys.modules['homeassistant.core'] = MagicMock()
-sys.modules['homeassistant.helpers'] = MagicMock()
-sys.modules['homeassistant.helpers.entity_platform'] = MagicMock()
-sys.modules['homeassistant.const'] = MagicMock()
-
-# Mock requests module
-sys.modules['requests'] = MagicMock()
-
-# Mock voluptuous module
-sys.modules['voluptuous'] = MagicMock()
-
-# Setup specific mocks for imports in sensor.py
-class MockSensorEntity:
-    pass
-
-sys.modules['homeassistant.components.sensor'].SensorEntity = MockSensorEntity
-
-from kr_eta.kakaomobility import Navi
-from kr_eta.sensor import KrEtaSensor
-from kr_eta.vworld import Location
-
-class TestKrEtaSensor(unittest.TestCase):
-    def setUp(self):
-        self.api_key = "test_api_key"
-        self.start_point = Location("Start", 127.0, 37.0)
-        self.end_point = Location("End", 127.1, 37.1)
-        self.waypoints = [Location("WP1", 127.05, 37.05)]
-        self.entry_id = "test_entry_id"
-
-    @patch('kr_eta.kakaomobility.requests.Session')
-    def test_navi_get_eta(self, mock_session):
-        # Mock response from Kakao API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "routes": [{
-                "result_code": 0,
-                "summary": {
-                    "duration": 3600, # 1 hour in seconds
-                    "distance": 10000,
-                    "fare": {
-                        "taxi": 15000,
-                        "toll": 2000
-                    },
-                    "taxi_fare": 15000
-                }
-            }]
-        }
-        mock_session.return_value.get.return_value = mock_response
-
-        navi = Navi(self.api_key)
-        navi.set_startpoint(self.start_point)
-        navi.set_endpoint(self.end_point)
-        
-        summary = navi.get_eta()
-        
-        self.assertEqual(summary['duration'], 3600)
-        self.assertEqual(summary['distance'], 10000)
-
-    @patch('kr_eta.kakaomobility.Navi.get_eta')
-    def test_sensor_update(self, mock_get_eta):
-        # Mock Navi.get_eta return value
-        mock_get_eta.return_value = {
-            "duration": 3600,
-            "distance": 10000,
-            "fare": {"taxi": 15000},
-            "taxi_fare": 15000
-        }
-
-        sensor = KrEtaSensor(self.api_key, self.start_point, self.end_point, self.waypoints, self.entry_id)
-        
-        # Trigger update
-        sensor.update()
-        
-        # Verify state (minutes)
-        self.assertEqual(sensor.native_value, 60)
-        
-        # Verify attributes
-        self.assertEqual(sensor.extra_state_attributes['distance'], 10000)
-        self.assertEqual(sensor.extra_state_attributes['origin'], "Start")
-        self.assertEqual(sensor.extra_state_attributes['destination'], "End")
-        self.assertEqual(sensor.extra_state_attributes['waypoints_count'], 1)
-
-if __name__ == '__main__':
-    unittest.main()
+from datetime import timedelta
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.kr_eta.coordinator import KrEtaCoordinator
+from custom_components.kr_eta.kakaomobility import Navi
+from custom_components.kr_eta.schedule import RouteSchedule
+from custom_components.kr_eta.sensor import KrEtaNextRefreshSensor, KrEtaSensor
+from custom_components.kr_eta.vworld import Location
+
+API_KEY = "test_api_key"
+ENTRY_ID = "test_entry_id"
+
+@pytest.fixture
+def start_point():
+    return Location("Start", 127.0, 37.0)
+
+@pytest.fixture
+def end_point():
+    return Location("End", 127.1, 37.1)
+
+@pytest.fixture
+def waypoints():
+    return [Location("WP1", 127.05, 37.05)]
+
+@pytest.fixture
+def summary():
+    return {
+        "duration": 3600, # 1 hour in seconds
+        "distance": 10000,
+        "fare": {
+            "taxi": 15000,
+            "toll": 2000
+        },
+        "taxi_fare": 15000
+    }
+
+async def test_navi_get_eta(start_point, end_point, summary):
+    # Mock response from Kakao API
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {
+        "routes": [{
+            "result_code": 0,
+            "summary": summary
+        }]
+    }
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    session = MagicMock()
+    session.get.return_value = mock_get_ctx
+
+    navi = Navi(API_KEY, session)
+    navi.set_startpoint(start_point)
+    navi.set_endpoint(end_point)
+
+    summary = await navi.async_get_eta()
+
+    assert summary['duration'] == 3600
+    assert summary['distance'] == 10000
+
+async def test_sensor_update(hass, start_point, end_point, waypoints, summary):
+    coordinator = KrEtaCoordinator(hass)
+    navi = Navi(API_KEY, MagicMock())
+    coordinator.add_route(ENTRY_ID, navi, RouteSchedule.from_options({}))
+    sensor = KrEtaSensor(coordinator, start_point, end_point, waypoints, ENTRY_ID)
+
+    with patch.object(Navi, "async_get_eta", AsyncMock(return_value=summary)), \
+            patch.object(sensor, "async_write_ha_state") as mock_write:
+        unsub = coordinator.async_add_listener(sensor._handle_coordinator_update)
+        await coordinator.async_refresh()
+        unsub()
+
+    mock_write.assert_called_once()
+
+    # Verify state (minutes)
+    assert sensor.native_value == 60
+
+    # Verify attributes
+    assert sensor.extra_state_attributes['distance'] == 10000
+    assert sensor.extra_state_attributes['origin'] == "Start"
+    assert sensor.extra_state_attributes['destination'] == "End"
+    assert sensor.extra_state_attributes['waypoints_count'] == 1
+    # A sensor of its own, as it changes on every refresh.
+    assert 'next_refresh' not in sensor.extra_state_attributes
+
+async def test_sensor_update_options(hass, start_point, end_point, summary):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route(ENTRY_ID, Navi(API_KEY, MagicMock()), RouteSchedule.from_options({}))
+    sensor = KrEtaSensor(coordinator, start_point, end_point, [], ENTRY_ID)
+    options = [
+        {"priority": "TIME", "distance": 10000, "duration": 3600, "delta": 0},
+        {"priority": "DISTANCE", "distance": 8000, "duration": 3900, "delta": 300},
+    ]
+
+    sensor._update_from_summary({**summary, "priority": "TIME", "options": options})
+
+    assert sensor.native_value == 60
+    assert sensor.extra_state_attributes["fastest_priority"] == "TIME"
+    assert sensor.extra_state_attributes["options"] == options
+
+async def test_sensor_update_error(hass, start_point, end_point, waypoints):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route(ENTRY_ID, Navi(API_KEY, MagicMock()), RouteSchedule.from_options({}))
+    sensor = KrEtaSensor(coordinator, start_point, end_point, waypoints, ENTRY_ID)
+
+    with patch.object(Navi, "async_get_eta", AsyncMock(side_effect=Exception("boom"))), \
+            patch.object(sensor, "async_write_ha_state"):
+        unsub = coordinator.async_add_listener(sensor._handle_coordinator_update)
+        await coordinator.async_refresh()
+        unsub()
+
+    assert sensor.native_value is None
+
+async def test_matrix_sensors(hass, start_point, end_point):
+    coordinator = KrEtaCoordinator(hass)
+    navi = Navi(API_KEY, MagicMock())
+    navi.set_startpoint(start_point)
+    navi.set_destinations([end_point, Location("Gym", 127.2, 37.2)])
+    coordinator.add_route(ENTRY_ID, navi, RouteSchedule.from_options({}))
+    sensors = [
+        KrEtaSensor(coordinator, start_point, dest, [], ENTRY_ID, index=i)
+        for i, dest in enumerate(navi.destinations)
+    ]
+
+    summaries = [{"duration": 600, "distance": 1000}, None]
+    with patch.object(Navi, "async_get_etas", AsyncMock(return_value=summaries)) as mock_get_etas:
+        await coordinator.async_refresh()
+
+    mock_get_etas.assert_awaited_once()
+    for sensor in sensors:
+        sensor._update_from_summary(sensor._summary())
+
+    assert sensors[0].unique_id == "kreta_test_entry_id_0"
+    assert sensors[0].native_value == 10
+    assert sensors[0].extra_state_attributes['destination'] == "End"
+    assert sensors[1].unique_id == "kreta_test_entry_id_1"
+    assert sensors[1].native_value is None
+
+async def test_small_changes_are_not_written(hass, start_point, end_point, summary):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route(ENTRY_ID, Navi(API_KEY, MagicMock()), RouteSchedule.from_options({}))
+    sensor = KrEtaSensor(
+        coordinator, start_point, end_point, [], ENTRY_ID,
+        min_duration_delta=2, min_distance_delta=100,
+    )
+
+    with patch.object(sensor, "async_write_ha_state") as mock_write:
+        for update in (
+            summary,
+            {**summary, "duration": 3660, "distance": 10050},  # +1 min, +50 m
+            {**summary, "duration": 3720},  # +2 min
+            {**summary, "duration": 3720, "distance": 10100},  # +100 m
+            {**summary, "duration": 3720, "distance": 10100, "taxi_fare": 16000},
+            {**summary, "duration": 3720, "distance": 10100, "taxi_fare": 16000},
+        ):
+            coordinator.data = {ENTRY_ID: update}
+            sensor._handle_coordinator_update()
+
+    assert mock_write.call_count == 4
+    assert coordinator.skipped_writes == 2
+    assert sensor.native_value == 62
+    assert sensor.extra_state_attributes["distance"] == 10100
+
+async def test_next_refresh_sensor(hass, summary):
+    coordinator = KrEtaCoordinator(hass)
+    coordinator.add_route(ENTRY_ID, Navi(API_KEY, MagicMock()), RouteSchedule.from_options({}))
+    sensor = KrEtaNextRefreshSensor(coordinator, ENTRY_ID)
+    assert sensor.unique_id == "kreta_test_entry_id_next_refresh"
+
+    with patch.object(Navi, "async_get_eta", AsyncMock(return_value=summary)), \
+            patch.object(sensor, "async_write_ha_state") as mock_write:
+        unsub = coordinator.async_add_listener(sensor._handle_coordinator_update)
+        await coordinator.async_refresh()
+        first = sensor.native_value
+        assert first is not None
+        assert mock_write.call_count == 1
+
+        # Not rescheduled.
+        sensor._handle_coordinator_update()
+        assert mock_write.call_count == 1
+
+        # The same result, rescheduled.
+        coordinator.schedules[ENTRY_ID].request_refresh()
+        with patch(
+            "custom_components.kr_eta.coordinator.dt_util.now",
+            return_value=first + timedelta(minutes=1),
+        ):
+            await coordinator.async_refresh()
+        unsub()
+
+    assert mock_write.call_count == 2
+    assert sensor.native_value > first
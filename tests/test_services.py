@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.kr_eta.const import (
+    CONF_KAKAODEVELOPERS_API_KEY,
+    CONF_VWORLD_API_KEY,
+    DATA_COORDINATOR,
+    DOMAIN,
+)
+from custom_components.kr_eta.vworld import AddressNotFound, GeoCoder
+
+API_KEYS = {
+    CONF_VWORLD_API_KEY: "vworld_key",
+    CONF_KAKAODEVELOPERS_API_KEY: "kakao_key",
+}
+
+ROUTES_YAML = """
+routes:
+  - start: {name: Home, address: home address}
+    end: {name: Office, address: office address}
+    waypoints: [waypoint 1]
+  - start: {name: Home, address: home address}
+    destinations:
+      - {name: School, address: school address}
+      - {name: Gym, address: gym address}
+  - start: {name: Home, address: home address}
+  - start: {name: Home, address: home address}
+    destinations: [{name: School, address: school address}]
+    waypoints: [waypoint 1]
+"""
+
+ROUTES_CSV = """start_name,start_address,end_name,end_address,waypoints
+Home,home address,Office,office address,waypoint 1|waypoint 2
+Home,home address,Lost,unknown address,
+"""
+
+
+@pytest.fixture
+def geocoded():
+    calls = []
+
+    async def fake_getcoords(self, addresses, crs="epsg:4326", limit=4):
+        calls.append(list(addresses))
+        points = {a: ("127.0", "37.0") for a in addresses if "unknown" not in a}
+        errors = {a: AddressNotFound(f"Address not found: {a}") for a in addresses if "unknown" in a}
+        return points, errors
+
+    with patch.object(GeoCoder, "getcoords", fake_getcoords):
+        yield calls
+
+
+@pytest.fixture(autouse=True)
+def mock_setup_entry():
+    with patch("custom_components.kr_eta.async_setup_entry", AsyncMock(return_value=True)), \
+            patch("custom_components.kr_eta.async_unload_entry", AsyncMock(return_value=True)):
+        yield
+
+
+async def _import(hass, filename, content, **data):
+    with open(hass.config.path(filename), "w", encoding="utf-8") as f:
+        f.write(content)
+    assert await async_setup_component(hass, DOMAIN, {})
+    return await hass.services.async_call(
+        DOMAIN, "import_routes", {"path": filename, **data},
+        blocking=True, return_response=True,
+    )
+
+
+async def test_import_yaml(hass, tmp_path, geocoded):
+    hass.config.config_dir = str(tmp_path)
+    result = await _import(hass, "routes.yaml", ROUTES_YAML, **API_KEYS)
+
+    assert result["created"] == ["ETA Home ➡ Office (1 waypoints)", "ETA Home ➡ 2 destinations"]
+    assert [(f["route"], f["reason"]) for f in result["failed"]] == [
+        (2, "invalid_route"), (3, "invalid_route"),
+    ]
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 2
+    # Every distinct address is geocoded in one batch, and the imports
+    # take the coordinates from it.
+    assert len(geocoded) == 1
+    assert set(geocoded[0]) == {
+        "home address", "office address", "waypoint 1", "school address", "gym address",
+    }
+
+
+async def test_import_csv(hass, tmp_path, geocoded):
+    hass.config.config_dir = str(tmp_path)
+    result = await _import(hass, "routes.csv", ROUTES_CSV, **API_KEYS)
+
+    assert result["created"] == ["ETA Home ➡ Office (2 waypoints)"]
+    assert result["failed"] == [
+        {"route": 1, "reason": "addresses_not_found", "addresses": "unknown address"},
+    ]
+
+
+async def test_import_skips_routes_already_imported(hass, tmp_path, geocoded):
+    hass.config.config_dir = str(tmp_path)
+    await _import(hass, "routes.yaml", ROUTES_YAML, **API_KEYS)
+    result = await hass.services.async_call(
+        DOMAIN, "import_routes", {"path": "routes.yaml", **API_KEYS},
+        blocking=True, return_response=True,
+    )
+
+    assert result["created"] == []
+    assert [(f["route"], f["reason"]) for f in result["failed"]] == [
+        (0, "already_configured"),
+        (1, "already_configured"),
+        (2, "invalid_route"),
+        (3, "invalid_route"),
+    ]
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 2
+
+
+async def test_import_rejects_path_outside_config_dir(hass, tmp_path, geocoded):
+    hass.config.config_dir = str(tmp_path / "config")
+    (tmp_path / "config").mkdir()
+    with pytest.raises(HomeAssistantError):
+        await _import(hass, "../routes.yaml", ROUTES_YAML, **API_KEYS)
+
+
+async def test_import_needs_api_keys(hass, tmp_path, geocoded):
+    hass.config.config_dir = str(tmp_path)
+    with pytest.raises(HomeAssistantError):
+        await _import(hass, "routes.yaml", ROUTES_YAML)
+
+
+async def test_plan_departure(hass):
+    navi = Mock(destinations=[])
+    navi.async_get_future_eta = AsyncMock(return_value={"duration": 1800})
+    coordinator = Mock(routes={"entry": navi})
+    assert await async_setup_component(hass, DOMAIN, {})
+    hass.data[DOMAIN][DATA_COORDINATOR] = coordinator
+
+    arrive_by = dt_util.now().replace(second=0, microsecond=0) + timedelta(hours=2)
+    result = await hass.services.async_call(
+        DOMAIN, "plan_departure",
+        {"config_entry_id": "entry", "arrive_by": arrive_by.isoformat(), "max_calls": 4},
+        blocking=True, return_response=True,
+    )
+
+    assert result["on_time"]
+    assert result["calls"] <= 4
+    assert dt_util.parse_datetime(result["arrival"]) <= arrive_by
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN, "plan_departure",
+            {"config_entry_id": "unknown", "arrive_by": "09:00"},
+            blocking=True, return_response=True,
+        )
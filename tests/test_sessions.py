@@ -0,0 +1,41 @@
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+
+from custom_components.kr_eta.const import SESSION_POOL_SIZE
+from custom_components.kr_eta.sessions import SessionPool, async_get_sessions
+
+async def test_routes_of_a_key_share_a_session(hass):
+    pool = SessionPool()
+
+    a = pool.async_acquire("key1", "route_a")
+    b = pool.async_acquire("key1", "route_b")
+    c = pool.async_acquire("key2", "route_c")
+
+    assert a is b
+    assert a is not c
+    assert a.connector.limit == SESSION_POOL_SIZE
+    assert pool.stats == {"sessions": 2, "routes": 3, "created": 2}
+    await pool.async_close()
+
+async def test_session_closes_with_its_last_route(hass):
+    pool = SessionPool()
+    session = pool.async_acquire("key1", "route_a")
+    pool.async_acquire("key1", "route_b")
+
+    await pool.async_release("route_a")
+    assert not session.closed
+
+    await pool.async_release("route_b")
+    assert session.closed
+    assert pool.stats["sessions"] == 0
+
+    # A route set up again gets a new session.
+    assert pool.async_acquire("key1", "route_a") is not session
+    await pool.async_close()
+
+async def test_sessions_close_with_home_assistant(hass):
+    session = async_get_sessions(hass).async_acquire("key1", "route_a")
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
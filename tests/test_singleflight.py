@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from custom_components.kr_eta.singleflight import SingleFlight
+
+async def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"duration": 60}
+
+    tasks = [asyncio.create_task(flight.async_do("k", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert results == [{"duration": 60}] * 3
+    assert flight.saved == 2
+
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        return 1
+
+    await asyncio.gather(flight.async_do("a", fetch), flight.async_do("b", fetch))
+    assert flight.saved == 0
+
+async def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.async_do("k", fetch) == 1
+    assert await flight.async_do("k", fetch) == 2
+    assert flight.saved == 0
+
+async def test_exception_is_shared():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        raise Exception("boom")
+
+    results = await asyncio.gather(
+        flight.async_do("k", fetch), flight.async_do("k", fetch), return_exceptions=True
+    )
+    assert [str(r) for r in results] == ["boom", "boom"]
+
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 1
+
+    first = asyncio.create_task(flight.async_do("k", fetch))
+    second = asyncio.create_task(flight.async_do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,43 @@
+import pytest
+
+from custom_components.kr_eta.spatial import GridIndex, distance
+
+def test_distance():
+    assert distance(127.0, 37.0, 127.0, 37.01) == pytest.approx(1113, abs=1)
+    assert distance(127.0, 37.0, 127.01, 37.0) == pytest.approx(889, abs=1)
+
+def test_get_within_tolerance():
+    index = GridIndex(cell_size=100)
+    index.add(127.0, 37.0, "a")
+
+    # 44 meters east, then 67 meters north
+    assert index.get(127.0005, 37.0, 50) == (True, "a")
+    assert index.get(127.0, 37.0006, 50) == (False, None)
+    assert (index.hits, index.misses) == (1, 1)
+
+def test_get_returns_nearest():
+    index = GridIndex(cell_size=100)
+    index.add(127.0, 37.0, "a")
+    index.add(127.0004, 37.0, "b")
+
+    assert index.get(127.0003, 37.0, 100) == (True, "b")
+
+def test_snap():
+    index = GridIndex(cell_size=100)
+
+    assert index.snap(127.0, 37.0, 50) == (127.0, 37.0)
+    assert index.snap(127.0002, 37.0001, 50) == (127.0, 37.0)
+    assert index.snap(127.01, 37.0, 50) == (127.01, 37.0)
+    assert index.stats["size"] == 2
+
+def test_evicts_least_recently_used_cells():
+    index = GridIndex(cell_size=100, max_size=2)
+    index.add(127.0, 37.0, "a")
+    index.add(127.1, 37.0, "b")
+    index.get(127.0, 37.0, 50)
+
+    index.add(127.2, 37.0, "c")
+
+    assert index.get(127.0, 37.0, 50) == (True, "a")
+    assert index.get(127.1, 37.0, 50) == (False, None)
+    assert index.stats["evictions"] == 1
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.kr_eta.schedule import RouteSchedule
+from custom_components.kr_eta.triggers import RouteTriggers
+
+def make_coordinator(options):
+    schedule = RouteSchedule.from_options(options)
+    return Mock(schedules={"a": schedule}, async_refresh_route=AsyncMock())
+
+async def test_leaving_home_activates_route(hass):
+    options = {"trigger_entities": ["person.me"]}
+    coordinator = make_coordinator(options)
+    hass.states.async_set("person.me", "home")
+    unsubscribe = RouteTriggers(hass, coordinator, "a", options).async_setup()
+
+    hass.states.async_set("person.me", "not_home")
+    await hass.async_block_till_done()
+
+    assert coordinator.schedules["a"].mode(dt_util.now()) == RouteSchedule.MODE_ACTIVE
+    coordinator.async_refresh_route.assert_awaited_once_with("a")
+    unsubscribe()
+
+async def test_arriving_home_does_not_activate(hass):
+    options = {"trigger_entities": ["person.me"]}
+    coordinator = make_coordinator(options)
+    hass.states.async_set("person.me", "not_home")
+    unsubscribe = RouteTriggers(hass, coordinator, "a", options).async_setup()
+
+    hass.states.async_set("person.me", "home")
+    await hass.async_block_till_done()
+
+    assert coordinator.schedules["a"].mode(dt_util.now()) == RouteSchedule.MODE_DORMANT
+    unsubscribe()
+
+async def test_leaving_other_zone(hass):
+    options = {"trigger_entities": ["device_tracker.phone"], "trigger_zone": "zone.work"}
+    coordinator = make_coordinator(options)
+    hass.states.async_set("zone.work", "0", {"friendly_name": "Work"})
+    hass.states.async_set("device_tracker.phone", "Work")
+    unsubscribe = RouteTriggers(hass, coordinator, "a", options).async_setup()
+
+    hass.states.async_set("device_tracker.phone", "not_home")
+    await hass.async_block_till_done()
+
+    assert coordinator.schedules["a"].mode(dt_util.now()) == RouteSchedule.MODE_ACTIVE
+    unsubscribe()
+
+async def test_calendar_event_schedules_activation(hass):
+    options = {"trigger_calendar": "calendar.work", "trigger_lead": 30}
+    coordinator = make_coordinator(options)
+    start = dt_util.now() + timedelta(hours=2)
+    hass.states.async_set("calendar.work", "off", {"start_time": start.strftime("%Y-%m-%d %H:%M:%S")})
+    triggers = RouteTriggers(hass, coordinator, "a", options)
+    unsubscribe = triggers.async_setup()
+
+    assert triggers._unsub_timer is not None
+    assert coordinator.schedules["a"].mode(dt_util.now()) == RouteSchedule.MODE_DORMANT
+
+    # An event within the lead time activates right away.
+    soon = dt_util.now() + timedelta(minutes=10)
+    hass.states.async_set("calendar.work", "off", {"start_time": soon.strftime("%Y-%m-%d %H:%M:%S")})
+    await hass.async_block_till_done()
+
+    assert triggers._unsub_timer is None
+    assert coordinator.schedules["a"].mode(dt_util.now()) == RouteSchedule.MODE_ACTIVE
+    unsubscribe()
@@ -1,6 +1,9 @@
+import asyncio
 import pytest
 from unittest.mock import patch, Mock, AsyncMock
-from custom_components.kr_eta.vworld import GeoCoder, Location
+from custom_components.kr_eta.geocache import GeoCache
+from custom_components.kr_eta.resilience import UpstreamError
+from custom_components.kr_eta.vworld import AddressNotFound, GeoCoder, Location
 
 @pytest.fixture
 def mock_session():
@@ -96,7 +99,7 @@ async def test_getcoord_not_found(geocoder, mock_session):
     
     mock_session.get.return_value = mock_get_ctx
 
-    with pytest.raises(Exception) as excinfo:
+    with pytest.raises(AddressNotFound) as excinfo:
         await geocoder.getcoord("Unknown Address")
     
     assert "Address not found: Unknown Address" in str(excinfo.value)
@@ -118,7 +121,7 @@ async def test_getcoord_unknown_status(geocoder, mock_session):
     
     mock_session.get.return_value = mock_get_ctx
 
-    with pytest.raises(Exception) as excinfo:
+    with pytest.raises(UpstreamError) as excinfo:
         await geocoder.getcoord("Some Address")
     
     assert "Unknown status: WEIRD_STATUS" in str(excinfo.value)
@@ -133,6 +136,25 @@ def test_location_repr():
     loc = Location("Home", 127.0, 37.0)
     assert repr(loc) == "Location(Home: 127.0, 37.0)"
 
+def test_location_coordinates():
+    # Config entries store coordinates as strings.
+    loc = Location("Home", "127.1", "37.5")
+    assert loc.x == 127.1
+    assert loc.param == "127.1,37.5,name=Home"
+
+    with pytest.raises(ValueError):
+        Location("Home", "east", "37.5")
+    with pytest.raises(ValueError):
+        Location("Home", 37.5, 127.1)
+
+def test_location_is_immutable_and_hashable():
+    loc = Location("Home", 127.0, 37.0)
+    with pytest.raises(AttributeError):
+        loc.x = 128.0
+    assert not hasattr(loc, "__dict__")
+    assert loc == Location("Home", "127.0", "37.0")
+    assert len({loc, Location("Home", 127.0, 37.0), Location("Work", 127.0, 37.0)}) == 2
+
 @pytest.mark.asyncio
 async def test_location_from_address():
     mock_geocoder = Mock()
@@ -145,3 +167,131 @@ async def test_location_from_address():
     assert loc.x == 127.123
     assert loc.y == 37.123
     mock_geocoder.getcoord.assert_called_once_with("Some Address")
+
+@pytest.mark.asyncio
+async def test_getcoord_cached(mock_session):
+    geocoder = GeoCoder("test_api_key", mock_session, GeoCache())
+
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {
+        "response": {
+            "status": "OK",
+            "result": {
+                "crs": "EPSG:4326",
+                "point": {"x": "127.123", "y": "37.123"}
+            }
+        }
+    }
+
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    mock_get_ctx.__aexit__.return_value = None
+
+    mock_session.get.return_value = mock_get_ctx
+
+    assert await geocoder.getcoord("Some Address") == ("127.123", "37.123")
+    assert await geocoder.getcoord(" some  address ") == ("127.123", "37.123")
+    mock_session.get.assert_called_once()
+    assert geocoder.cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_getcoord_not_found_cached(mock_session):
+    geocoder = GeoCoder("test_api_key", mock_session, GeoCache())
+
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {
+        "response": {
+            "status": "NOT_FOUND",
+            "result": None
+        }
+    }
+
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    mock_get_ctx.__aexit__.return_value = None
+
+    mock_session.get.return_value = mock_get_ctx
+
+    for _ in range(2):
+        with pytest.raises(AddressNotFound) as excinfo:
+            await geocoder.getcoord("Unknown Address")
+        assert "Address not found: Unknown Address" in str(excinfo.value)
+
+    mock_session.get.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_getcoords(geocoder):
+    async def getcoord(address, crs="epsg:4326"):
+        if address == "Unknown Address":
+            raise AddressNotFound(f"Address not found: {address}")
+        return ("127.0", "37.0")
+
+    geocoder.getcoord = AsyncMock(side_effect=getcoord)
+
+    points, errors = await geocoder.getcoords(["A", "Unknown Address", "A", "B"])
+
+    assert points == {"A": ("127.0", "37.0"), "B": ("127.0", "37.0")}
+    assert list(errors) == ["Unknown Address"]
+    assert "Address not found" in str(errors["Unknown Address"])
+    # Duplicates are looked up once
+    assert geocoder.getcoord.await_count == 3
+
+@pytest.mark.asyncio
+async def test_getcoords_bounded(geocoder):
+    running = 0
+    peak = 0
+
+    async def getcoord(address, crs="epsg:4326"):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return ("127.0", "37.0")
+
+    geocoder.getcoord = getcoord
+    points, _ = await geocoder.getcoords([str(i) for i in range(10)], limit=3)
+
+    assert len(points) == 10
+    assert peak == 3
+
+@pytest.mark.asyncio
+async def test_getaddress_reuses_nearby_results(mock_session):
+    from custom_components.kr_eta.spatial import GridIndex
+
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {
+        "response": {
+            "status": "OK",
+            "result": [{"type": "road", "text": "경기도 성남시 분당구 판교역로 166"}],
+        }
+    }
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    mock_get_ctx.__aexit__.return_value = None
+    mock_session.get.return_value = mock_get_ctx
+    geocoder = GeoCoder("test_api_key", mock_session, addresses=GridIndex())
+
+    assert await geocoder.getaddress(127.1100, 37.3940) == "경기도 성남시 분당구 판교역로 166"
+    # About 20 meters away
+    assert await geocoder.getaddress(127.1102, 37.3941) == "경기도 성남시 분당구 판교역로 166"
+
+    mock_session.get.assert_called_once()
+    params = mock_session.get.call_args.kwargs["params"]
+    assert params["request"] == "getAddress"
+    assert params["point"] == "127.11,37.394"
+
+@pytest.mark.asyncio
+async def test_getaddress_not_found(geocoder, mock_session):
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {"response": {"status": "NOT_FOUND"}}
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+    mock_get_ctx.__aexit__.return_value = None
+    mock_session.get.return_value = mock_get_ctx
+
+    assert await geocoder.getaddress(127.0, 37.0) is None